@@ -1,74 +1,118 @@
 import random
+from collections import deque
 from environment.world import food_shops, actions
+from environment.actions import split_action
+from utils.trace import tracer, DEBUG
+from .replay import MEMORY_LIMIT, ReplayPolicy
 
-class Agent:
-    def __init__(self, name, energy=50, money=100, epsilon=0.1):
-        self.name = name
-        self.state = {
-            "energy": energy,
-            "money": money
-        }
-        self.q_values = {
-            "CheapShop": 5,
-            "PremiumShop": 10
-        }
-        self.memory = []  # Store experiences (optional: for future learning upgrades)
-        self.epsilon = epsilon  # Exploration chance
-        self.beliefs = {"CheapShop": {"expected_cost": 10, "trust": 0.8},
-                        "PremiumShop": {"expected_cost": 20, "trust": 0.9}}
-        self.self_energy_belief = 50  # Noisy estimate of own energy
 
+class BasicPolicy(ReplayPolicy):
+    """think / act logic shared by Agent and the slotted agents.compact.CompactAgent.
 
+    Subclasses own the storage: the policy reads it through resources() ->
+    (energy, money) and q_value(shop), and changes it through apply_outcome()
+    and adjust_q().
+    """
+    __slots__ = ()
 
     def perceive(self, environment_info):
         """(Optional) Process environment info (e.g., shop status)."""
         pass  # Not needed for now but useful later if you add dynamic shops
 
     def think(self, food_shops):
-        """Decide what action to take based on current state and given food_shops."""
-        if self.state["energy"] < 50 and self.state["money"] >= min(shop["cost"] for shop in food_shops.values()):
-            if random.random() < self.epsilon:
-                shop_name = random.choice(list(food_shops.keys()))
-                print(f"{self.name} explores randomly: {shop_name}")
+        """Decide what action to take based on current state and given food_shops.
+
+        Agents given a learned table by QLearningPopulation.write_back follow it
+        (epsilon-greedy) instead of the fixed rules below.
+        """
+        energy, money = self.resources()
+        if self.q_policy is not None:
+            return self.q_policy.choose(energy, money, food_shops, self.rng, self.epsilon)
+        if energy < 50 and money >= min(shop["cost"] for shop in food_shops.values()):
+            if self.rng.random() < self.epsilon:
+                shop_name = self.rng.choice(list(food_shops.keys()))
+                if tracer.debug:
+                    tracer.emit(DEBUG, "explore", agent=self.name, shop=shop_name)
             else:
-                affordable_shops = [shop for shop in food_shops.keys() if self.state["money"] >= food_shops[shop]["cost"]]
-                shop_name = max(affordable_shops, key=lambda shop: self.q_values[shop])
-                print(f"{self.name} exploits best known: {shop_name}")
+                affordable_shops = [shop for shop in food_shops.keys() if money >= food_shops[shop]["cost"]]
+                shop_name = max(affordable_shops, key=self.q_value)
+                if tracer.debug:
+                    tracer.emit(DEBUG, "exploit", agent=self.name, shop=shop_name)
             return f"buy_food_{shop_name}"
-        elif self.state["energy"] < 30:
+        elif energy < 30:
             return "rest"
         else:
-            return random.choice(["move", "rest"])
-
+            return self.rng.choice(["move", "rest"])
 
     def act(self, action, shop_taken, food_shops, actions):
         """Execute action with dynamic environment passed."""
-        self.state["energy"] -= 5  # Daily energy cost
+        before = self.resources()
+        energy = -5  # Daily energy cost
+        money = 0
 
-        if action.startswith("buy_food"):
-            shop_name = action.split("_")[-1]
+        kind, shop_name = split_action(action)
+        if kind == "buy":
             shop = food_shops[shop_name]
 
             if shop_taken.get(shop_name) is None:
                 shop_taken[shop_name] = self.name
-                if random.random() < shop["success_rate"]:
-                    self.state["money"] -= shop["cost"]
-                    self.state["energy"] += shop["energy_gain"]
-                    self.q_values[shop_name] += 5
+                if self.rng.random() < shop["success_rate"]:
+                    money -= shop["cost"]
+                    energy += shop["energy_gain"]
+                    self.adjust_q(shop_name, 5)
                     result = "success"
                 else:
-                    self.state["energy"] -= 5
-                    self.q_values[shop_name] -= 10
+                    energy -= 5
+                    self.adjust_q(shop_name, -10)
                     result = "fail"
             else:
-                self.state["energy"] -= 10
+                energy -= 10
                 result = "fail"
 
-        elif action == "move":
-            self.state["energy"] -= actions["move"]["energy_cost"]
+        elif kind == "move":
+            energy -= actions["move"]["energy_cost"]
             result = "move"
-        elif action == "rest":
-            self.state["energy"] += actions["rest"]["energy_gain"]
+        elif kind == "rest":
+            energy += actions["rest"]["energy_gain"]
             result = "rest"
 
+        self.apply_outcome(energy, money)
         self.memory.append((action, result))
+        if self.replay is not None:
+            self.record_experience(before, action, food_shops)
+
+
+class Agent(BasicPolicy):
+    def __init__(self, name, energy=50, money=100, epsilon=0.1, rng=None, memory_limit=MEMORY_LIMIT):
+        self.name = name
+        self.rng = rng if rng is not None else random  # random module or utils.rng.BlockRNG
+        self.state = {
+            "energy": energy,
+            "money": money
+        }
+        # Per-shop preference nudged after each purchase; see
+        # environment.q_learning for state-based Q-learning over whole populations
+        self.q_values = {
+            "CheapShop": 5,
+            "PremiumShop": 10
+        }
+        self.memory = deque(maxlen=memory_limit)  # Newest (action, result) labels (None: all of them)
+        self.replay = None  # agents.replay.ReplayBuffer, see use_replay()
+        self.q_policy = None  # environment.q_learning.QPolicy, see QLearningPopulation.write_back
+        self.epsilon = epsilon  # Exploration chance
+        self.beliefs = {"CheapShop": {"expected_cost": 10, "trust": 0.8},
+                        "PremiumShop": {"expected_cost": 20, "trust": 0.9}}
+        self.self_energy_belief = 50  # Noisy estimate of own energy
+
+    def resources(self):
+        return self.state["energy"], self.state["money"]
+
+    def q_value(self, shop):
+        return self.q_values[shop]
+
+    def adjust_q(self, shop, delta):
+        self.q_values[shop] += delta
+
+    def apply_outcome(self, energy, money=0):
+        self.state["energy"] += energy
+        self.state["money"] += money
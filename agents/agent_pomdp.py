@@ -1,26 +1,98 @@
 import random
-import copy
+from collections import deque
 
-class AgentPOMDP:
-    def __init__(self, name, energy=120, money=100, epsilon=0.1):
+from environment.actions import split_action
+from utils.trace import tracer, DEBUG
+from .belief_history import BeliefHistory
+from .replay import MEMORY_LIMIT, ReplayPolicy
+
+class POMDPPolicy(ReplayPolicy):
+    """Decision and action logic shared by AgentPOMDP and the slotted agents.compact classes.
+
+    Subclasses own the storage and the belief-reading choose_shop(): the
+    policy reads state through resources() -> (energy, money) and changes it
+    only through apply_outcome(), which is also what EnvironmentManager calls.
+    """
+    __slots__ = ()
+
+    def think(self):
+        """Decide on an action name such as "buy_food_CheapShop"."""
+        return f"buy_food_{self.choose_shop()}"
+
+    def decide(self, index):
+        """Decide on an action code of `index` (environment.actions.ActionIndex)."""
+        if type(self).think is not POMDPPolicy.think:
+            return index.codes[self.think()]  # Subclass with its own string-level policy
+        return index.buy_codes[self.choose_shop()]
+
+    def act(self, action, shop_taken, real_world_shops, actions):
+        """Execute the chosen action and update true state."""
+        before = self.resources()
+        energy = -3  # Daily base energy loss
+        money = 0
+        trust = 0.0
+
+        kind, shop_name = split_action(action)
+        if kind == "buy":
+            shop_info = real_world_shops[shop_name]
+
+            if shop_taken.get(shop_name) is None:
+                shop_taken[shop_name] = self.name
+                if self.rng.random() < shop_info["success_rate"]:
+                    money -= shop_info["cost"]
+                    energy += shop_info["energy_gain"]
+                    result = "success"
+                    trust = 0.05
+                else:
+                    energy -= 5
+                    result = "fail"
+                    trust = -0.1
+            else:
+                energy -= 2  # Reduced penalty for shop being full
+                result = "fail"
+
+        elif kind == "move":
+            energy -= actions["move"]["energy_cost"]
+            result = "move"
+
+        elif kind == "rest":
+            energy += actions["rest"]["energy_gain"]
+            result = "rest"
+
+        self.apply_outcome(energy, money, shop_name, trust)
+
+        # Log the action result
+        self.memory.append((action, result))
+        if self.replay is not None:
+            self.record_experience(before, action, real_world_shops)
+
+
+class AgentPOMDP(POMDPPolicy):
+    def __init__(self, name, energy=120, money=100, epsilon=0.1, rng=None, memory_limit=MEMORY_LIMIT,
+                 belief_keep_every=1, belief_after=None):
         self.name = name
+        self.rng = rng if rng is not None else random  # random module or utils.rng.BlockRNG
         self.true_state = {
             "energy": energy,
             "money": money
         }
+        # Trust stays within [0, 1] (apply_outcome clips the shop it changes)
         self.beliefs = {
             "CheapShop": {
-                "expected_cost": 10 + random.uniform(-2, 2),
-                "trust": 0.8 + random.uniform(-0.3, 0.3)
+                "expected_cost": 10 + self.rng.uniform(-2, 2),
+                "trust": min(0.8 + self.rng.uniform(-0.3, 0.3), 1.0)
             },
             "PremiumShop": {
-                "expected_cost": 20 + random.uniform(-1, 1),
-                "trust": 0.9 + random.uniform(-0.1, 0.1)
+                "expected_cost": 20 + self.rng.uniform(-1, 1),
+                "trust": 0.9 + self.rng.uniform(-0.1, 0.1)
             }
         }
         self.self_energy_belief = energy
         self.epsilon = epsilon
-        self.memory = []  # List to record agent's actions and belief history
+        self.memory = deque(maxlen=memory_limit)  # Newest (action, result) tuples (None: all of them)
+        self.replay = None  # agents.replay.ReplayBuffer, see use_replay()
+        # Compact per-day belief snapshots; after day belief_after only every belief_keep_every-th day is kept
+        self.belief_history = BeliefHistory(self.beliefs.keys(), keep_every=belief_keep_every, after=belief_after)
 
     def perceive(self, observations):
         """Save noisy observations from the environment."""
@@ -30,18 +102,33 @@ class AgentPOMDP:
         """Reset energy and money, and optionally reset beliefs."""
         self.true_state["energy"] = 120
         self.true_state["money"] = 100
-        self.memory = []
+        self.memory = deque(maxlen=self.memory.maxlen)
+        self.belief_history.clear()
 
         if reset_belief:
             for shop in self.beliefs:
                 # Reinitialize trust and expected cost
-                self.beliefs[shop]["expected_cost"] = 10 + random.uniform(-2, 2) if shop == "CheapShop" else 20 + random.uniform(-1, 1)
-                self.beliefs[shop]["trust"] = 0.8 + random.uniform(-0.2, 0.2)
+                self.beliefs[shop]["expected_cost"] = 10 + self.rng.uniform(-2, 2) if shop == "CheapShop" else 20 + self.rng.uniform(-1, 1)
+                self.beliefs[shop]["trust"] = 0.8 + self.rng.uniform(-0.2, 0.2)
+
+
 
+    def update_belief(self, observations, shop_names=None):
+        """Update internal belief estimates based on new observations.
 
+        `observations` is either the dict from generate_noisy_observation or,
+        with `shop_names`, one row of EnvironmentManager.generate_observation_matrix.
+        """
+        if shop_names is not None:
+            if hasattr(observations, "tolist"):
+                observations = observations.tolist()
+            for shop_name, observed_cost in zip(shop_names, observations):
+                current_estimate = self.beliefs[shop_name]["expected_cost"]
+                self.beliefs[shop_name]["expected_cost"] = (
+                    0.8 * current_estimate + 0.2 * observed_cost
+                )
+            return
 
-    def update_belief(self, observations):
-        """Update internal belief estimates based on new observations."""
         for shop_name, obs_info in observations.items():
             observed_cost = obs_info["observed_cost"]
             current_estimate = self.beliefs[shop_name]["expected_cost"]
@@ -50,78 +137,56 @@ class AgentPOMDP:
                 0.8 * current_estimate + 0.2 * observed_cost
             )
 
-    def think(self):
-        """Decide on an action based on beliefs and exploration (epsilon-greedy)."""
-        if random.random() < self.epsilon:
-            shop_choice = random.choice(list(self.beliefs.keys()))
-            print(f"{self.name} explores: {shop_choice}")
+    def choose_shop(self):
+        """Pick a shop based on beliefs and exploration (epsilon-greedy)."""
+        if self.rng.random() < self.epsilon:
+            shop_choice = self.rng.choice(list(self.beliefs.keys()))
+            if tracer.debug:
+                tracer.emit(DEBUG, "explore", agent=self.name, shop=shop_choice)
         else:
             shop_choice = max(
                 self.beliefs.keys(),
                 key=lambda s: self.beliefs[s]["trust"] / self.beliefs[s]["expected_cost"]
             )
-            print(f"{self.name} exploits: {shop_choice}")
-        return f"buy_food_{shop_choice}"
+            if tracer.debug:
+                tracer.emit(DEBUG, "exploit", agent=self.name, shop=shop_choice)
+        return shop_choice
 
-    def act(self, action, shop_taken, real_world_shops, actions):
-        """Execute the chosen action and update true state."""
-        self.true_state["energy"] -= 3  # Daily base energy loss
+    def resources(self):
+        return self.true_state["energy"], self.true_state["money"]
 
-        if action.startswith("buy_food"):
-            shop_name = action.split("_")[-1]
-            shop_info = real_world_shops[shop_name]
+    def apply_outcome(self, energy, money=0, shop=None, trust=0.0):
+        """Add energy / money deltas and a trust delta for `shop`, clipped to [0, 1]."""
+        state = self.true_state
+        state["energy"] += energy
+        state["money"] += money
+        if trust:
+            belief = self.beliefs[shop]
+            belief["trust"] = min(max(belief["trust"] + trust, 0.0), 1.0)
 
-            if shop_taken.get(shop_name) is None:
-                shop_taken[shop_name] = self.name
-                if random.random() < shop_info["success_rate"]:
-                    self.true_state["money"] -= shop_info["cost"]
-                    self.true_state["energy"] += shop_info["energy_gain"]
-                    result = "success"
-                    self.beliefs[shop_name]["trust"] += 0.05
-                else:
-                    self.true_state["energy"] -= 5
-                    result = "fail"
-                    self.beliefs[shop_name]["trust"] -= 0.1
-            else:
-                self.true_state["energy"] -= 2  # Reduced penalty for shop being full
-                result = "fail"
-
-        elif action == "move":
-            self.true_state["energy"] -= actions["move"]["energy_cost"]
-            result = "move"
-
-        elif action == "rest":
-            self.true_state["energy"] += actions["rest"]["energy_gain"]
-            result = "rest"
-
-        # Log the action result
-        self.memory.append((action, result))
-
-        # Clip trust between 0.0 and 1.0
-        for shop in self.beliefs:
-            self.beliefs[shop]["trust"] = min(max(self.beliefs[shop]["trust"], 0.0), 1.0)
+    def is_alive(self):
+        return self.true_state["energy"] > 0 and self.true_state["money"] > 0
 
     def log_belief(self, day):
-        """Save a snapshot of beliefs for later analysis."""
-        self.memory.append({
-            "day": day,
-            "belief_snapshot": copy.deepcopy(self.beliefs)
-        })
+        """Save a snapshot of beliefs for later analysis (see belief_history.snapshot)."""
+        self.belief_history.append(day, self.beliefs)
 
 class ExplorerAgent(AgentPOMDP):
-    def __init__(self, name):
-        super().__init__(name, epsilon=0.6)  # High exploration
+    def __init__(self, name, rng=None, **kwargs):
+        super().__init__(name, epsilon=0.6, rng=rng, **kwargs)  # High exploration
 
 class CautiousAgent(AgentPOMDP):
-    def think(self):
+    def choose_shop(self):
         shop_choice = max(
             self.beliefs.keys(),
             key=lambda s: self.beliefs[s]["trust"]
         )
-        print(f"{self.name} (Cautious) chooses: {shop_choice}")
-        return f"buy_food_{shop_choice}"
+        if tracer.debug:
+            tracer.emit(DEBUG, "choose", agent=self.name, policy="Cautious", shop=shop_choice)
+        return shop_choice
 
 class CheapOnlyAgent(AgentPOMDP):
-    def think(self):
-        print(f"{self.name} (CheapOnly) always picks CheapShop")
-        return "buy_food_CheapShop"
+    def choose_shop(self):
+        if tracer.debug:
+            tracer.emit(DEBUG, "choose", agent=self.name, policy="CheapOnly", shop="CheapShop")
+        return "CheapShop"
@@ -1,29 +1,36 @@
 # agent_variants.py
 from .agent_pomdp import AgentPOMDP
-import random
+from utils.trace import tracer, DEBUG
+
+class CheapOnlyPolicy:
+    """Always picks CheapShop (also used by agents.compact)."""
+    __slots__ = ()
+
+    def choose_shop(self):
+        if tracer.debug:
+            tracer.emit(DEBUG, "choose", agent=self.name, policy="CheapOnly", shop="CheapShop")
+        return "CheapShop"
 
 class GreedyAgent(AgentPOMDP):
     """Default greedy policy: trust / expected_cost."""
-    def __init__(self, name):
-        super().__init__(name, epsilon=0.1)
+    def __init__(self, name, rng=None, **kwargs):
+        super().__init__(name, epsilon=0.1, rng=rng, **kwargs)
 
 class ExplorerAgent(AgentPOMDP):
     """High exploration agent."""
-    def __init__(self, name):
-        super().__init__(name, epsilon=0.5)  # Higher epsilon
+    def __init__(self, name, rng=None, **kwargs):
+        super().__init__(name, epsilon=0.5, rng=rng, **kwargs)  # Higher epsilon
 
 class CautiousAgent(AgentPOMDP):
     """Chooses the shop with highest trust, ignoring cost."""
-    def think(self):
+    def choose_shop(self):
         shop_choice = max(
             self.beliefs.keys(),
             key=lambda s: self.beliefs[s]["trust"]
         )
-        print(f"{self.name} (Cautious) chooses: {shop_choice}")
-        return f"buy_food_{shop_choice}"
+        if tracer.debug:
+            tracer.emit(DEBUG, "choose", agent=self.name, policy="Cautious", shop=shop_choice)
+        return shop_choice
 
-class CheapOnlyAgent(AgentPOMDP):
+class CheapOnlyAgent(CheapOnlyPolicy, AgentPOMDP):
     """Always picks CheapShop."""
-    def think(self):
-        print(f"{self.name} (CheapOnly) always picks CheapShop")
-        return "buy_food_CheapShop"
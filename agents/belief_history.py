@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class BeliefHistory:
+    """Compact per-agent belief history.
+
+    Stores one fixed-width row per logged day (expected_cost and trust for
+    every shop) instead of a deep copy of the beliefs dict. Any day's full
+    snapshot can be rebuilt on demand with snapshot(day). Rows are float64 by
+    default, so snapshots equal the logged beliefs exactly; dtype=np.float32
+    halves the memory at the cost of rounding.
+
+    Retention can be downsampled: once `day` exceeds `after`, only every
+    `keep_every`-th day is kept. Days are expected in increasing order.
+    """
+
+    def __init__(self, shop_names, capacity=16, keep_every=1, after=None, dtype=np.float64):
+        self.shop_names = list(shop_names)
+        self.keep_every = keep_every
+        self.after = after
+        self.size = 0
+        self.days = np.zeros(capacity, dtype=np.int32)
+        self.values = np.zeros((capacity, len(self.shop_names), 2), dtype=dtype)
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.size = 0
+
+    def _retain(self, day):
+        if self.after is None or day <= self.after:
+            return True
+        return (day - self.after) % self.keep_every == 0
+
+    def append(self, day, beliefs):
+        """Record the beliefs dict for `day` (skipped if downsampled away)."""
+        if not self._retain(day):
+            return
+        self.append_values(day,
+                           [beliefs[shop]["expected_cost"] for shop in self.shop_names],
+                           [beliefs[shop]["trust"] for shop in self.shop_names])
+
+    def append_values(self, day, expected_cost, trust):
+        """Record per-shop expected_cost and trust sequences (in shop_names order)."""
+        if not self._retain(day):
+            return
+        if self.size == len(self.days):
+            capacity = 2 * len(self.days)
+            self.days = np.resize(self.days, capacity)
+            self.values = np.resize(self.values, (capacity,) + self.values.shape[1:])
+        row = self.values[self.size]
+        row[:, 0] = expected_cost
+        row[:, 1] = trust
+        self.days[self.size] = day
+        self.size += 1
+
+    def snapshot(self, day):
+        """Rebuild the beliefs dict as of `day` (latest retained day <= day)."""
+        pos = np.searchsorted(self.days[:self.size], day, side="right") - 1
+        if pos < 0:
+            raise KeyError(f"No belief recorded on or before day {day}")
+        row = self.values[pos]
+        return {
+            shop: {"expected_cost": float(row[j, 0]), "trust": float(row[j, 1])}
+            for j, shop in enumerate(self.shop_names)
+        }
+
+    def as_arrays(self):
+        """Return (days, expected_cost, trust) views, costs/trust shaped (n, n_shops)."""
+        values = self.values[:self.size]
+        return self.days[:self.size], values[:, :, 0], values[:, :, 1]
@@ -0,0 +1,339 @@
+# compact.py
+"""Memory-compact agent classes.
+
+Drop-in alternatives to Agent and the AgentPOMDP family for runs with tens
+of thousands of object-based agents. State lives in __slots__ fields
+(energy, money) and small per-shop lists (expected_cost, trust, q) instead
+of nested dicts, so instances carry no __dict__ and hot attribute reads are
+slot lookups. The action logic is the dict-based classes' own (POMDPPolicy,
+BasicPolicy, CheapOnlyPolicy); the belief-reading choose_shop and the
+storage accessors they and EnvironmentManager go through (apply_outcome,
+resources, is_alive, ...) work on the lists, and make the same draws, so
+seeded runs match. The nested-dict attributes
+(true_state, state, beliefs, q_values) are still available as live dict-like
+views, built on access, for Population.from_agents, the recorders and other
+code off the hot path.
+"""
+
+import random
+from collections import deque
+from collections.abc import MutableMapping
+
+from environment.population import BELIEF_PRIORS
+from utils.trace import tracer, DEBUG
+from .agent import BasicPolicy
+from .agent_pomdp import POMDPPolicy
+from .agent_variants import CheapOnlyPolicy
+from .belief_history import BeliefHistory
+from .replay import MEMORY_LIMIT
+
+
+class _FieldView(MutableMapping):
+    """dict-like view of some slot fields of an object ({"energy": ...})."""
+    __slots__ = ("_obj", "_fields")
+
+    def __init__(self, obj, fields):
+        self._obj = obj
+        self._fields = fields
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self._obj, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self._obj, key, value)
+
+    def __delitem__(self, key):
+        raise TypeError("compact agent fields cannot be removed")
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _ShopView(MutableMapping):
+    """dict-like view of one shop's position in per-shop list fields."""
+    __slots__ = ("_obj", "_fields", "_j")
+
+    def __init__(self, obj, fields, j):
+        self._obj = obj
+        self._fields = fields
+        self._j = j
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self._obj, key)[self._j]
+
+    def __setitem__(self, key, value):
+        if key not in self._fields:
+            raise KeyError(key)
+        getattr(self._obj, key)[self._j] = value
+
+    def __delitem__(self, key):
+        raise TypeError("compact agent fields cannot be removed")
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _ShopMap(MutableMapping):
+    """{shop: value} view; values are _ShopViews over `fields`, or items of list `field`."""
+    __slots__ = ("_obj", "_fields", "_field")
+
+    def __init__(self, obj, fields=None, field=None):
+        self._obj = obj
+        self._fields = fields
+        self._field = field
+
+    def __getitem__(self, shop):
+        if self._field:
+            return getattr(self._obj, self._field)[self._obj.shop_ids[shop]]
+        return _ShopView(self._obj, self._fields, self._obj.shop_ids[shop])
+
+    def __setitem__(self, shop, value):
+        if not self._field:
+            raise TypeError("assign to beliefs[shop][key] instead")
+        getattr(self._obj, self._field)[self._obj.shop_ids[shop]] = value
+
+    def __delitem__(self, shop):
+        raise TypeError("compact agent shops cannot be removed")
+
+    def __iter__(self):
+        return iter(self._obj.shop_names)
+
+    def __len__(self):
+        return len(self._obj.shop_names)
+
+    def __repr__(self):
+        return repr({shop: dict(v) if isinstance(v, _ShopView) else v for shop, v in self.items()})
+
+
+def _shop_index(shop_names):
+    shop_names = tuple(shop_names)
+    return shop_names, {shop: j for j, shop in enumerate(shop_names)}
+
+
+class _LazyMemory:
+    """agent.memory as a deque allocated on first use (an empty deque is ~0.7 kB).
+
+    Classes using it declare "_memory" and "_memory_limit" slots.
+    """
+    __slots__ = ()
+
+    @property
+    def memory(self):
+        if self._memory is None:
+            self._memory = deque(maxlen=self._memory_limit)
+        return self._memory
+
+
+class CompactAgentPOMDP(_LazyMemory, POMDPPolicy):
+    """Slotted AgentPOMDP: same behaviour, flat state.
+
+    `true_state` and `beliefs` are views onto energy/money and the
+    expected_cost/trust lists, built on access. The memory deque and the
+    belief history are only allocated on first use.
+    """
+    __slots__ = ("name", "rng", "energy", "money", "shop_names", "shop_ids",
+                 "expected_cost", "trust", "self_energy_belief", "epsilon", "_memory",
+                 "_memory_limit", "replay", "last_observations", "_history", "_history_retention")
+
+    def __init__(self, name, energy=120, money=100, epsilon=0.1, rng=None, shop_names=tuple(BELIEF_PRIORS),
+                 memory_limit=MEMORY_LIMIT, belief_keep_every=1, belief_after=None):
+        self.name = name
+        self.rng = rng if rng is not None else random  # random module or utils.rng.BlockRNG
+        self.energy = energy
+        self.money = money
+        self.shop_names, self.shop_ids = _shop_index(shop_names)
+        self.expected_cost = []
+        self.trust = []
+        for shop in self.shop_names:
+            cost, cost_jitter, trust, trust_jitter = BELIEF_PRIORS[shop]
+            self.expected_cost.append(cost + self.rng.uniform(-cost_jitter, cost_jitter))
+            self.trust.append(min(trust + self.rng.uniform(-trust_jitter, trust_jitter), 1.0))
+        self.self_energy_belief = energy
+        self.epsilon = epsilon
+        self._memory = None
+        self._memory_limit = memory_limit
+        self.replay = None
+        self.last_observations = None
+        self._history = None
+        self._history_retention = (belief_keep_every, belief_after)
+
+    @property
+    def true_state(self):
+        return _FieldView(self, ("energy", "money"))
+
+    @property
+    def beliefs(self):
+        return _ShopMap(self, fields=("expected_cost", "trust"))
+
+    @property
+    def belief_history(self):
+        if self._history is None:
+            keep_every, after = self._history_retention
+            self._history = BeliefHistory(self.shop_names, keep_every=keep_every, after=after)
+        return self._history
+
+    def perceive(self, observations):
+        self.last_observations = observations
+
+    def reset(self, reset_belief=False):
+        """Reset energy and money, and optionally reset beliefs."""
+        self.energy = 120
+        self.money = 100
+        self._memory = None
+        if self._history is not None:
+            self._history.clear()
+
+        if reset_belief:
+            for j, shop in enumerate(self.shop_names):
+                cost, cost_jitter, _, _ = BELIEF_PRIORS[shop]
+                self.expected_cost[j] = cost + self.rng.uniform(-cost_jitter, cost_jitter)
+                self.trust[j] = 0.8 + self.rng.uniform(-0.2, 0.2)
+
+    def update_belief(self, observations, shop_names=None):
+        """Moving-average cost update from an observation dict or matrix row."""
+        expected_cost = self.expected_cost
+        if shop_names is not None:
+            if hasattr(observations, "tolist"):
+                observations = observations.tolist()
+            if tuple(shop_names) == self.shop_names:
+                for j, observed_cost in enumerate(observations):
+                    expected_cost[j] = 0.8 * expected_cost[j] + 0.2 * observed_cost
+                return
+            pairs = zip(shop_names, observations)
+        else:
+            pairs = ((shop, obs["observed_cost"]) for shop, obs in observations.items())
+        for shop_name, observed_cost in pairs:
+            j = self.shop_ids[shop_name]
+            expected_cost[j] = 0.8 * expected_cost[j] + 0.2 * observed_cost
+
+    def choose_shop(self):
+        """Same as AgentPOMDP.choose_shop, on the expected_cost / trust lists."""
+        if self.rng.random() < self.epsilon:
+            shop_choice = self.rng.choice(self.shop_names)
+            if tracer.debug:
+                tracer.emit(DEBUG, "explore", agent=self.name, shop=shop_choice)
+            return shop_choice
+        expected_cost, trust = self.expected_cost, self.trust
+        best = 0
+        best_value = trust[0] / expected_cost[0]
+        for j in range(1, len(trust)):
+            value = trust[j] / expected_cost[j]
+            if value > best_value:
+                best, best_value = j, value
+        shop_choice = self.shop_names[best]
+        if tracer.debug:
+            tracer.emit(DEBUG, "exploit", agent=self.name, shop=shop_choice)
+        return shop_choice
+
+    def resources(self):
+        return self.energy, self.money
+
+    def apply_outcome(self, energy, money=0, shop=None, trust=0.0):
+        """Same as AgentPOMDP.apply_outcome, on the slot fields."""
+        self.energy += energy
+        self.money += money
+        if trust:
+            values = self.trust
+            j = self.shop_ids[shop]
+            values[j] = min(max(values[j] + trust, 0.0), 1.0)
+
+    def is_alive(self):
+        return self.energy > 0 and self.money > 0
+
+    def log_belief(self, day):
+        self.belief_history.append_values(day, self.expected_cost, self.trust)
+
+
+class CompactGreedyAgent(CompactAgentPOMDP):
+    """Slotted GreedyAgent."""
+    __slots__ = ()
+
+    def __init__(self, name, rng=None, **kwargs):
+        super().__init__(name, epsilon=0.1, rng=rng, **kwargs)
+
+
+class CompactExplorerAgent(CompactAgentPOMDP):
+    """Slotted ExplorerAgent."""
+    __slots__ = ()
+
+    def __init__(self, name, rng=None, **kwargs):
+        super().__init__(name, epsilon=0.5, rng=rng, **kwargs)
+
+
+class CompactCautiousAgent(CompactAgentPOMDP):
+    """Slotted CautiousAgent: highest trust, ignoring cost."""
+    __slots__ = ()
+
+    def choose_shop(self):
+        trust = self.trust
+        shop_choice = self.shop_names[trust.index(max(trust))]
+        if tracer.debug:
+            tracer.emit(DEBUG, "choose", agent=self.name, policy="Cautious", shop=shop_choice)
+        return shop_choice
+
+
+class CompactCheapOnlyAgent(CheapOnlyPolicy, CompactAgentPOMDP):
+    """Slotted CheapOnlyAgent."""
+    __slots__ = ()
+
+
+class CompactAgent(_LazyMemory, BasicPolicy):
+    """Slotted Agent (the basic q-value agent) without its unused belief fields.
+
+    `state` and `q_values` are views onto energy/money and the q list.
+    """
+    __slots__ = ("name", "rng", "energy", "money", "shop_names", "shop_ids", "q",
+                 "epsilon", "_memory", "_memory_limit", "replay", "q_policy")
+
+    def __init__(self, name, energy=50, money=100, epsilon=0.1, rng=None,
+                 q_values=(("CheapShop", 5), ("PremiumShop", 10)), memory_limit=MEMORY_LIMIT):
+        self.name = name
+        self.rng = rng if rng is not None else random
+        self.energy = energy
+        self.money = money
+        self.shop_names, self.shop_ids = _shop_index(shop for shop, _ in q_values)
+        self.q = [value for _, value in q_values]
+        self.epsilon = epsilon
+        self._memory = None
+        self._memory_limit = memory_limit
+        self.replay = None
+        self.q_policy = None
+
+    @property
+    def state(self):
+        return _FieldView(self, ("energy", "money"))
+
+    @property
+    def q_values(self):
+        return _ShopMap(self, field="q")
+
+    def resources(self):
+        return self.energy, self.money
+
+    def q_value(self, shop):
+        return self.q[self.shop_ids[shop]]
+
+    def adjust_q(self, shop, delta):
+        self.q[self.shop_ids[shop]] += delta
+
+    def apply_outcome(self, energy, money=0):
+        self.energy += energy
+        self.money += money
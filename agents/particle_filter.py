@@ -0,0 +1,92 @@
+import numpy as np
+
+
+class ParticleBeliefs:
+    """Particle-filter beliefs over every shop's cost and success rate for a whole population.
+
+    Particles live in (n_agents, n_shops, n_particles) arrays, so a day of
+    predictions, reweighting and resampling is a handful of array operations
+    however many agents there are:
+
+        predict()           random-walk diffusion (prices drift every day)
+        observe_costs()     Gaussian likelihood of noisy cost observations
+        observe_outcomes()  Bernoulli likelihood of purchase successes / failures
+        expected_cost(), success_rate()   weighted posterior means
+
+    Rows whose effective sample size falls below `resample_below` * n_particles
+    are resampled (systematic resampling, vectorized across rows).
+    """
+
+    def __init__(self, expected_cost, trust, n_particles=64, cost_spread=3.0, success_spread=0.25,
+                 obs_noise=2.0, cost_drift=1.0, success_drift=0.02, resample_below=0.5, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        expected_cost = np.asarray(expected_cost, dtype=np.float64)
+        trust = np.asarray(trust, dtype=np.float64)
+        shape = expected_cost.shape + (n_particles,)
+        self.n_particles = n_particles
+        self.obs_noise = obs_noise
+        self.cost_drift = cost_drift
+        self.success_drift = success_drift
+        self.resample_below = resample_below
+
+        self.cost = np.maximum(1.0, expected_cost[..., None] + self.rng.normal(0.0, cost_spread, shape))
+        self.success = np.clip(trust[..., None] + self.rng.normal(0.0, success_spread, shape), 0.0, 1.0)
+        self.weights = np.full(shape, 1.0 / n_particles)
+
+    def predict(self, idx):
+        """Diffuse the particles of agents idx by one day of drift."""
+        shape = (len(idx),) + self.cost.shape[1:]
+        self.cost[idx] = np.maximum(1.0, self.cost[idx] + self.rng.normal(0.0, self.cost_drift, shape))
+        self.success[idx] = np.clip(self.success[idx] + self.rng.normal(0.0, self.success_drift, shape), 0.0, 1.0)
+
+    def observe_costs(self, idx, observed):
+        """Reweight on observed costs, shape (len(idx), n_shops)."""
+        z = (np.asarray(observed)[..., None] - self.cost[idx]) / self.obs_noise
+        self._reweight(idx, None, np.exp(-0.5 * z * z))
+
+    def observe_outcomes(self, idx, shop, success):
+        """Reweight shop `shop[k]` of agent `idx[k]` on a purchase success / failure."""
+        if len(idx) == 0:
+            return
+        p = np.clip(self.success[idx, shop], 0.01, 0.99)
+        likelihood = np.where(np.asarray(success)[:, None], p, 1.0 - p)
+        self._reweight(idx, shop, likelihood)
+
+    def _reweight(self, idx, shop, likelihood):
+        key = idx if shop is None else (idx, shop)
+        weights = self.weights[key] * likelihood
+        total = weights.sum(axis=-1, keepdims=True)
+        # Rows where every particle became impossible start again from uniform weights
+        weights = np.where(total > 0, weights / np.where(total > 0, total, 1.0), 1.0 / self.n_particles)
+        self.weights[key] = weights
+        self._resample(key)
+
+    def _resample(self, key):
+        weights = self.weights[key].reshape(-1, self.n_particles)
+        ess = 1.0 / np.sum(weights * weights, axis=1)
+        rows = np.flatnonzero(ess < self.resample_below * self.n_particles)
+        if len(rows) == 0:
+            return
+        P = self.n_particles
+        offsets = np.arange(len(rows))[:, None]
+        cumulative = np.cumsum(weights[rows], axis=1)
+        cumulative[:, -1] = 1.0
+        positions = (self.rng.random((len(rows), 1)) + np.arange(P)) / P
+        picks = np.searchsorted((cumulative + offsets).ravel(), (positions + offsets).ravel())
+        picks = np.clip(picks.reshape(len(rows), P) - offsets * P, 0, P - 1)
+
+        for name in ("cost", "success"):
+            values = getattr(self, name)[key].reshape(-1, P)
+            values[rows] = np.take_along_axis(values[rows], picks, axis=1)
+            getattr(self, name)[key] = values.reshape(getattr(self, name)[key].shape)
+        weights[rows] = 1.0 / P
+        self.weights[key] = weights.reshape(self.weights[key].shape)
+
+    def expected_cost(self, idx=slice(None)):
+        return np.sum(self.weights[idx] * self.cost[idx], axis=-1)
+
+    def success_rate(self, idx=slice(None)):
+        return np.sum(self.weights[idx] * self.success[idx], axis=-1)
+
+    def effective_sample_size(self):
+        return 1.0 / np.sum(self.weights * self.weights, axis=-1)
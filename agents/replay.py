@@ -0,0 +1,154 @@
+from functools import lru_cache
+
+import numpy as np
+
+from environment.actions import ActionIndex
+
+# Default agent.memory length: agents keep the newest MEMORY_LIMIT (action, result)
+# labels in a deque (pass memory_limit=None for the full history); learning
+# experiences belong in a ReplayBuffer (see ReplayPolicy.use_replay)
+MEMORY_LIMIT = 1000
+
+
+@lru_cache(maxsize=None)
+def _action_index(shop_names):
+    return ActionIndex(shop_names)
+
+
+class ReplayPolicy:
+    """Experience-replay opt-in shared by the basic and POMDP agent policies.
+
+    Agents provide resources() -> (energy, money) and a `replay` attribute
+    (None until use_replay is called).
+    """
+    __slots__ = ()
+
+    def use_replay(self, buffer=None, capacity=10000):
+        """Record (state, action, reward, next state, done) experiences from every action.
+
+        Without a buffer, agents of the same class share ReplayBuffer.shared(type(self)).
+        States are (energy, money), actions ActionIndex codes and the reward the
+        change in energy + money.
+        """
+        self.replay = buffer if buffer is not None else ReplayBuffer.shared(type(self), capacity=capacity)
+        return self.replay
+
+    def record_experience(self, before, action, shop_names=None):
+        """Add the step from `before` (resources() before acting) to self.replay.
+
+        `action` is an ActionIndex code, or an action name with `shop_names`.
+        """
+        if shop_names is not None:
+            action = _action_index(tuple(shop_names)).codes[action]
+        after = self.resources()
+        self.replay.add(before, action, sum(after) - sum(before), after, after[0] <= 0 or after[1] <= 0)
+
+
+class ReplayBuffer:
+    """Fixed-capacity experience replay stored in preallocated NumPy columns.
+
+    state / next_state are (capacity, state_dim) float32, action int16, reward
+    float32 and done bool. Insertion writes one row at the ring position (the
+    oldest experience is overwritten once full), so memory stays flat however
+    long training runs.
+
+    sample() draws a uniform minibatch; sample(prioritized=True) draws
+    proportionally to priority ** alpha and returns importance weights
+    (normalized to max 1) plus the row indices for update_priorities().
+    New experiences get the current maximum priority so they are seen at
+    least once.
+
+    Buffers returned by ReplayBuffer.shared(key) are shared by every agent of
+    the same class (or any other key).
+    """
+
+    _shared = {}
+
+    def __init__(self, capacity, state_dim=2, alpha=0.6, rng=None):
+        self.capacity = capacity
+        self.alpha = alpha
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.state = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.next_state = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.action = np.zeros(capacity, dtype=np.int16)
+        self.reward = np.zeros(capacity, dtype=np.float32)
+        self.done = np.zeros(capacity, dtype=bool)
+        self.priority = np.zeros(capacity, dtype=np.float64)
+        self.position = 0
+        self.size = 0
+        self.max_priority = 1.0
+
+    @classmethod
+    def shared(cls, key, capacity=10000, **kwargs):
+        """The buffer shared under `key` (e.g. an agent class), created on first use."""
+        buffer = cls._shared.get(key)
+        if buffer is None:
+            buffer = cls._shared[key] = cls(capacity, **kwargs)
+        return buffer
+
+    @classmethod
+    def clear_shared(cls):
+        cls._shared.clear()
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        i = self.position
+        self.state[i] = state
+        self.action[i] = action
+        self.reward[i] = reward
+        self.next_state[i] = next_state
+        self.done[i] = done
+        self.priority[i] = self.max_priority
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """Insert aligned arrays of experiences (wrapping around the ring)."""
+        n = len(actions)
+        if n > self.capacity:  # Only the newest `capacity` rows survive anyway
+            states, actions, rewards, next_states, dones = (
+                np.asarray(c)[-self.capacity:] for c in (states, actions, rewards, next_states, dones))
+            n = self.capacity
+        rows = (self.position + np.arange(n)) % self.capacity
+        self.state[rows] = states
+        self.action[rows] = actions
+        self.reward[rows] = rewards
+        self.next_state[rows] = next_states
+        self.done[rows] = dones
+        self.priority[rows] = self.max_priority
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def _batch(self, rows):
+        return {
+            "state": self.state[rows],
+            "action": self.action[rows],
+            "reward": self.reward[rows],
+            "next_state": self.next_state[rows],
+            "done": self.done[rows],
+        }
+
+    def sample(self, batch_size, prioritized=False, beta=0.4):
+        """Minibatch of column arrays; prioritized batches add "indices" and "weights"."""
+        if self.size == 0:
+            raise ValueError("Cannot sample from an empty ReplayBuffer")
+        if not prioritized:
+            return self._batch(self.rng.integers(0, self.size, batch_size))
+
+        p = self.priority[:self.size] ** self.alpha
+        cumulative = np.cumsum(p)
+        rows = np.searchsorted(cumulative, self.rng.random(batch_size) * cumulative[-1], side="right")
+        rows = np.minimum(rows, self.size - 1)
+        probs = p[rows] / cumulative[-1]
+        weights = (self.size * probs) ** -beta
+        batch = self._batch(rows)
+        batch["indices"] = rows
+        batch["weights"] = (weights / weights.max()).astype(np.float32)
+        return batch
+
+    def update_priorities(self, indices, td_errors, eps=1e-6):
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + eps
+        self.priority[indices] = priorities
+        self.max_priority = max(self.max_priority, priorities.max(initial=0.0))
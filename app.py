@@ -8,6 +8,7 @@ import plotly.express as px
 
 
 from agents.agent import Agent
+from environment.q_learning import QLearningPopulation
 from utils.updater import update_shop_prices
 
 # Default world settings
@@ -43,6 +44,7 @@ st.title("🧠 Multi-Agent Competition Simulator")
 
 num_agents = st.slider("Number of Agents", 1, 20, 5)
 num_days = st.slider("Number of Days to Simulate", 1, 100, 10)
+pretrain_episodes = st.slider("Q-learning Pre-training Episodes (0 = fixed rules)", 0, 500, 0)
 
 # Button to start simulation
 if st.button("Run Simulation"):
@@ -50,6 +52,14 @@ if st.button("Run Simulation"):
     agents = [Agent(name=f"Agent{i+1}") for i in range(num_agents)]
     agent_names = [agent.name for agent in agents]
 
+    # Optionally pre-train state-based Q-tables; the agents then act on them
+    if pretrain_episodes:
+        population = QLearningPopulation.from_agents(agents, list(food_shops))
+        population.train(food_shops, actions, pretrain_episodes, num_days)
+        population.write_back(agents)
+        for agent in agents:
+            agent.state.update(energy=50, money=100)
+
     # Track energy and wealth histories
     energy_histories = {name: [] for name in agent_names}
     wealth_histories = {name: [] for name in agent_names}
@@ -0,0 +1,273 @@
+# benchmarks/bench_simulation.py
+"""Throughput and scaling benchmarks for the simulation hot loop.
+
+Sweeps agent, shop and day counts over the per-agent hot paths
+(EnvironmentManager.apply_agent_action / generate_noisy_observation,
+AgentPOMDP.update_belief / think), full training episodes and the vectorized
+Population engine. Reports agent-steps/sec and peak traced memory, and can
+save or compare against a JSON baseline to catch regressions.
+
+    python -m benchmarks.bench_simulation --quick
+    python -m benchmarks.bench_simulation --save          # record baselines
+    python -m benchmarks.bench_simulation --compare       # exit 1 on regression
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from agents.agent_variants import GreedyAgent
+from environment.population import Population
+from environment.world_pomdp import EnvironmentManager
+from simulation.stream import stream_training
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+actions = {
+    "move": {"energy_cost": 15},
+    "rest": {"energy_gain": 10}
+}
+
+
+def make_shops(n_shops):
+    """CheapShop and PremiumShop (which reset_day relies on) plus generic extra shops."""
+    shops = {
+        "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+        "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9},
+    }
+    for i in range(2, n_shops):
+        shops[f"Shop{i}"] = {"cost": 10 + i, "energy_gain": 30, "success_rate": 0.8}
+    return shops
+
+
+def make_agents(n_agents, shop_names):
+    agents = [GreedyAgent(f"Greedy{i + 1}") for i in range(n_agents)]
+    for agent in agents:
+        for shop in shop_names:
+            agent.beliefs.setdefault(shop, {"expected_cost": 15.0, "trust": 0.8})
+    return agents
+
+
+def bench_apply_agent_action(n_agents, n_shops, n_days):
+    food_shops = make_shops(n_shops)
+    env = EnvironmentManager(food_shops, actions)
+    agents = make_agents(n_agents, list(food_shops))
+    plan = [agent.decide(env.action_index) for agent in agents]
+
+    def run():
+        for _ in range(n_days):
+            env.shop_taken_today = {}
+            env.shop_load_today = {}
+            for agent, action in zip(agents, plan):
+                agent.true_state["energy"] = 120
+                env.apply_agent_action(agent, action)
+            for agent in agents:
+                agent.memory.clear()
+    return run
+
+
+def bench_generate_noisy_observation(n_agents, n_shops, n_days):
+    env = EnvironmentManager(make_shops(n_shops), actions)
+
+    def run():
+        for _ in range(n_days * n_agents):
+            env.generate_noisy_observation()
+    return run
+
+
+def bench_update_belief(n_agents, n_shops, n_days):
+    food_shops = make_shops(n_shops)
+    env = EnvironmentManager(food_shops, actions)
+    agents = make_agents(n_agents, list(food_shops))
+    observations = env.generate_noisy_observation()
+
+    def run():
+        for _ in range(n_days):
+            for agent in agents:
+                agent.update_belief(observations)
+    return run
+
+
+def bench_think(n_agents, n_shops, n_days):
+    agents = make_agents(n_agents, list(make_shops(n_shops)))
+
+    def run():
+        for _ in range(n_days):
+            for agent in agents:
+                agent.think()
+    return run
+
+
+def bench_episode(n_agents, n_shops, n_days):
+    food_shops = make_shops(n_shops)
+
+    def run():
+        agents = make_agents(n_agents, list(food_shops))
+        steps = 0
+        for record in stream_training(food_shops, actions, agents, 1, n_days):
+            if record["kind"] == "day":
+                steps += len(record["acted"])
+        return steps  # agents collapse along the way, so count the steps actually taken
+    return run
+
+
+def bench_population(n_agents, n_shops, n_days):
+    food_shops = make_shops(n_shops)
+
+    def run():
+        env = EnvironmentManager(food_shops, actions)
+        pop = Population.spawn(n_agents, list(food_shops), rng=np.random.default_rng(0))
+        steps = 0
+        for _ in range(n_days):
+            env.reset_day()
+            idx, _, _ = pop.step(env)
+            steps += len(idx)
+        return steps
+    return run
+
+
+CASES = {
+    "apply_agent_action": bench_apply_agent_action,
+    "generate_noisy_observation": bench_generate_noisy_observation,
+    "update_belief": bench_update_belief,
+    "think": bench_think,
+    "episode": bench_episode,
+    "population": bench_population,
+}
+
+
+def case_key(case, n_agents, n_shops, n_days):
+    return f"{case}[agents={n_agents},shops={n_shops},days={n_days}]"
+
+
+def measure(make_run, repeat):
+    """Best wall time over `repeat` runs, then one traced run for peak memory.
+
+    Returns (seconds, peak_bytes, steps); steps is whatever the run returned
+    (None when the run does a fixed amount of work).
+    """
+    best = float("inf")
+    steps = None
+    for _ in range(repeat):
+        run = make_run()
+        start = time.perf_counter()
+        steps = run()
+        best = min(best, time.perf_counter() - start)
+
+    run = make_run()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, steps
+
+
+def run_suite(cases, agent_counts, shop_counts, day_counts, repeat=3):
+    random.seed(0)
+    results = []
+    for case in cases:
+        for n_agents in agent_counts:
+            for n_shops in shop_counts:
+                for n_days in day_counts:
+                    seconds, peak, steps = measure(lambda: CASES[case](n_agents, n_shops, n_days), repeat)
+                    if steps is None:
+                        steps = n_agents * n_days
+                    results.append({
+                        "key": case_key(case, n_agents, n_shops, n_days),
+                        "case": case,
+                        "agents": n_agents,
+                        "shops": n_shops,
+                        "days": n_days,
+                        "agent_steps": steps,
+                        "seconds": seconds,
+                        "steps_per_sec": steps / seconds if seconds > 0 else float("inf"),
+                        "peak_mb": peak / 2 ** 20,
+                    })
+    return results
+
+
+def load_baselines(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baselines(results, path=BASELINE_PATH):
+    payload = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "results": {r["key"]: {"steps_per_sec": r["steps_per_sec"], "peak_mb": r["peak_mb"]} for r in results},
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def compare(results, baselines, tolerance=0.2):
+    """Return the results that are slower (or use more memory) than baseline beyond tolerance."""
+    regressions = []
+    for r in results:
+        base = baselines.get(r["key"])
+        if base is None:
+            continue
+        slower = r["steps_per_sec"] < base["steps_per_sec"] * (1 - tolerance)
+        heavier = r["peak_mb"] > base["peak_mb"] * (1 + tolerance) + 0.5
+        if slower or heavier:
+            regressions.append(dict(r, baseline_steps_per_sec=base["steps_per_sec"], baseline_peak_mb=base["peak_mb"]))
+    return regressions
+
+
+def format_table(results):
+    lines = [f"{'case':<58} {'steps/s':>14} {'peak MB':>9}"]
+    for r in results:
+        lines.append(f"{r['key']:<58} {r['steps_per_sec']:>14,.0f} {r['peak_mb']:>9.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--agents", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--shops", nargs="+", type=int, default=[2, 8])
+    parser.add_argument("--days", nargs="+", type=int, default=[10, 50])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="small sweep for smoke runs")
+    parser.add_argument("--save", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if slower than the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--json", help="also write raw results to this path")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.agents, args.shops, args.days, args.repeat = [10, 100], [2], [10], 1
+
+    results = run_suite(args.cases, args.agents, args.shops, args.days, repeat=args.repeat)
+    print(format_table(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save:
+        save_baselines(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        regressions = compare(results, load_baselines(args.baseline), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['key']}: {r['steps_per_sec']:,.0f} steps/s "
+                  f"(baseline {r['baseline_steps_per_sec']:,.0f}), {r['peak_mb']:.2f} MB "
+                  f"(baseline {r['baseline_peak_mb']:.2f})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
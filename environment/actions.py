@@ -0,0 +1,59 @@
+# actions.py
+"""Integer action and result codes.
+
+Actions are compiled once per shop list into an ActionIndex: "move" and
+"rest" come first, then one buy action per shop, so a buy code maps to its
+shop id with a list index instead of parsing "buy_food_<shop>". The action
+names are kept for display and for code that still passes strings.
+"""
+
+from functools import lru_cache
+
+# Action codes: the fixed actions, then buy at shop j is ACTION_BUY + j
+ACTION_MOVE = 0
+ACTION_REST = 1
+ACTION_BUY = 2
+
+# Result codes shared by EnvironmentManager, Population and the recorders
+RESULT_FAIL = 0
+RESULT_SUCCESS = 1
+RESULT_MOVE = 2
+RESULT_REST = 3
+RESULT_LABELS = ("fail", "success", "move", "rest")
+RESULT_CODES = {label: code for code, label in enumerate(RESULT_LABELS)}
+
+
+class ActionIndex:
+    def __init__(self, shop_names):
+        self.shop_names = list(shop_names)
+        self.shop_ids = {shop: j for j, shop in enumerate(self.shop_names)}
+        self.names = ["move", "rest"] + [f"buy_food_{shop}" for shop in self.shop_names]
+        self.codes = {name: code for code, name in enumerate(self.names)}
+        self.buy_codes = {shop: ACTION_BUY + j for j, shop in enumerate(self.shop_names)}
+        self.shop_of = [-1] * ACTION_BUY + list(range(len(self.shop_names)))  # shop id per code, -1 if not a buy
+
+    def __len__(self):
+        return len(self.names)
+
+    def encode(self, action):
+        """Action code for a name such as "buy_food_CheapShop" (codes pass through)."""
+        return self.codes[action] if isinstance(action, str) else action
+
+    def decode(self, code):
+        return self.names[code]
+
+    def buy(self, shop):
+        """Buy code for a shop name or shop id."""
+        return self.buy_codes[shop] if isinstance(shop, str) else ACTION_BUY + shop
+
+
+@lru_cache(maxsize=None)
+def split_action(action):
+    """("buy", shop) or (action, None) for an action string, memoized.
+
+    For the agents' standalone act() methods, which receive action strings
+    without an ActionIndex.
+    """
+    if action.startswith("buy_food"):
+        return "buy", action.split("_")[-1]
+    return action, None
@@ -0,0 +1,80 @@
+import numpy as np
+
+from environment.population import shop_table
+
+
+class BatchedEnvironment:
+    """N independent copies of EnvironmentManager advanced in lockstep.
+
+    Shop state is kept in (num_worlds, num_shops) arrays so that daily events,
+    price jitter and shop contention are computed for every world at once.
+    Pair it with a Population whose ``world`` array assigns agents to worlds
+    (see Population.replicate).
+    """
+
+    def __init__(self, food_shops, actions, num_worlds, rng=None, shop_capacity=1, queueing="order"):
+        self.num_worlds = num_worlds
+        self.shop_names = list(food_shops.keys())
+        self.actions = actions
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.day = 0
+
+        cost, success, gain = shop_table(food_shops, self.shop_names)
+        self.base_cost = cost  # values restored by reset_day when no event hits
+        self.base_success_rate = success
+        self.cost = np.tile(cost, (num_worlds, 1))
+        self.success_rate = np.tile(success, (num_worlds, 1))
+        self.energy_gain = np.tile(gain, (num_worlds, 1))
+        if isinstance(shop_capacity, dict):
+            shop_capacity = [shop_capacity.get(s, 1) for s in self.shop_names]
+        self.capacity = np.broadcast_to(np.asarray(shop_capacity, dtype=np.int64), (len(self.shop_names),)).copy()
+        self.queueing = queueing
+        self.load = np.zeros((num_worlds, len(self.shop_names)), dtype=np.int64)  # buyers served today
+
+        # Per-world event log, same shape as EnvironmentManager.world_events
+        self.world_events = [[] for _ in range(num_worlds)]
+        self.closed_today = np.zeros(num_worlds, dtype=bool)
+        self.discounted_today = np.zeros(num_worlds, dtype=bool)
+
+        self._cheap = self.shop_names.index("CheapShop") if "CheapShop" in self.shop_names else None
+        self._premium = self.shop_names.index("PremiumShop") if "PremiumShop" in self.shop_names else None
+
+    def reset_day(self):
+        """Vectorized EnvironmentManager.reset_day over every world."""
+        self.load[:] = 0
+        self.day += 1
+
+        self.closed_today = self.rng.random(self.num_worlds) < 0.1
+        if self._cheap is not None:
+            self.success_rate[:, self._cheap] = np.where(self.closed_today, 0.0, self.base_success_rate[self._cheap])
+
+        self.discounted_today = self.rng.random(self.num_worlds) < 0.1
+        if self._premium is not None:
+            cost = self.cost[:, self._premium]
+            self.cost[:, self._premium] = np.where(self.discounted_today, np.maximum(1, cost - 5), self.base_cost[self._premium])
+
+        self.update_shop_prices()
+
+        for w in np.flatnonzero(self.closed_today | self.discounted_today):
+            event_today = []
+            if self.closed_today[w]:
+                event_today.append("CheapShop Closed")
+            if self.discounted_today[w]:
+                event_today.append("PremiumShop Discounted")
+            self.world_events[w].append({"day": self.day, "events": event_today})
+
+    def update_shop_prices(self, price_variation=2):
+        """Randomly adjust every shop price in every world."""
+        change = self.rng.integers(-price_variation, price_variation + 1, size=self.cost.shape)
+        self.cost = np.maximum(1, self.cost + change)
+
+    def world_shops(self, world):
+        """Return world ``world`` as a food_shops dict (a copy, for display/analysis)."""
+        return {
+            shop: {
+                "cost": self.cost[world, j].item(),
+                "energy_gain": self.energy_gain[world, j].item(),
+                "success_rate": self.success_rate[world, j].item(),
+            }
+            for j, shop in enumerate(self.shop_names)
+        }
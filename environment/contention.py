@@ -0,0 +1,51 @@
+import numpy as np
+
+QUEUEING = ("order", "random", "priority")
+
+
+def resolve_contention(shop_ids, remaining, queueing="order", priority=None, rng=None, groups=None):
+    """Decide in bulk which purchase requests of a day are served.
+
+    shop_ids:  (n,) shop index requested by each buyer, in request order.
+    remaining: (n_shops,) or (n_groups, n_shops) free places left per shop.
+    queueing:  "order"    - first come, first served (request order),
+               "random"   - uniformly random order within each shop,
+               "priority" - highest `priority` first, ties in request order.
+    groups:    optional (n,) group index (e.g. world) when `remaining` is 2-D.
+
+    Returns a boolean mask of served requests. Buyers are sorted once by
+    (shop, queue position) and served while their rank is below the shop's
+    remaining capacity, so there is no per-buyer dictionary probe.
+    """
+    shop_ids = np.asarray(shop_ids, dtype=np.int64)
+    n = len(shop_ids)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    remaining = np.asarray(remaining)
+    n_shops = remaining.shape[-1]
+    keys = shop_ids if groups is None else np.asarray(groups, dtype=np.int64) * n_shops + shop_ids
+
+    if queueing == "order":
+        tiebreak = np.arange(n)
+    elif queueing == "random":
+        rng = rng if rng is not None else np.random.default_rng()
+        tiebreak = rng.permutation(n)
+    elif queueing == "priority":
+        if priority is None:
+            raise ValueError("queueing='priority' needs a priority array")
+        tiebreak = np.lexsort((np.arange(n), -np.asarray(priority, dtype=np.float64)))
+        tiebreak = np.argsort(tiebreak)  # queue position of each request
+    else:
+        raise ValueError(f"Unknown queueing: {queueing!r} (expected one of {QUEUEING})")
+
+    order = np.lexsort((tiebreak, keys))
+    sorted_keys = keys[order]
+    # Rank of each request within its (group, shop) queue
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    run_lengths = np.diff(np.r_[starts, n])
+    rank = np.arange(n) - np.repeat(starts, run_lengths)
+
+    served = np.empty(n, dtype=bool)
+    served[order] = rank < remaining.ravel()[sorted_keys]
+    return served
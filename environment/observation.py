@@ -0,0 +1,29 @@
+import numpy as np
+
+NOISE_MODELS = ("independent", "shared", "correlated")
+
+
+def observation_noise(rng, n_agents, n_shops, model="independent", correlation=0.5, groups=None, spread=3):
+    """Integer cost noise in [-spread, spread] for an (n_agents, n_shops) observation matrix.
+
+    - "independent": every agent draws its own noise (the per-agent behaviour).
+    - "shared": every agent in a group (default: everyone) sees the same noise.
+    - "correlated": a shared component blended with individual noise,
+      `correlation` being the weight of the shared part.
+
+    `groups` assigns agents to groups (e.g. Population.world) for the shared part.
+    """
+    if model == "independent":
+        return rng.integers(-spread, spread + 1, size=(n_agents, n_shops))
+    if model not in NOISE_MODELS:
+        raise ValueError(f"Unknown noise model: {model!r} (expected one of {NOISE_MODELS})")
+
+    if groups is None:
+        groups = np.zeros(n_agents, dtype=np.int64)
+    n_groups = int(groups.max()) + 1 if n_agents else 1
+    common = rng.integers(-spread, spread + 1, size=(n_groups, n_shops))[groups]
+    if model == "shared":
+        return common
+
+    individual = rng.integers(-spread, spread + 1, size=(n_agents, n_shops))
+    return np.rint(correlation * common + (1 - correlation) * individual).astype(np.int64)
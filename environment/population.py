@@ -0,0 +1,281 @@
+import numpy as np
+
+from environment.actions import RESULT_FAIL, RESULT_SUCCESS
+from environment.contention import resolve_contention
+from environment.observation import observation_noise
+
+# Policy codes (one per agent class behaviour)
+POLICY_GREEDY = 0      # epsilon-greedy on trust / expected_cost (AgentPOMDP, Greedy, Explorer)
+POLICY_CAUTIOUS = 1    # highest trust only
+POLICY_CHEAP_ONLY = 2  # always CheapShop
+
+POLICY_BY_CLASS = {
+    "CautiousAgent": POLICY_CAUTIOUS,
+    "CheapOnlyAgent": POLICY_CHEAP_ONLY,
+    "CompactCautiousAgent": POLICY_CAUTIOUS,
+    "CompactCheapOnlyAgent": POLICY_CHEAP_ONLY,
+}
+
+# Initial belief priors per shop: (expected_cost, cost_jitter, trust, trust_jitter)
+BELIEF_PRIORS = {
+    "CheapShop": (10, 2, 0.8, 0.3),
+    "PremiumShop": (20, 1, 0.9, 0.1),
+}
+
+# Extra energy granted on a successful purchase (see EnvironmentManager.apply_agent_action)
+SUCCESS_BONUS = {"PremiumShop": 5}
+
+
+def shop_table(food_shops, shop_names):
+    """Return (cost, success_rate, energy_gain) arrays in shop_names order."""
+    cost = np.array([food_shops[s]["cost"] for s in shop_names], dtype=np.float64)
+    success = np.array([food_shops[s]["success_rate"] for s in shop_names], dtype=np.float64)
+    gain = np.array([food_shops[s]["energy_gain"] for s in shop_names], dtype=np.float64)
+    return cost, success, gain
+
+
+def world_arrays(env, shop_names):
+    """Return (cost, success_rate, energy_gain, remaining) arrays shaped (n_worlds, n_shops).
+
+    `remaining` is the number of buyers each shop can still serve today.
+    Works for a single EnvironmentManager (one world) as well as a
+    BatchedEnvironment, which already keeps its shop state in arrays.
+    """
+    if hasattr(env, "load"):
+        return env.cost, env.success_rate, env.energy_gain, env.capacity - env.load
+    cost, success, gain = shop_table(env.food_shops, shop_names)
+    remaining = np.array([env.shop_capacity[s] - env.shop_load_today.get(s, 0) for s in shop_names])
+    return cost[None], success[None], gain[None], remaining[None]
+
+
+class Population:
+    """Struct-of-arrays population of POMDP agents.
+
+    Keeps energy, money, expected_cost and trust in contiguous NumPy arrays and
+    steps a whole day (observe -> update_belief -> think -> act -> is_agent_alive)
+    with batched array operations. Semantics follow AgentPOMDP together with
+    EnvironmentManager.apply_agent_action, agents being served in index order.
+    """
+
+    def __init__(self, names, shop_names, energy, money, expected_cost, trust,
+                 epsilon, policy, agent_types=None, world=None, rng=None):
+        self.names = list(names)
+        self.shop_names = list(shop_names)
+        self.agent_types = list(agent_types) if agent_types is not None else ["AgentPOMDP"] * len(self.names)
+        self.energy = np.asarray(energy, dtype=np.float64).copy()
+        self.money = np.asarray(money, dtype=np.float64).copy()
+        self.expected_cost = np.asarray(expected_cost, dtype=np.float64).copy()
+        self.trust = np.asarray(trust, dtype=np.float64).copy()
+        self.epsilon = np.asarray(epsilon, dtype=np.float64).copy()
+        self.policy = np.asarray(policy, dtype=np.int8).copy()
+        self.days_alive = np.zeros(len(self.names), dtype=np.int64)
+        # Index of the world each agent lives in (all zeros for a single EnvironmentManager)
+        if world is None:
+            self.world = np.zeros(len(self.names), dtype=np.int64)
+        else:
+            self.world = np.asarray(world, dtype=np.int64).copy()
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        bonus = [SUCCESS_BONUS.get(s, 0) for s in self.shop_names]
+        self.success_bonus = np.array(bonus, dtype=np.float64)
+        self.cheap_shop = self.shop_names.index("CheapShop") if "CheapShop" in self.shop_names else 0
+        self.particles = None  # optional agents.particle_filter.ParticleBeliefs backend
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_agents(cls, agents, shop_names=None, rng=None):
+        """Build a population from existing AgentPOMDP objects (state is copied)."""
+        if shop_names is None:
+            shop_names = list(agents[0].beliefs.keys()) if agents else []
+        return cls(
+            names=[a.name for a in agents],
+            shop_names=shop_names,
+            energy=[a.true_state["energy"] for a in agents],
+            money=[a.true_state["money"] for a in agents],
+            expected_cost=[[a.beliefs[s]["expected_cost"] for s in shop_names] for a in agents],
+            trust=[[a.beliefs[s]["trust"] for s in shop_names] for a in agents],
+            epsilon=[a.epsilon for a in agents],
+            policy=[POLICY_BY_CLASS.get(a.__class__.__name__, POLICY_GREEDY) for a in agents],
+            agent_types=[a.__class__.__name__ for a in agents],
+            rng=rng,
+        )
+
+    @classmethod
+    def spawn(cls, n, shop_names, policy=POLICY_GREEDY, epsilon=0.1, energy=120, money=100,
+              agent_type="AgentPOMDP", prefix="Agent", rng=None):
+        """Create n fresh agents with the same belief priors as AgentPOMDP.__init__."""
+        rng = rng if rng is not None else np.random.default_rng()
+        expected_cost = np.empty((n, len(shop_names)))
+        trust = np.empty((n, len(shop_names)))
+        for j, shop in enumerate(shop_names):
+            cost0, cost_jit, trust0, trust_jit = BELIEF_PRIORS.get(shop, (10, 2, 0.8, 0.3))
+            expected_cost[:, j] = cost0 + rng.uniform(-cost_jit, cost_jit, n)
+            trust[:, j] = np.minimum(trust0 + rng.uniform(-trust_jit, trust_jit, n), 1.0)
+        return cls(
+            names=[f"{prefix}{i + 1}" for i in range(n)],
+            shop_names=shop_names,
+            energy=np.full(n, energy),
+            money=np.full(n, money),
+            expected_cost=expected_cost,
+            trust=trust,
+            epsilon=np.broadcast_to(epsilon, (n,)),
+            policy=np.broadcast_to(policy, (n,)),
+            agent_types=[agent_type] * n,
+            rng=rng,
+        )
+
+    def replicate(self, num_worlds):
+        """Copy this population into num_worlds independent worlds (agents tiled per world)."""
+        n = len(self)
+        return Population(
+            names=self.names * num_worlds,
+            shop_names=self.shop_names,
+            energy=np.tile(self.energy, num_worlds),
+            money=np.tile(self.money, num_worlds),
+            expected_cost=np.tile(self.expected_cost, (num_worlds, 1)),
+            trust=np.tile(self.trust, (num_worlds, 1)),
+            epsilon=np.tile(self.epsilon, num_worlds),
+            policy=np.tile(self.policy, num_worlds),
+            agent_types=self.agent_types * num_worlds,
+            world=np.repeat(np.arange(num_worlds), n),
+            rng=self.rng,
+        )
+
+    def write_back(self, agents):
+        """Copy array state back into the AgentPOMDP objects it was built from."""
+        for i, agent in enumerate(agents):
+            agent.true_state["energy"] = self.energy[i].item()
+            agent.true_state["money"] = self.money[i].item()
+            agent.epsilon = self.epsilon[i].item()
+            for j, shop in enumerate(self.shop_names):
+                agent.beliefs[shop]["expected_cost"] = self.expected_cost[i, j].item()
+                agent.beliefs[shop]["trust"] = self.trust[i, j].item()
+
+    def alive(self):
+        """Vectorized EnvironmentManager.is_agent_alive."""
+        return (self.energy > 0) & (self.money > 0)
+
+    def alive_per_world(self, num_worlds):
+        """Number of living agents in each world."""
+        return np.bincount(self.world[self.alive()], minlength=num_worlds)
+
+    def observe(self, env, mask, noise="independent", correlation=0.5):
+        """Noisy cost observation for every agent in mask, shape (n_masked, n_shops).
+
+        Shared / correlated noise is shared within each world.
+        """
+        cost, _, _, _ = world_arrays(env, self.shop_names)
+        world = self.world[mask]
+        noise_matrix = observation_noise(self.rng, len(world), len(self.shop_names), noise, correlation, groups=world)
+        return np.maximum(1, cost[world] + noise_matrix)
+
+    def use_particle_filter(self, n_particles=64, **kwargs):
+        """Switch beliefs to a particle filter seeded from the current expected_cost / trust.
+
+        expected_cost and trust then hold the posterior means of each shop's
+        cost and success rate, updated from observations and purchase outcomes
+        instead of the moving average and fixed trust nudges. Extra keyword
+        arguments go to ParticleBeliefs.
+        """
+        from agents.particle_filter import ParticleBeliefs
+
+        self.particles = ParticleBeliefs(self.expected_cost, self.trust, n_particles=n_particles,
+                                         rng=self.rng, **kwargs)
+        return self.particles
+
+    def update_belief(self, observed, mask):
+        """Moving average update of expected_cost (see AgentPOMDP.update_belief), or
+        a particle filter step after use_particle_filter()."""
+        if self.particles is not None:
+            idx = np.flatnonzero(mask)
+            self.particles.predict(idx)
+            self.particles.observe_costs(idx, observed)
+            self.expected_cost[idx] = self.particles.expected_cost(idx)
+            return
+        self.expected_cost[mask] = 0.8 * self.expected_cost[mask] + 0.2 * observed
+
+    def think(self, mask):
+        """Pick a shop index for every agent in mask."""
+        idx = np.flatnonzero(mask)
+        policy = self.policy[idx]
+        trust = self.trust[idx]
+
+        choice = np.argmax(trust / self.expected_cost[idx], axis=1)
+
+        greedy = policy == POLICY_GREEDY
+        explore = greedy & (self.rng.random(len(idx)) < self.epsilon[idx])
+        choice[explore] = self.rng.integers(0, len(self.shop_names), size=int(explore.sum()))
+
+        cautious = policy == POLICY_CAUTIOUS
+        choice[cautious] = np.argmax(trust[cautious], axis=1)
+        choice[policy == POLICY_CHEAP_ONLY] = self.cheap_shop
+        return choice
+
+    def act(self, env, choice, mask):
+        """Apply buy actions for the agents in mask, mirroring apply_agent_action.
+
+        Shop places are allocated in bulk with resolve_contention, following
+        the environment's shop capacity and queueing ("priority" serves the
+        hungriest agents first).
+        """
+        idx = np.flatnonzero(mask)
+        cost, success_rate, gain, remaining = world_arrays(env, self.shop_names)
+        world = self.world[idx]
+        self.energy[idx] -= 2
+
+        queueing = getattr(env, "queueing", "order")
+        priority = -self.energy[idx] if queueing == "priority" else None
+        served = resolve_contention(choice, remaining, queueing, priority=priority, rng=self.rng, groups=world)
+
+        n_shops = len(self.shop_names)
+        if hasattr(env, "load"):
+            env.load += np.bincount(world[served] * n_shops + choice[served],
+                                    minlength=env.load.size).reshape(env.load.shape)
+        else:
+            for j in np.unique(choice[served]):
+                shop = self.shop_names[j]
+                takers = idx[served & (choice == j)]
+                env.shop_load_today[shop] = env.shop_load_today.get(shop, 0) + len(takers)
+                env.shop_taken_today.setdefault(shop, self.names[takers[0]])
+
+        roll = self.rng.random(len(idx))
+        won = served & (roll < success_rate[world, choice])
+        lost = served & ~won
+
+        results = np.where(won, RESULT_SUCCESS, RESULT_FAIL).astype(np.int8)
+
+        w, wc, ww = idx[won], choice[won], world[won]
+        self.money[w] -= cost[ww, wc]
+        self.energy[w] += gain[ww, wc] + self.success_bonus[wc]
+
+        l, lc = idx[lost], choice[lost]
+        self.energy[l] -= 5
+
+        self.energy[idx[~served]] -= 10
+
+        if self.particles is not None:
+            self.particles.observe_outcomes(idx[served], choice[served], won[served])
+            self.expected_cost[idx] = self.particles.expected_cost(idx)
+            self.trust[idx] = self.particles.success_rate(idx)
+        else:
+            self.trust[w, wc] += 0.05
+            self.trust[l, lc] -= 0.1
+            self.trust[idx] = np.clip(self.trust[idx], 0.0, 1.0)
+        return results
+
+    def step(self, env, noise="independent", correlation=0.5):
+        """Advance every living agent by one day in env.
+
+        Returns (idx, choice, results): indices of the agents that acted, their
+        shop indices and result codes.
+        """
+        mask = self.alive()
+        idx = np.flatnonzero(mask)
+        self.days_alive[idx] += 1
+        observed = self.observe(env, mask, noise, correlation)
+        self.update_belief(observed, mask)
+        choice = self.think(mask)
+        results = self.act(env, choice, mask)
+        return idx, choice, results
@@ -0,0 +1,196 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from environment.actions import (ActionIndex, ACTION_MOVE, ACTION_REST, ACTION_BUY,
+                                 RESULT_FAIL, RESULT_SUCCESS, RESULT_MOVE, RESULT_REST)
+from environment.contention import resolve_contention
+from environment.population import shop_table
+
+# Default state discretization: interior bin edges (len(edges) + 1 bins)
+ENERGY_EDGES = (20, 40, 60, 80, 100)
+MONEY_EDGES = (10, 25, 50, 75)
+
+# Reward added on the day an agent collapses (no bootstrapping past it)
+DEATH_PENALTY = -100.0
+
+
+class QPolicy:
+    """One agent's learned Q-table, as used by Agent.think (see QLearningPopulation.write_back).
+
+    `table` has shape (energy_bins, money_bins, n_actions) over the ActionIndex
+    codes of `shop_names`.
+    """
+
+    def __init__(self, table, shop_names, energy_edges=ENERGY_EDGES, money_edges=MONEY_EDGES):
+        self.table = np.asarray(table, dtype=np.float64)
+        self.index = ActionIndex(shop_names)
+        self.energy_edges = tuple(float(e) for e in energy_edges)
+        self.money_edges = tuple(float(m) for m in money_edges)
+
+    def choose(self, energy, money, food_shops, rng, epsilon):
+        """Epsilon-greedy action name for this state; unaffordable buys are excluded."""
+        allowed = [ACTION_MOVE, ACTION_REST] + [
+            ACTION_BUY + j for j, shop in enumerate(self.index.shop_names) if money >= food_shops[shop]["cost"]
+        ]
+        if rng.random() < epsilon:
+            code = rng.choice(allowed)
+        else:
+            q = self.table[bisect_right(self.energy_edges, energy), bisect_right(self.money_edges, money)]
+            code = max(allowed, key=q.__getitem__)
+        return self.index.names[code]
+
+
+class QLearningPopulation:
+    """Struct-of-arrays population of basic agents learning tabular Q-values.
+
+    Each agent owns a Q-table over discretized (energy, money) states and the
+    ActionIndex codes (move, rest, one buy per shop), stored together in one
+    (n_agents, energy_bins, money_bins, n_actions) array. step() runs a whole
+    day for every living agent: epsilon-greedy choice, the Agent.act dynamics
+    (shops serve buyers in index order up to `shop_capacity`) and a single
+    batched Q-learning update
+
+        Q[s, a] += alpha * (r + gamma * max_a' Q[s', a'] - Q[s, a])
+
+    with r the change in energy + money (DEATH_PENALTY on collapse).
+    """
+
+    def __init__(self, names, shop_names, energy=50, money=100, alpha=0.1, gamma=0.9, epsilon=0.1,
+                 energy_edges=ENERGY_EDGES, money_edges=MONEY_EDGES, rng=None):
+        self.names = list(names)
+        n = len(self.names)
+        self.shop_names = list(shop_names)
+        self.index = ActionIndex(self.shop_names)
+        self.energy = np.broadcast_to(np.asarray(energy, dtype=np.float64), (n,)).copy()
+        self.money = np.broadcast_to(np.asarray(money, dtype=np.float64), (n,)).copy()
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = np.broadcast_to(np.asarray(epsilon, dtype=np.float64), (n,)).copy()
+        self.energy_edges = np.asarray(energy_edges, dtype=np.float64)
+        self.money_edges = np.asarray(money_edges, dtype=np.float64)
+        self.q = np.zeros((n, len(self.energy_edges) + 1, len(self.money_edges) + 1, len(self.index)))
+        self.days_alive = np.zeros(n, dtype=np.int64)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def spawn(cls, n, shop_names, prefix="Agent", **kwargs):
+        return cls([f"{prefix}{i + 1}" for i in range(n)], shop_names, **kwargs)
+
+    @classmethod
+    def from_agents(cls, agents, shop_names, **kwargs):
+        """Build from basic Agent objects (energy, money and epsilon are copied).
+
+        Agents that already carry a QPolicy (from an earlier write_back) bring
+        their Q-table along, so training resumes where it stopped.
+        """
+        pop = cls(
+            [a.name for a in agents], shop_names,
+            energy=[a.state["energy"] for a in agents],
+            money=[a.state["money"] for a in agents],
+            epsilon=[a.epsilon for a in agents],
+            **kwargs,
+        )
+        for i, agent in enumerate(agents):
+            policy = agent.q_policy
+            if policy is not None and policy.table.shape == pop.q.shape[1:]:
+                pop.q[i] = policy.table
+        return pop
+
+    def write_back(self, agents):
+        """Copy energy, money, epsilon and each learned Q-table (as a QPolicy) into the Agent objects.
+
+        With a QPolicy, Agent.think follows the learned policy instead of its
+        fixed shop preferences.
+        """
+        for i, agent in enumerate(agents):
+            agent.state["energy"] = self.energy[i].item()
+            agent.state["money"] = self.money[i].item()
+            agent.epsilon = self.epsilon[i].item()
+            agent.q_policy = QPolicy(self.q[i].copy(), self.shop_names, self.energy_edges, self.money_edges)
+
+    def alive(self):
+        return (self.energy > 0) & (self.money > 0)
+
+    def states(self, idx):
+        """(energy bin, money bin) of the agents in idx."""
+        return np.digitize(self.energy[idx], self.energy_edges), np.digitize(self.money[idx], self.money_edges)
+
+    def choose(self, idx, e, m, cost):
+        """Epsilon-greedy action codes; buys the agent cannot afford are excluded."""
+        n_actions = len(self.index)
+        allowed = np.ones((len(idx), n_actions), dtype=bool)
+        allowed[:, ACTION_BUY:] = self.money[idx, None] >= cost[None, :]
+
+        q = np.where(allowed, self.q[idx, e, m], -np.inf)
+        # Break ties (e.g. untrained all-zero rows) uniformly at random
+        best = q == q.max(axis=1, keepdims=True)
+        explore = self.rng.random(len(idx)) < self.epsilon[idx]
+        candidates = np.where(explore[:, None], allowed, best)
+        return np.argmax(self.rng.random((len(idx), n_actions)) * candidates, axis=1)
+
+    def step(self, food_shops, actions, shop_capacity=1):
+        """Advance every living agent by one day and learn from it.
+
+        Returns (idx, codes, results): the agents that acted, their action
+        codes and result codes.
+        """
+        idx = np.flatnonzero(self.alive())
+        self.days_alive[idx] += 1
+        cost, success_rate, gain = shop_table(food_shops, self.shop_names)
+
+        e, m = self.states(idx)
+        codes = self.choose(idx, e, m, cost)
+        wealth_before = self.energy[idx] + self.money[idx]
+
+        self.energy[idx] -= 5  # Daily energy cost (Agent.act)
+        results = np.empty(len(idx), dtype=np.int8)
+
+        move = codes == ACTION_MOVE
+        self.energy[idx[move]] -= actions["move"]["energy_cost"]
+        results[move] = RESULT_MOVE
+        rest = codes == ACTION_REST
+        self.energy[idx[rest]] += actions["rest"]["energy_gain"]
+        results[rest] = RESULT_REST
+
+        buy = codes >= ACTION_BUY
+        b, shop = idx[buy], codes[buy] - ACTION_BUY
+        served = resolve_contention(shop, np.broadcast_to(shop_capacity, (len(self.shop_names),)))
+        won = served & (self.rng.random(len(b)) < success_rate[shop])
+        self.money[b[won]] -= cost[shop[won]]
+        self.energy[b[won]] += gain[shop[won]]
+        self.energy[b[served & ~won]] -= 5
+        self.energy[b[~served]] -= 10
+        results[buy] = np.where(won, RESULT_SUCCESS, RESULT_FAIL)
+
+        # One batched Q update for the whole population
+        alive_after = (self.energy[idx] > 0) & (self.money[idx] > 0)
+        reward = self.energy[idx] + self.money[idx] - wealth_before
+        reward[~alive_after] += DEATH_PENALTY
+        e2, m2 = self.states(idx)
+        future = np.where(alive_after, self.q[idx, e2, m2].max(axis=1), 0.0)
+        td = reward + self.gamma * future - self.q[idx, e, m, codes]
+        self.q[idx, e, m, codes] += self.alpha * td
+        return idx, codes, results
+
+    def train(self, food_shops, actions, num_episodes, num_days, energy=50, money=100, shop_capacity=1):
+        """Run num_episodes episodes of num_days days, restarting every agent each episode.
+
+        Energy and money are reset at the start of every episode (collapsed
+        agents come back); the Q-tables keep learning across episodes. The
+        final episode's energy and money are left in place.
+        """
+        for _ in range(num_episodes):
+            self.energy[:] = energy
+            self.money[:] = money
+            for _ in range(num_days):
+                idx, _, _ = self.step(food_shops, actions, shop_capacity)
+                if len(idx) == 0:
+                    break
+
+    def greedy_policy(self):
+        """Best action code per (agent, energy bin, money bin), ignoring affordability."""
+        return np.argmax(self.q, axis=-1)
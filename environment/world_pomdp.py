@@ -1,38 +1,66 @@
 import random
 import copy
 
+import numpy as np
+
+from environment.actions import (ActionIndex, ACTION_MOVE, ACTION_REST, RESULT_FAIL, RESULT_SUCCESS,
+                                 RESULT_MOVE, RESULT_REST, RESULT_LABELS)
+from environment.contention import resolve_contention
+from environment.observation import observation_noise
+from utils.trace import tracer, INFO
+
 class EnvironmentManager:
-    def __init__(self, food_shops, actions):
+    def __init__(self, food_shops, actions, rng=None, shop_capacity=1, queueing="order"):
         self.day = 0
+        self.rng = rng if rng is not None else random  # random module or utils.rng.BlockRNG
         self.food_shops = copy.deepcopy(food_shops)
+        self.base_shops = copy.deepcopy(food_shops)  # Values restored by reset_day when no event hits
+        self.shop_names = list(self.food_shops.keys())  # Column order of observation matrices
         self.actions = actions
-        self.shop_taken_today = {}
+        self.action_index = ActionIndex(self.shop_names)  # Integer action codes (see AgentPOMDP.decide)
+        self._shop_of = np.array(self.action_index.shop_of)  # Shop id per action code, -1 if not a buy
+
+        # Buyers each shop can serve per day (int for all shops, or {shop: n})
+        if isinstance(shop_capacity, dict):
+            self.shop_capacity = {s: shop_capacity.get(s, 1) for s in self.shop_names}
+        else:
+            self.shop_capacity = {s: shop_capacity for s in self.shop_names}
+        self.queueing = queueing  # "order", "random" or "priority" (see resolve_purchases)
+
+        self.shop_taken_today = {}  # shop -> first agent served today
+        self.shop_load_today = {}   # shop -> number of agents served today
         self.world_events = []  # 🌎 Store events for analysis
+        self.events_today = []
+        self._np_rng = None
 
 
     def reset_day(self):
         self.shop_taken_today = {}
+        self.shop_load_today = {}
         self.day += 1
 
         event_today = []
 
-        if random.random() < 0.1:
+        if self.rng.random() < 0.1:
             self.food_shops["CheapShop"]["success_rate"] = 0.0
-            print(f"[World Event] Day {self.day}: CheapShop is CLOSED!")
+            if tracer.info:
+                tracer.emit(INFO, "world_event", day=self.day, shop="CheapShop", kind="closed")
             event_today.append("CheapShop Closed")
         else:
-            self.food_shops["CheapShop"]["success_rate"] = 0.7
+            self.food_shops["CheapShop"]["success_rate"] = self.base_shops["CheapShop"]["success_rate"]
 
-        if random.random() < 0.1:
+        if self.rng.random() < 0.1:
             original_cost = self.food_shops["PremiumShop"]["cost"]
             self.food_shops["PremiumShop"]["cost"] = max(1, original_cost - 5)
-            print(f"[World Event] Day {self.day}: PremiumShop is DISCOUNTED!")
+            if tracer.info:
+                tracer.emit(INFO, "world_event", day=self.day, shop="PremiumShop", kind="discounted")
             event_today.append("PremiumShop Discounted")
         else:
-            self.food_shops["PremiumShop"]["cost"] = 15
+            self.food_shops["PremiumShop"]["cost"] = self.base_shops["PremiumShop"]["cost"]
 
         self.update_shop_prices()
 
+        self.events_today = event_today
         if event_today:
             self.world_events.append({"day": self.day, "events": event_today})
 
@@ -42,7 +70,7 @@ class EnvironmentManager:
     def update_shop_prices(self, price_variation=2):
         """Randomly adjust shop prices each day (dynamic world)."""
         for shop_name, shop_info in self.food_shops.items():
-            change = random.randint(-price_variation, price_variation)
+            change = self.rng.randint(-price_variation, price_variation)
             new_cost = max(1, shop_info["cost"] + change)
             self.food_shops[shop_name]["cost"] = new_cost
 
@@ -51,55 +79,127 @@ class EnvironmentManager:
         observations = {}
         for shop_name, shop_info in self.food_shops.items():
             real_cost = shop_info["cost"]
-            noisy_cost = real_cost + random.randint(-3, 3)  # Small noise
+            noisy_cost = real_cost + self.rng.randint(-3, 3)  # Small noise
             observations[shop_name] = {
                 "observed_cost": max(1, noisy_cost)
             }
         return observations
 
-    def apply_agent_action(self, agent, action):
-        """Apply agent's action to the environment."""
-        agent.true_state["energy"] -= 2  # Base daily energy cost
-        
-        if action.startswith("buy_food"):
-            shop_name = action.split("_")[-1]
+    def generate_observation_matrix(self, n_agents, noise="independent", correlation=0.5):
+        """Noisy cost observations for n_agents at once, shape (n_agents, n_shops).
+
+        Columns follow self.shop_names. Rows can be passed straight to
+        AgentPOMDP.update_belief(row, env.shop_names). See
+        environment.observation.observation_noise for the noise models.
+        """
+        cost = np.array([self.food_shops[s]["cost"] for s in self.shop_names])
+        noise_matrix = observation_noise(self.numpy_rng(), n_agents, len(self.shop_names), noise, correlation)
+        return np.maximum(1, cost + noise_matrix)
+
+    def numpy_rng(self):
+        """NumPy Generator for batched draws, tied to self.rng."""
+        if self._np_rng is None:
+            # BlockRNG exposes its NumPy Generator; otherwise derive one from the random module
+            self._np_rng = getattr(self.rng, "generator", None) or np.random.default_rng(self.rng.getrandbits(64))
+        return self._np_rng
+
+    def remaining_capacity(self):
+        """Free places left today per shop, in self.shop_names order."""
+        return np.array([self.shop_capacity[s] - self.shop_load_today.get(s, 0) for s in self.shop_names])
+
+    def resolve_purchases(self, actions, agents=None, priority=None):
+        """Decide in bulk which of today's actions will be served.
+
+        `actions` are codes of self.action_index (or names), one per acting
+        agent; non-buy actions are never served. The buys are allocated by
+        environment.contention.resolve_contention, in self.queueing order:
+        request order, a random order, or highest `priority` (aligned with
+        `actions`) first; the default priority is the lowest energy of
+        `agents`, i.e. the hungriest agent. Returns the served mask aligned
+        with `actions`, to pass on to apply_agent_action.
+        """
+        codes = np.asarray(actions)
+        if codes.dtype.kind not in "iu":
+            codes = np.array([self.action_index.encode(action) for action in actions], dtype=np.int64)
+        shop_ids = self._shop_of[codes] if len(codes) else np.zeros(0, dtype=np.int64)
+        served = np.zeros(len(codes), dtype=bool)
+        buy = shop_ids >= 0
+        if not buy.any():
+            return served
+
+        if self.queueing == "priority":
+            if priority is None:
+                priority = [-agents[i].resources()[0] for i in np.flatnonzero(buy).tolist()]
+            else:
+                priority = np.asarray(priority)[buy]
+        served[buy] = resolve_contention(shop_ids[buy], self.remaining_capacity(), self.queueing,
+                                         priority=priority, rng=self.numpy_rng())
+        return served
+
+    def apply_agent_action(self, agent, action, served=None):
+        """Apply agent's action (a self.action_index code or name) to the environment.
+
+        `served` is the agent's entry of the resolve_purchases mask; without
+        it a buy is served while the shop has capacity left. The state change
+        goes through agent.apply_outcome (see agents.agent_pomdp.POMDPPolicy),
+        so slotted agents update their fields directly. Agents with a replay
+        buffer (see agents.replay.ReplayPolicy) also record the step there.
+        Returns the result code (environment.actions.RESULT_*).
+        """
+        replay = agent.replay
+        if replay is not None:
+            before = agent.resources()
+        energy = -2  # Base daily energy cost
+        money = 0
+        shop_name = None
+        trust = 0.0
+
+        code = self.action_index.encode(action)
+        shop_id = self.action_index.shop_of[code]
+        if shop_id >= 0:
+            shop_name = self.shop_names[shop_id]
             shop_info = self.food_shops[shop_name]
 
-            if self.shop_taken_today.get(shop_name) is None:
-                self.shop_taken_today[shop_name] = agent.name
+            if served is None:
+                served = self.shop_load_today.get(shop_name, 0) < self.shop_capacity[shop_name]
+
+            if served:
+                self.shop_load_today[shop_name] = self.shop_load_today.get(shop_name, 0) + 1
+                self.shop_taken_today.setdefault(shop_name, agent.name)
 
-                if random.random() < shop_info["success_rate"]:
-                    agent.true_state["money"] -= shop_info["cost"]
-                    agent.true_state["energy"] += shop_info["energy_gain"]
+                if self.rng.random() < shop_info["success_rate"]:
+                    money -= shop_info["cost"]
+                    energy += shop_info["energy_gain"]
                     if shop_name == "PremiumShop":
-                        agent.true_state["energy"] += 5  # Bonus only if success
-                    result = "success"
-                    agent.beliefs[shop_name]["trust"] += 0.05
+                        energy += 5  # Bonus only if success
+                    result = RESULT_SUCCESS
+                    trust = 0.05
                 else:
-                    agent.true_state["energy"] -= 5
-                    result = "fail"
-                    agent.beliefs[shop_name]["trust"] -= 0.1
+                    energy -= 5
+                    result = RESULT_FAIL
+                    trust = -0.1
             else:
-                agent.true_state["energy"] -= 10
-                result = "fail"
+                energy -= 10
+                result = RESULT_FAIL
 
-        elif action == "move":
-            agent.true_state["energy"] -= self.actions["move"]["energy_cost"]
-            result = "move"
+        elif code == ACTION_MOVE:
+            energy -= self.actions["move"]["energy_cost"]
+            result = RESULT_MOVE
 
-        elif action == "rest":
-            agent.true_state["energy"] += self.actions["rest"]["energy_gain"]
-            result = "rest"
+        elif code == ACTION_REST:
+            energy += self.actions["rest"]["energy_gain"]
+            result = RESULT_REST
 
-        # Clip trust between 0 and 1
-        for shop in agent.beliefs:
-            agent.beliefs[shop]["trust"] = min(max(agent.beliefs[shop]["trust"], 0.0), 1.0)
+        # Trust is clipped to [0, 1] by apply_outcome
+        agent.apply_outcome(energy, money, shop_name, trust)
 
-        # Save memory
-        agent.memory.append((action, result))
+        # Save memory, as (action, result) labels like the agents' own act()
+        agent.memory.append((self.action_index.names[code], RESULT_LABELS[result]))
+        if replay is not None:
+            agent.record_experience(before, code)
 
         return result
 
     def is_agent_alive(self, agent):
         """Check if agent still alive (energy and money)."""
-        return agent.true_state["energy"] > 0 and agent.true_state["money"] > 0
+        return agent.is_alive()
@@ -3,9 +3,16 @@ import pandas as pd
 import plotly.express as px
 import random
 import copy
+import json
+import os
+import time
 
-from agents.agent_variants import GreedyAgent, ExplorerAgent, CautiousAgent, CheapOnlyAgent
-from environment.world_pomdp import EnvironmentManager
+from simulation.cache import ResultCache, config_key
+from simulation.background import TrainingWorker
+from simulation.checkpoint import load_checkpoint, resume_episode
+from simulation.training import build_team
+from utils.rng import RandomStreams
+from utils.profiling import PhaseProfiler
 
 st.set_page_config(page_title="Multi-Agent POMDP Dashboard", layout="wide")
 
@@ -27,6 +34,9 @@ st.sidebar.header("⚙️ Training Settings")
 
 num_episodes = st.sidebar.slider("Training Episodes", 5, 50, 10)
 num_days_per_episode = st.sidebar.slider("Days per Episode", 1, 10, 5)
+seed = st.sidebar.number_input("Random Seed", 0, 2**31 - 1, 42)
+profile_phases = st.sidebar.checkbox("⏱️ Profile training phases", value=False)
+checkpoint_runs = st.sidebar.checkbox("💾 Checkpoint every episode (restarting resumes)", value=False)
 
 # 📌 Sidebar - Agent Team Setup
 st.sidebar.header("👥 Customize Agent Team")
@@ -54,244 +64,348 @@ actions = {
     "rest": {"energy_gain": 10}
 }
 
-# 🚀 Start Training
-if st.button("🚀 Start Training"):
-    agents = []
-    agent_counter = 1
-
-    for _ in range(num_explorers):
-        agents.append(ExplorerAgent(f"Explorer{agent_counter}"))
-        agent_counter += 1
-    for _ in range(num_greedy):
-        agents.append(GreedyAgent(f"Greedy{agent_counter}"))
-        agent_counter += 1
-    for _ in range(num_cautious):
-        agents.append(CautiousAgent(f"Cautious{agent_counter}"))
-        agent_counter += 1
-    for _ in range(num_cheaponly):
-        agents.append(CheapOnlyAgent(f"CheapOnly{agent_counter}"))
-        agent_counter += 1
-
-    if len(agents) == 0:
-        st.error("❌ Please create at least one agent to start training.")
-        st.stop()
-
-    all_results = []
-    survival_stats = []
-    agent_lifetimes = {agent.name: 0 for agent in agents}
-
-    env = EnvironmentManager(food_shops, actions)
-
-    for episode in range(num_episodes):
-        env = EnvironmentManager(food_shops, actions)
-
-        reset_belief = (episode % 5 == 0)
-        for agent in agents:
-            agent.reset(reset_belief=reset_belief)
-            agent.epsilon = min(agent.epsilon + 0.05, 0.6)
-
-        for day in range(num_days_per_episode):
-            env.reset_day()
-
-            alive_agents = []
-
-            for agent in agents:
-                if not env.is_agent_alive(agent):
-                    continue
-
-                agent_lifetimes[agent.name] += 1
-
-                observations = env.generate_noisy_observation()
-                agent.perceive(observations)
-                agent.update_belief(observations)
-                action = agent.think()
-                env.apply_agent_action(agent, action)
-
-                if env.is_agent_alive(agent):
-                    alive_agents.append(agent)
-
-            agents = alive_agents
-
-            if not agents:
-                break
-
-        survival_stats.append({
+# 🗄️ Results cache keyed on the full configuration (+ seed)
+@st.cache_resource
+def get_result_cache():
+    return ResultCache(max_entries=32, disk_dir="data/cache")
+
+
+run_config = {
+    "world": food_shops,
+    "actions": actions,
+    "team": {
+        "explorer": num_explorers,
+        "greedy": num_greedy,
+        "cautious": num_cautious,
+        "cheaponly": num_cheaponly,
+    },
+    "training": {"episodes": num_episodes, "days_per_episode": num_days_per_episode},
+    "seed": seed,
+}
+result_cache = get_result_cache()
+cache_key = config_key(run_config)
+checkpoint_path = os.path.join("data", "checkpoints", f"{cache_key}.ckpt")
+
+
+def add_episode(training, update):
+    """Append one episode update of the worker to the session's result tables."""
+    episode = update["episode"]
+    training["survival_stats"].append({
+        "Episode": episode,
+        "SurvivingAgents": update["surviving_agents"]
+    })
+    for result in update["results"]:
+        training["all_results"].append({
             "Episode": episode,
-            "SurvivingAgents": len(agents)
+            "Agent": result["agent_name"],
+            "Policy": result["agent_type"],
+            "Energy": result["energy"],
+            "Money": result["money"],
+            "Score": result["score"]
         })
+    training["agent_lifetimes"] = update["agent_lifetimes"]
 
-        for agent in agents:
-            all_results.append({
-                "Episode": episode,
-                "Agent": agent.name,
-                "Policy": agent.__class__.__name__,
-                "Energy": agent.true_state["energy"],
-                "Money": agent.true_state["money"],
-                "Score": agent.true_state["energy"] + agent.true_state["money"]
-            })
-
-    df = pd.DataFrame(all_results)
-    df_lifetime = pd.DataFrame([
-        {"Agent": name, "DaysSurvived": days}
-        for name, days in agent_lifetimes.items()
-    ])
-
-    if not df.empty:
-        df_filtered = df[df["Policy"].isin(policy_filter)]
-
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["🧠 Overview", "🎯 Final Results", "🎬 Score Animation", "📊 Survival & Lifetime", "🏆 Final Outcome (Energy vs Money)"])
-
-        with tab1:
-            st.subheader("📈 How Our POMDP Simulation Works")
-
-            flowchart = """
-            digraph {
-                rankdir=LR;
-                node [shape=rect fontsize=14 style="rounded,filled" fontname="Helvetica"]
-
-                World [label="🌍 World\n(Food Shops + Prices)" fillcolor="#AED6F1" style=filled]
-                Observe [label="👀 Agent Observes\n(Noisy Observations)" fillcolor="#F9E79F" style=filled]
-                BeliefUpdate [label="🧠 Update Beliefs\n(Trust + Cost)" fillcolor="#F9E79F" style=filled]
-                Think [label="🤔 Plan Action\n(Based on Belief)" fillcolor="#ABEBC6" style=filled]
-                Act [label="🏃 Take Action\n(Buy Food / Move / Rest)" fillcolor="#ABEBC6" style=filled]
-                EnvChange [label="🔄 Environment Update\n(Success/Failure, Prices)" fillcolor="#AED6F1" style=filled]
-
-                World -> Observe -> BeliefUpdate -> Think -> Act -> EnvChange -> World
-            }
-            """
-            st.graphviz_chart(flowchart)
-
-            st.subheader("📈 How Multi-Episode Training Works")
-            training_flowchart = """
-            digraph {
-                rankdir=LR;
-                node [shape=rect fontsize=14 style="rounded,filled" fontname="Helvetica"]
-
-                Start [label="🚀 Start New Episode" fillcolor="#D6EAF8" style=filled]
-                Reset [label="🔄 Reset Agents\n(Energy, Money, Maybe Beliefs)" fillcolor="#FAD7A0" style=filled]
-                Train [label="🎯 Train Agents\n(Observe → Update Belief → Act)" fillcolor="#ABEBC6" style=filled]
-                EndDay [label="📆 End of Day Check" fillcolor="#F5CBA7" style=filled]
-                EndEpisode [label="🏁 End of Episode\n(Update Results)" fillcolor="#D6EAF8" style=filled]
-
-                Start -> Reset -> Train -> EndDay
-                EndDay -> Train [label="If Alive" fontsize=12]
-                EndDay -> EndEpisode [label="If Dead/End Day" fontsize=12]
-                EndEpisode -> Start
-            }
-            """
-            st.graphviz_chart(training_flowchart)
-
-            st.subheader("🤖 How Different Agent Strategies Think")
-            agent_flowcharts = """
-            digraph G {
-                rankdir=TB;
-                node [shape=rect fontsize=12 style="rounded,filled" fontname="Helvetica"]
-
-                subgraph cluster_greedy {
-                    label="Greedy Agent 🧠"
-                    ThinkGreedy [label="Pick Shop\nHighest Trust / Cost Ratio" fillcolor="#A9CCE3" style=filled]
-                }
+# 🚀 Start Training (runs in a background worker, the page polls for progress)
+col_start, col_cancel = st.columns(2)
 
-                subgraph cluster_explorer {
-                    label="Explorer Agent 🌍"
-                    ThinkExplorer [label="With ε chance:\nRandom Shop\nElse: Highest Trust/Cost" fillcolor="#A3E4D7" style=filled]
-                }
+if col_start.button("🚀 Start Training"):
+    # Every agent and episode gets its own seeded stream, so runs are reproducible
+    streams = RandomStreams(seed)
+    agents = build_team(run_config["team"], streams)
 
-                subgraph cluster_cautious {
-                    label="Cautious Agent 🔎"
-                    ThinkCautious [label="Pick Shop\nHighest Trust Only" fillcolor="#F9E79F" style=filled]
-                }
+    if len(agents) == 0:
+        st.error("❌ Please create at least one agent to start training.")
+        st.stop()
 
-                subgraph cluster_cheaponly {
-                    label="CheapOnly Agent 🛒"
-                    ThinkCheapOnly [label="Always Pick\nCheapShop" fillcolor="#F5B7B1" style=filled]
+    previous = st.session_state.get("training")
+    if previous is not None:
+        previous["worker"].cancel()
+        # It may still be writing the checkpoint this run resumes from
+        previous["worker"].join(timeout=10)
+
+    # Each run gets its own profiler, so reruns never toggle one the worker is recording into
+    run_profiler = PhaseProfiler(enabled=profile_phases)
+
+    # A checkpoint of this exact configuration resumes after its last saved episode
+    resume = {}
+    state = load_checkpoint(checkpoint_path) if checkpoint_runs else None
+    if state is not None and state["fingerprint"] == cache_key:
+        first_episode = resume_episode(state, 0, num_episodes, checkpoint_path)
+        agents = state["agents"]
+        resume = {"first_episode": first_episode, "agent_lifetimes": state["agent_lifetimes"],
+                  "episodes": state["episodes"]}
+        st.info(f"💾 Resuming from the checkpoint after episode {first_episode}.")
+
+    worker = TrainingWorker(food_shops, actions, agents, num_episodes - resume.get("first_episode", 0),
+                            num_days_per_episode, streams=streams, profiler=run_profiler,
+                            checkpoint=checkpoint_path if checkpoint_runs else None, fingerprint=cache_key,
+                            **resume)
+    training = {
+        "worker": worker,
+        "profiler": run_profiler,
+        "key": cache_key,
+        "checkpoint": worker.checkpoint,
+        "num_episodes": num_episodes,
+        "all_results": [],
+        "survival_stats": [],
+        "agent_lifetimes": dict(worker.agent_lifetimes),
+    }
+    for update in worker.episodes:
+        add_episode(training, update)
+    worker.start()
+    st.session_state["training"] = training
+
+training = st.session_state.get("training")
+
+if training is not None:
+    worker = training["worker"]
+
+    if col_cancel.button("⏹️ Cancel Training"):
+        worker.cancel()
+
+    # The session is dropped only once its terminal record has been handled,
+    # never on worker.finished alone (the last updates may still be queued)
+    finished = False
+    for update in worker.drain():
+        if update["kind"] in ("done", "cancelled", "error"):
+            finished = True
+        if update["kind"] == "episode":
+            add_episode(training, update)
+        elif update["kind"] == "done":
+            run_profiler = training["profiler"]
+            with run_profiler.phase("collect_results"):
+                cached = {
+                    "df": pd.DataFrame(training["all_results"]),
+                    "df_lifetime": pd.DataFrame([
+                        {"Agent": name, "DaysSurvived": days}
+                        for name, days in training["agent_lifetimes"].items()
+                    ]),
+                    "df_survival": pd.DataFrame(training["survival_stats"]),
                 }
-            }
-            """
-            st.graphviz_chart(agent_flowcharts)
-
-        with tab2:
-            st.subheader("🎯 Final Agent Scores Across Episodes (Filtered)")
-            st.dataframe(df_filtered)
-
-        with tab3:
-            st.subheader("🎬 Agent Score Evolution Animation (Filtered)")
-
-            df_filtered["IsBest"] = False
-            for ep in df_filtered["Episode"].unique():
-                ep_df = df_filtered[df_filtered["Episode"] == ep]
-                if not ep_df.empty:
-                    best_idx = ep_df["Score"].idxmax()
-                    df_filtered.at[best_idx, "IsBest"] = True
-
-            fig = px.scatter(
-                df_filtered,
+            if run_profiler.enabled:
+                cached["profile"] = run_profiler.summary_table()
+                cached["profile_json"] = run_profiler.dump()
+            result_cache.put(training["key"], cached)
+            # The finished run is in the result cache; its checkpoint is no longer needed
+            if training["checkpoint"] is not None and os.path.exists(training["checkpoint"]):
+                os.remove(training["checkpoint"])
+        elif update["kind"] == "cancelled":
+            st.warning("⏹️ Training cancelled.")
+        elif update["kind"] == "error":
+            st.error(f"Training failed:\n\n```\n{update['error']}\n```")
+
+    if finished:
+        del st.session_state["training"]
+    else:
+        # 📈 Progressive charts while the worker is still running
+        episodes_done = len(training["survival_stats"])
+        st.progress(episodes_done / training["num_episodes"], text=f"Episode {episodes_done}/{training['num_episodes']}")
+
+        live_survival, live_scores = st.columns(2)
+        if training["survival_stats"]:
+            live_survival.plotly_chart(px.line(
+                pd.DataFrame(training["survival_stats"]),
+                x="Episode",
+                y="SurvivingAgents",
+                markers=True,
+                title="Surviving Agents (live)"
+            ), use_container_width=True)
+        if training["all_results"]:
+            live_scores.plotly_chart(px.scatter(
+                pd.DataFrame(training["all_results"]),
                 x="Episode",
                 y="Score",
                 color="Policy",
-                animation_frame="Episode",
-                animation_group="Agent",
-                size=df_filtered["IsBest"].apply(lambda x: 20 if x else 10),
-                symbol=df_filtered["IsBest"].apply(lambda x: "star" if x else "circle"),
                 hover_name="Agent",
-                title="🏆 Agent Score Evolution (Best Highlighted)",
-                range_y=[0, max(df["Score"].max() + 50, 200)]
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-        with tab4:
-            st.subheader("📊 Survival Across Episodes")
-            df_survival = pd.DataFrame(survival_stats)
+                title="Agent Scores (live)"
+            ), use_container_width=True)
+
+        time.sleep(0.5)
+        st.rerun()
+
+results = result_cache.get(cache_key)
+
+if results is None:
+    st.info("👈 Configure the world and team, then press **Start Training**.")
+    st.stop()
+
+df = results["df"]
+df_lifetime = results["df_lifetime"]
+df_survival = results["df_survival"]
+
+# Times the analysis and charts below, on every rerun of a profiled run
+analysis_profiler = PhaseProfiler()
+analysis_start = time.perf_counter()
+
+if not df.empty:
+    # Filters only re-slice the cached results, they never re-simulate
+    df_filtered = df[df["Policy"].isin(policy_filter)].copy()
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🧠 Overview", "🎯 Final Results", "🎬 Score Animation", "📊 Survival & Lifetime", "🏆 Final Outcome (Energy vs Money)"])
+
+    with tab1:
+        st.subheader("📈 How Our POMDP Simulation Works")
+
+        flowchart = """
+        digraph {
+            rankdir=LR;
+            node [shape=rect fontsize=14 style="rounded,filled" fontname="Helvetica"]
+
+            World [label="🌍 World\n(Food Shops + Prices)" fillcolor="#AED6F1" style=filled]
+            Observe [label="👀 Agent Observes\n(Noisy Observations)" fillcolor="#F9E79F" style=filled]
+            BeliefUpdate [label="🧠 Update Beliefs\n(Trust + Cost)" fillcolor="#F9E79F" style=filled]
+            Think [label="🤔 Plan Action\n(Based on Belief)" fillcolor="#ABEBC6" style=filled]
+            Act [label="🏃 Take Action\n(Buy Food / Move / Rest)" fillcolor="#ABEBC6" style=filled]
+            EnvChange [label="🔄 Environment Update\n(Success/Failure, Prices)" fillcolor="#AED6F1" style=filled]
+
+            World -> Observe -> BeliefUpdate -> Think -> Act -> EnvChange -> World
+        }
+        """
+        st.graphviz_chart(flowchart)
+
+        st.subheader("📈 How Multi-Episode Training Works")
+        training_flowchart = """
+        digraph {
+            rankdir=LR;
+            node [shape=rect fontsize=14 style="rounded,filled" fontname="Helvetica"]
+
+            Start [label="🚀 Start New Episode" fillcolor="#D6EAF8" style=filled]
+            Reset [label="🔄 Reset Agents\n(Energy, Money, Maybe Beliefs)" fillcolor="#FAD7A0" style=filled]
+            Train [label="🎯 Train Agents\n(Observe → Update Belief → Act)" fillcolor="#ABEBC6" style=filled]
+            EndDay [label="📆 End of Day Check" fillcolor="#F5CBA7" style=filled]
+            EndEpisode [label="🏁 End of Episode\n(Update Results)" fillcolor="#D6EAF8" style=filled]
+
+            Start -> Reset -> Train -> EndDay
+            EndDay -> Train [label="If Alive" fontsize=12]
+            EndDay -> EndEpisode [label="If Dead/End Day" fontsize=12]
+            EndEpisode -> Start
+        }
+        """
+        st.graphviz_chart(training_flowchart)
+
+        st.subheader("🤖 How Different Agent Strategies Think")
+        agent_flowcharts = """
+        digraph G {
+            rankdir=TB;
+            node [shape=rect fontsize=12 style="rounded,filled" fontname="Helvetica"]
+
+            subgraph cluster_greedy {
+                label="Greedy Agent 🧠"
+                ThinkGreedy [label="Pick Shop\nHighest Trust / Cost Ratio" fillcolor="#A9CCE3" style=filled]
+            }
 
-            fig_survival = px.line(
-                df_survival,
-                x="Episode",
-                y="SurvivingAgents",
-                markers=True,
-                title="Surviving Agents Across Episodes",
-                labels={"SurvivingAgents": "Number of Surviving Agents"}
-            )
-            st.plotly_chart(fig_survival, use_container_width=True)
-
-            st.subheader("⏳ Lifetime Analysis (Days Survived per Agent)")
-            fig_lifetime = px.bar(
-                df_lifetime,
-                x="Agent",
-                y="DaysSurvived",
-                color="Agent",
-                title="⏳ Days Each Agent Survived",
-                labels={"DaysSurvived": "Days Survived"},
-                height=500
-            )
-            st.plotly_chart(fig_lifetime, use_container_width=True)
-
-        with tab5:
-            st.subheader("🏆 Final Outcome - Energy vs Money (Stacked Bar)")
-
-            final_episode = df["Episode"].max()
-            df_final = df[df["Episode"] == final_episode]
-
-            df_stacked = df_final.melt(
-                id_vars=["Agent", "Policy"],
-                value_vars=["Energy", "Money"],
-                var_name="Resource",
-                value_name="Amount"
-            )
-
-            fig_stacked = px.bar(
-                df_stacked,
-                x="Agent",
-                y="Amount",
-                color="Policy",  # 🎯 DIFFERENT POLICIES different colors
-                pattern_shape="Resource",  # 🎯 Energy vs Money using different patterns
-                barmode="stack",
-                title=f"🏆 Final Breakdown: Energy vs Money After Episode {final_episode}",
-                labels={"Amount": "Value"},
-                height=600,
-                text_auto=True
-            )
-            st.plotly_chart(fig_stacked, use_container_width=True)
+            subgraph cluster_explorer {
+                label="Explorer Agent 🌍"
+                ThinkExplorer [label="With ε chance:\nRandom Shop\nElse: Highest Trust/Cost" fillcolor="#A3E4D7" style=filled]
+            }
 
+            subgraph cluster_cautious {
+                label="Cautious Agent 🔎"
+                ThinkCautious [label="Pick Shop\nHighest Trust Only" fillcolor="#F9E79F" style=filled]
+            }
 
-    else:
-        st.warning("No agents survived any episodes.")
+            subgraph cluster_cheaponly {
+                label="CheapOnly Agent 🛒"
+                ThinkCheapOnly [label="Always Pick\nCheapShop" fillcolor="#F5B7B1" style=filled]
+            }
+        }
+        """
+        st.graphviz_chart(agent_flowcharts)
+
+    with tab2:
+        st.subheader("🎯 Final Agent Scores Across Episodes (Filtered)")
+        st.dataframe(df_filtered)
+
+    with tab3:
+        st.subheader("🎬 Agent Score Evolution Animation (Filtered)")
+
+        df_filtered["IsBest"] = False
+        for ep in df_filtered["Episode"].unique():
+            ep_df = df_filtered[df_filtered["Episode"] == ep]
+            if not ep_df.empty:
+                best_idx = ep_df["Score"].idxmax()
+                df_filtered.at[best_idx, "IsBest"] = True
+
+        fig = px.scatter(
+            df_filtered,
+            x="Episode",
+            y="Score",
+            color="Policy",
+            animation_frame="Episode",
+            animation_group="Agent",
+            size=df_filtered["IsBest"].apply(lambda x: 20 if x else 10),
+            symbol=df_filtered["IsBest"].apply(lambda x: "star" if x else "circle"),
+            hover_name="Agent",
+            title="🏆 Agent Score Evolution (Best Highlighted)",
+            range_y=[0, max(df["Score"].max() + 50, 200)]
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+    with tab4:
+        st.subheader("📊 Survival Across Episodes")
+
+        fig_survival = px.line(
+            df_survival,
+            x="Episode",
+            y="SurvivingAgents",
+            markers=True,
+            title="Surviving Agents Across Episodes",
+            labels={"SurvivingAgents": "Number of Surviving Agents"}
+        )
+        st.plotly_chart(fig_survival, use_container_width=True)
+
+        st.subheader("⏳ Lifetime Analysis (Days Survived per Agent)")
+        fig_lifetime = px.bar(
+            df_lifetime,
+            x="Agent",
+            y="DaysSurvived",
+            color="Agent",
+            title="⏳ Days Each Agent Survived",
+            labels={"DaysSurvived": "Days Survived"},
+            height=500
+        )
+        st.plotly_chart(fig_lifetime, use_container_width=True)
+
+    with tab5:
+        st.subheader("🏆 Final Outcome - Energy vs Money (Stacked Bar)")
+
+        final_episode = df["Episode"].max()
+        df_final = df[df["Episode"] == final_episode]
+
+        df_stacked = df_final.melt(
+            id_vars=["Agent", "Policy"],
+            value_vars=["Energy", "Money"],
+            var_name="Resource",
+            value_name="Amount"
+        )
+
+        fig_stacked = px.bar(
+            df_stacked,
+            x="Agent",
+            y="Amount",
+            color="Policy",  # 🎯 DIFFERENT POLICIES different colors
+            pattern_shape="Resource",  # 🎯 Energy vs Money using different patterns
+            barmode="stack",
+            title=f"🏆 Final Breakdown: Energy vs Money After Episode {final_episode}",
+            labels={"Amount": "Value"},
+            height=600,
+            text_auto=True
+        )
+        st.plotly_chart(fig_stacked, use_container_width=True)
+
+
+else:
+    st.warning("No agents survived any episodes.")
+
+# ⏱️ Phase profile of the run (only when profiling was enabled for it)
+if "profile" in results:
+    analysis_profiler.record("analysis", time.perf_counter() - analysis_start)
+    profile_rows = json.loads(results["profile_json"])["phases"] + analysis_profiler.summary()
+    with st.expander("⏱️ Phase Profile"):
+        st.dataframe(pd.DataFrame(profile_rows).sort_values("total_s", ascending=False).reset_index(drop=True))
+        st.download_button(
+            label="Download profile (JSON)",
+            data=json.dumps({"phases": profile_rows}, indent=2),
+            file_name="profile.json",
+            mime="application/json"
+        )
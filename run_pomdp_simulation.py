@@ -1,7 +1,14 @@
 from agents.agent_pomdp import AgentPOMDP
 from agents.agent_variants import GreedyAgent, ExplorerAgent, CautiousAgent, CheapOnlyAgent
-from environment.world_pomdp import EnvironmentManager
-import pandas as pd
+from simulation.cache import config_key
+from simulation.checkpoint import save_checkpoint, load_checkpoint, resume_episode
+from simulation.stream import stream_training
+from utils.trace import tracer, FileSink
+from utils.profiling import profiler
+from utils.event_response import EventResponseAggregator
+import random
+import sys
+import os
 
 # Setup real world
 food_shops = {
@@ -14,8 +21,14 @@ actions = {
     "rest": {"energy_gain": 10}
 }
 
-# Create environment and agents
-env = EnvironmentManager(food_shops, actions)
+# Echo world events (INFO) to stdout; set DEBUG to also see every agent decision
+tracer.add_sink(FileSink(sys.stdout))
+
+# Pass --profile to time each phase of the day loop and the analysis
+if "--profile" in sys.argv:
+    profiler.enable()
+
+# Create agents
 agents = [
     ExplorerAgent("Agent1"),
     GreedyAgent("Agent2"),
@@ -28,87 +41,67 @@ num_episodes = 3
 num_days_per_episode = 5  
 
 all_results = []
-agent_actions = []  # 🌟 New: store actions for analysis
-
-
-for episode in range(num_episodes):
-    print(f"\n=== Episode {episode+1} ===")
-    
-    # Reset environment
-    env = EnvironmentManager(food_shops, actions)
-
-    reset_belief = (episode % 5 == 0)
-
-    for agent in agents:
-        agent.reset(reset_belief=reset_belief)
-        agent.epsilon = min(agent.epsilon + 0.05, 0.6)
-
-    # Normal day loop inside one episode
-    for day in range(num_days_per_episode):
-        env.reset_day()
-        env.update_shop_prices()
-
-        alive_agents = []
-
-        for agent in agents:
-            if not env.is_agent_alive(agent):
-                continue
-
-            observations = env.generate_noisy_observation()
-            agent.perceive(observations)
-            agent.update_belief(observations)
-            agent.log_belief(day)
-
-            action = agent.think()
-            result = env.apply_agent_action(agent, action)
-
-            agent_actions.append({
-                "episode": episode,
-                "day": day,
-                "agent_name": agent.name,
-                "agent_type": agent.__class__.__name__,
-                "action": action,
-                "result": result
-            })
-            env.apply_agent_action(agent, action)
-
-            if env.is_agent_alive(agent):
-                alive_agents.append(agent)
-
-        agents = alive_agents
-
-        if not agents:
+responses = EventResponseAggregator()  # 🌟 Shop choices per (episode, day), updated as actions stream in
+next_episode = 0
+
+# Pass --checkpoint PATH to save progress after every episode; rerunning resumes from it
+checkpoint = sys.argv[sys.argv.index("--checkpoint") + 1] if "--checkpoint" in sys.argv else None
+fingerprint = config_key({"food_shops": food_shops, "actions": actions,
+                          "agents": [(type(agent).__name__, agent.name) for agent in agents],
+                          "days": num_days_per_episode})
+state = load_checkpoint(checkpoint) if checkpoint is not None else None
+if state is not None:
+    if state.get("fingerprint") != fingerprint:
+        raise ValueError(f"Checkpoint {checkpoint} was written by a run with a different configuration")
+    next_episode = resume_episode(state, 0, num_episodes, checkpoint)
+    agents = state["agents"]
+    all_results = state["all_results"]
+    responses = state["responses"]
+    random.setstate(state["random_state"])
+    print(f"Resuming from {checkpoint} at episode {next_episode + 1}")
+
+
+for record in stream_training(food_shops, actions, agents, num_episodes - next_episode, num_days_per_episode,
+                              first_episode=next_episode):
+    if record["kind"] == "day":
+        if record["day"] == 0:
+            print(f"\n=== Episode {record['episode']+1} ===")
+        responses.add_day(record)
+        if record["survivors"] == 0:
             print("All agents collapsed! Ending this episode.")
-            break
+        continue
 
     # ✅ After each episode: record results
-    for agent in agents:
-        total_score = agent.true_state["energy"] + agent.true_state["money"]
-        all_results.append({
-            "episode": episode,
-            "agent_name": agent.name,
-            "agent_type": agent.__class__.__name__,
-            "score": total_score
+    episode = record["episode"]
+    all_results.extend(record["results"])
+
+    with profiler.phase("analysis"):
+        responses.add_events(episode, record["world_events"])
+
+        print("\n=== Behavior Analysis ===")
+
+        for event_day, events, shop_counts in responses.responses(episode):
+            print(f"\nAfter event on Day {event_day}: {events}")
+
+            # Choices of the following day, looked up by (episode, day)
+            print("Agent choices next day:")
+            for shop, count in shop_counts.most_common():
+                print(f"{shop:<12} {count}")
+            if not shop_counts:
+                print("(episode ended)")
+
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, {
+            "fingerprint": fingerprint,
+            "next_episode": episode + 1,
+            "agents": agents,
+            "all_results": all_results,
+            "responses": responses,
+            "random_state": random.getstate(),
         })
 
-
-    # Convert agent_actions to DataFrame
-    df_actions = pd.DataFrame(agent_actions)
-
-    # Convert world_events to DataFrame
-    df_events = pd.DataFrame(env.world_events)
-
-    print("\n=== Behavior Analysis ===")
-
-    for _, event in df_events.iterrows():
-        event_day = event["day"]
-        print(f"\nAfter event on Day {event_day}: {event['events']}")
-
-        # Look at next day actions
-        next_day_actions = df_actions[(df_actions["day"] == event_day)]
-
-        shop_choices = next_day_actions["action"].apply(lambda x: x.split("_")[-1])
-        shop_counts = shop_choices.value_counts()
-
-        print("Agent choices next day:")
-        print(shop_counts)
\ No newline at end of file
+if profiler.enabled:
+    print("\n=== Profile ===")
+    print(profiler.summary_table().to_string(index=False))
+    os.makedirs("data", exist_ok=True)
+    profiler.dump("data/profile.json")
@@ -0,0 +1,5 @@
+import sys
+
+from simulation.cli import main
+
+main(sys.argv[1:])
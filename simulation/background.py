@@ -0,0 +1,107 @@
+import queue
+import threading
+import traceback
+
+from simulation.checkpoint import save_checkpoint
+from simulation.stream import stream_training
+
+
+class BackgroundWorker(threading.Thread):
+    """Consume a record stream on a background thread and publish it through a queue.
+
+    `make_stream` is a zero-argument callable returning an iterator of records
+    (e.g. a stream_training generator). Records for which `publish(record)` is
+    true are put on `updates`; a final {"kind": "done" | "cancelled" | "error"}
+    record is always published, before `status` changes, so a consumer that
+    sees `finished` can still drain it. Call cancel() to stop between records.
+    """
+
+    def __init__(self, make_stream, publish=None):
+        super().__init__(daemon=True)
+        self.make_stream = make_stream
+        self.publish = publish or (lambda record: True)
+        self.updates = queue.Queue()
+        self.status = "pending"
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "cancelled", "error")
+
+    def run(self):
+        self.status = "running"
+        try:
+            for record in self.make_stream():
+                if self._cancel.is_set():
+                    self.updates.put({"kind": "cancelled"})
+                    self.status = "cancelled"
+                    return
+                if self.publish(record):
+                    self.updates.put(record)
+        except Exception:
+            self.updates.put({"kind": "error", "error": traceback.format_exc()})
+            self.status = "error"
+            return
+        self.updates.put({"kind": "done"})
+        self.status = "done"
+
+    def drain(self):
+        """Return every update published since the last call (never blocks)."""
+        items = []
+        while True:
+            try:
+                items.append(self.updates.get_nowait())
+            except queue.Empty:
+                return items
+
+
+class TrainingWorker(BackgroundWorker):
+    """Run stream_training in the background, publishing one update per episode.
+
+    Episode updates also carry a snapshot of the days each agent has acted so
+    far ("agent_lifetimes") so dashboards can redraw lifetime charts. Pass a
+    dedicated utils.profiling.PhaseProfiler to time the run's phases.
+
+    With a `checkpoint` path, the surviving agents, the lifetimes and every
+    published episode update are saved there (see simulation.checkpoint)
+    after each episode, from the worker thread while the run is paused
+    between episodes. A later worker resumes from that state with
+    first_episode=state["next_episode"], agent_lifetimes and episodes; the
+    `fingerprint` is stored alongside so callers can reject a checkpoint of
+    another configuration.
+    """
+
+    def __init__(self, food_shops, actions, agents, num_episodes, num_days_per_episode, streams=None,
+                 profiler=None, first_episode=0, checkpoint=None, fingerprint=None, agent_lifetimes=None,
+                 episodes=()):
+        self.agent_lifetimes = dict(agent_lifetimes) if agent_lifetimes is not None else {
+            agent.name: 0 for agent in agents}
+        self.agents = agents
+        self.episodes = list(episodes)  # Resumed and checkpointed episode updates
+        self.checkpoint = checkpoint
+        self.fingerprint = fingerprint
+        super().__init__(
+            lambda: stream_training(food_shops, actions, agents, num_episodes, num_days_per_episode,
+                                    first_episode=first_episode, streams=streams, profiler=profiler),
+            publish=self._publish,
+        )
+
+    def _publish(self, record):
+        if record["kind"] == "day":
+            for name in record["acted"]:
+                self.agent_lifetimes[name] += 1
+            return False
+        record["agent_lifetimes"] = dict(self.agent_lifetimes)
+        if self.checkpoint is not None:
+            self.episodes.append(record)
+            save_checkpoint(self.checkpoint, {
+                "fingerprint": self.fingerprint,
+                "next_episode": record["episode"] + 1,
+                "agents": self.agents,
+                "agent_lifetimes": self.agent_lifetimes,
+                "episodes": self.episodes,
+            })
+        return True
@@ -0,0 +1,66 @@
+import os
+import pickle
+import random
+import tempfile
+
+# Bumped whenever the checkpoint layout changes
+CHECKPOINT_VERSION = 1
+
+
+class _Pickler(pickle.Pickler):
+    # Unseeded agents and worlds hold the `random` module itself as their rng
+    def persistent_id(self, obj):
+        return "random" if obj is random else None
+
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        if pid == "random":
+            return random
+        raise pickle.UnpicklingError(f"Unknown persistent id {pid!r}")
+
+
+def save_checkpoint(path, state):
+    """Atomically pickle `state` to path.
+
+    Writes a temp file in the same directory, fsyncs it and renames it over
+    `path`, so a crash leaves either the previous checkpoint or the new one,
+    never a truncated file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _Pickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump({"version": CHECKPOINT_VERSION, **state})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_checkpoint(path):
+    """The state dict saved by save_checkpoint, or None if path does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        state = _Unpickler(f).load()
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {state.get('version')} in {path}")
+    return state
+
+
+def resume_episode(state, first_episode, num_episodes, path):
+    """The episode a run of num_episodes starting at first_episode resumes at from `state`.
+
+    Raises ValueError if the checkpoint's next episode lies outside that run,
+    e.g. it was written by a longer run of the same configuration.
+    """
+    next_episode = state["next_episode"]
+    if not first_episode <= next_episode <= first_episode + num_episodes:
+        raise ValueError(f"Checkpoint {path} resumes at episode {next_episode}, outside this run's "
+                         f"episodes {first_episode}..{first_episode + num_episodes - 1}")
+    return next_episode
@@ -0,0 +1,208 @@
+# cli.py
+"""Headless command-line entry point::
+
+    python -m simulation --episodes 20 --days 30 --seed 1 --team greedy=3,cautious=2
+
+World (shops, actions), team, episodes, days and seed are read from a YAML
+config (config.yaml by default, if present) and flags override them. Only
+the standard library and the simulation itself are imported up front:
+PyYAML is loaded when a config file is read, pandas for --analyze,
+matplotlib / plotly for --plot and pyarrow for --store.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from simulation.training import TEAM_ROLES
+
+DEFAULT_CONFIG = "config.yaml"
+
+DEFAULTS = {
+    "shops": {
+        "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+        "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9},
+    },
+    "actions": {
+        "move": {"energy_cost": 15},
+        "rest": {"energy_gain": 10},
+    },
+    "team": {"explorer": 1, "greedy": 2, "cautious": 1, "cheaponly": 1},
+    "episodes": 10,
+    "days": 30,
+    "seed": None,
+}
+
+
+def load_config(path):
+    """Read a YAML config; a missing default config.yaml just means no overrides."""
+    if not os.path.exists(path):
+        if path == DEFAULT_CONFIG:
+            return {}
+        raise FileNotFoundError(f"Config file not found: {path}")
+    try:
+        import yaml
+    except ImportError as exc:
+        raise ImportError("Reading a config file needs PyYAML: pip install pyyaml") from exc
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def parse_team(text):
+    """Parse "greedy=3,cautious=2" into {"greedy": 3, "cautious": 2}."""
+    team = {}
+    for item in text.split(","):
+        role, _, count = item.partition("=")
+        role = role.strip().lower()
+        if role not in TEAM_ROLES:
+            raise argparse.ArgumentTypeError(f"Unknown agent role {role!r} (expected one of {list(TEAM_ROLES)})")
+        try:
+            team[role] = int(count)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad agent count in {item!r}") from None
+    return team
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m simulation", description="Run a headless POMDP training session.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="YAML config (default: config.yaml if present)")
+    parser.add_argument("--episodes", type=int, help="number of episodes")
+    parser.add_argument("--days", type=int, help="days per episode")
+    parser.add_argument("--seed", type=int, help="root seed (reproducible runs)")
+    parser.add_argument("--team", type=parse_team, help="team, e.g. greedy=3,cautious=2")
+    parser.add_argument("--replicas", type=int, default=1, help="independent replicas (process pool)")
+    parser.add_argument("--workers", type=int, help="worker processes for --replicas")
+    parser.add_argument("--compact", action="store_true", help="use the slotted compact agents (single run)")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="save training state to PATH each episode and resume from it if present (single run)")
+    parser.add_argument("--checkpoint-every", type=int, default=1, metavar="N", help="checkpoint every N episodes")
+    parser.add_argument("--output", help="write the run records to this JSON file")
+    parser.add_argument("--store", metavar="DIR", help="save the run to a RunStore under DIR (needs pyarrow)")
+    parser.add_argument("--analyze", action="store_true", help="print a pandas summary (imports pandas)")
+    parser.add_argument("--plot", metavar="PATH", help="save score / survival plots (.html: plotly, else matplotlib)")
+    parser.add_argument("--profile", action="store_true", help="print per-phase timings")
+    parser.add_argument("--quiet", action="store_true", help="only print the final summary")
+    return parser
+
+
+def resolve_config(args):
+    """Merge DEFAULTS, the config file and the command-line flags."""
+    config = dict(DEFAULTS)
+    config.update({k: v for k, v in load_config(args.config).items() if k in DEFAULTS})
+    for key in ("episodes", "days", "seed", "team"):
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = value
+    return config
+
+
+def summarize(output):
+    """Per-episode survivors and mean score, computed without pandas."""
+    scores = {}
+    for row in output["all_results"]:
+        scores.setdefault(row["episode"], []).append(row["score"])
+    survivors = {}
+    for row in output["survival_stats"]:
+        survivors[row["episode"]] = survivors.get(row["episode"], 0) + row["surviving_agents"]
+    return [
+        {
+            "episode": episode,
+            "survivors": survivors[episode],
+            "mean_score": sum(scores.get(episode, [])) / len(scores[episode]) if scores.get(episode) else 0.0,
+        }
+        for episode in sorted(survivors)
+    ]
+
+
+def analyze(output):
+    import pandas as pd
+
+    scores = pd.DataFrame(output["all_results"])
+    if scores.empty:
+        return "No agent survived any episode."
+    table = scores.groupby("agent_type")[["energy", "money", "score"]].mean().round(1)
+    return table.sort_values("score", ascending=False).to_string()
+
+
+def plot(output, path):
+    summary = summarize(output)
+    episodes = [row["episode"] for row in summary]
+    if path.endswith(".html"):
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, subplot_titles=("Survivors", "Mean score"))
+        fig.add_trace(go.Scatter(x=episodes, y=[r["survivors"] for r in summary], name="survivors"), row=1, col=1)
+        fig.add_trace(go.Scatter(x=episodes, y=[r["mean_score"] for r in summary], name="mean score"), row=2, col=1)
+        fig.write_html(path)
+    else:
+        try:
+            import matplotlib
+        except ImportError as exc:
+            raise ImportError("PNG plots need matplotlib: pip install matplotlib (or pass an .html path)") from exc
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        fig, (top, bottom) = plt.subplots(2, 1, sharex=True)
+        top.plot(episodes, [r["survivors"] for r in summary])
+        top.set_ylabel("Survivors")
+        bottom.plot(episodes, [r["mean_score"] for r in summary])
+        bottom.set_ylabel("Mean score")
+        bottom.set_xlabel("Episode")
+        fig.savefig(path)
+        plt.close(fig)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = resolve_config(args)
+
+    from utils.profiling import profiler
+    if args.profile:
+        profiler.enable()
+
+    start = time.perf_counter()
+    if args.replicas > 1:
+        from simulation.runner import run_replicas
+        output = run_replicas(config["shops"], config["actions"], config["team"], config["episodes"],
+                              config["days"], args.replicas, seed=config["seed"] or 0, workers=args.workers)
+    else:
+        from simulation.training import run_training
+        output = run_training(config["shops"], config["actions"], config["team"], config["episodes"],
+                              config["days"], seed=config["seed"], compact=args.compact,
+                              checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every)
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        for row in summarize(output):
+            print(f"episode {row['episode']:>4}  survivors {row['survivors']:>4}  mean score {row['mean_score']:8.1f}")
+    lifetimes = output["agent_lifetimes"]
+    if isinstance(lifetimes, dict):
+        steps = sum(lifetimes.values())
+    else:  # run_replicas: one row per (replica, agent)
+        steps = sum(row["days_survived"] for row in lifetimes)
+    print(f"{config['episodes']} episodes x {config['days']} days, {steps} agent-steps in {elapsed:.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, default=str)
+    if args.store:
+        from utils.run_store import RunStore
+        store = RunStore(args.store)
+        run_id = store.create_run(metadata={**config, "replicas": args.replicas})
+        store.save_training(run_id, output)
+        print(f"saved run {run_id} to {args.store}")
+    if args.analyze:
+        print(analyze(output))
+    if args.plot:
+        plot(output, args.plot)
+        print(f"plots saved to {args.plot}")
+    if args.profile:
+        print(profiler.dump())
+    return output
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simulation.training import run_training
+
+# Per-task record lists merged back by the runner
+RECORD_LISTS = ("all_results", "agent_actions", "world_events", "survival_stats")
+
+
+def task_seed(base_seed, index):
+    """Deterministic per-task seed, independent of worker count and scheduling."""
+    return int(np.random.SeedSequence([base_seed, index]).generate_state(1)[0])
+
+
+def _run_task(task):
+    """Worker entry point: run one replica (or one independent episode)."""
+    index, seed, kwargs = task
+    return index, run_training(seed=seed, **kwargs)
+
+
+def _merge(outputs, key):
+    """Merge per-task record dicts back in task order, tagging each with its replica."""
+    merged = {name: [] for name in RECORD_LISTS}
+    merged["agent_lifetimes"] = []
+    for index, out in outputs:
+        for name in RECORD_LISTS:
+            for record in out[name]:
+                record[key] = index
+                merged[name].append(record)
+        for agent_name, days in out["agent_lifetimes"].items():
+            merged["agent_lifetimes"].append({key: index, "agent_name": agent_name, "days_survived": days})
+    return merged
+
+
+def map_tasks(fn, tasks, workers=None, chunksize=None):
+    """[fn(task) for task in tasks], spread over a process pool when workers > 1.
+
+    `fn` must be a picklable module-level function. Results come back in task
+    order; workers=None uses every CPU.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return [fn(task) for task in tasks]
+    if chunksize is None:
+        # Roughly four chunks per worker keeps the pool busy without per-task IPC overhead
+        chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, tasks, chunksize=chunksize))
+
+
+def _execute(tasks, workers, chunksize):
+    return map_tasks(_run_task, tasks, workers, chunksize)
+
+
+def run_replicas(food_shops, actions, team, num_episodes, num_days_per_episode,
+                 num_replicas, seed=0, workers=None, chunksize=None):
+    """Run num_replicas independent training sessions across a process pool.
+
+    Replica i is seeded from (seed, i), so results do not depend on the number
+    of workers. Records come back merged in replica order with a "replica" field.
+    """
+    kwargs = {
+        "food_shops": food_shops,
+        "actions": actions,
+        "team": team,
+        "num_episodes": num_episodes,
+        "num_days_per_episode": num_days_per_episode,
+    }
+    tasks = [(i, task_seed(seed, i), kwargs) for i in range(num_replicas)]
+    return _merge(_execute(tasks, workers, chunksize), "replica")
+
+
+def run_episodes(food_shops, actions, team, num_episodes, num_days_per_episode,
+                 seed=0, workers=None, chunksize=None):
+    """Run num_episodes independent episodes (fresh team each) across a process pool.
+
+    Records are merged back in episode order with the global episode index in
+    their "episode" field. Nothing carries over between episodes: every task
+    builds a fresh team, so beliefs, survivors and the epsilon schedule (+0.05
+    per episode in a serial run) start from their initial values each time.
+    Use run_training for a session whose agents learn across episodes.
+    """
+    tasks = []
+    for episode in range(num_episodes):
+        kwargs = {
+            "food_shops": food_shops,
+            "actions": actions,
+            "team": team,
+            "num_episodes": 1,
+            "num_days_per_episode": num_days_per_episode,
+            "first_episode": episode,
+        }
+        tasks.append((episode, task_seed(seed, episode), kwargs))
+    return _merge(_execute(tasks, workers, chunksize), "episode")
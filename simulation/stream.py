@@ -0,0 +1,178 @@
+import itertools
+from time import perf_counter
+
+from environment.actions import RESULT_LABELS
+from environment.world_pomdp import EnvironmentManager
+from utils.profiling import profiler as default_profiler
+
+
+def iter_days(env, agents, episode, num_days_per_episode, recorder=None, noise="independent", timeline=None,
+              profiler=None):
+    """Run one episode in `env`, yielding one record per simulated day.
+
+    `agents` is updated in place: agents that collapse are removed, so the
+    caller's list holds the survivors once the generator is exhausted.
+    Each record is a dict with kind="day", the episode and day, the names of
+    the agents that acted, their action records (empty when a
+    TrajectoryRecorder is given) and the day's world events.
+
+    Observations are drawn once per day as an agents x shops matrix
+    (EnvironmentManager.generate_observation_matrix with the given `noise`
+    model) and each agent consumes its row. All agents decide before any acts,
+    so contended shops are allocated in one EnvironmentManager.resolve_purchases
+    call following the env's queueing policy. A utils.timeline.WorldTimeline
+    records each day's shop prices and events. Phase timings go to `profiler`
+    (a utils.profiling.PhaseProfiler, default: the process-wide one).
+    """
+    if profiler is None:
+        profiler = default_profiler
+    # The recorder's action table starts with the env's codes when the shop order agrees
+    codes_match = recorder is not None and recorder.shop_names == env.shop_names
+    for day in range(num_days_per_episode):
+        env.reset_day()
+        if timeline is not None:
+            timeline.record(episode, day, env)
+
+        timed = profiler.enabled
+        alive_agents = []
+        acted = []
+        day_actions = []
+
+        if timed:
+            t_obs = perf_counter()
+        shop_names = env.shop_names
+        action_index = env.action_index
+        observation_rows = env.generate_observation_matrix(len(agents), noise).tolist()
+        if timed:
+            profiler.record("observe_draw", perf_counter() - t_obs)
+
+        # Every agent decides first so buy requests can be resolved in bulk
+        deciders = []
+        decisions = []
+        for agent, observations in zip(agents, observation_rows):
+            if not env.is_agent_alive(agent):
+                continue
+
+            acted.append(agent.name)
+
+            if timed:
+                agent_class = agent.__class__.__name__
+                t0 = perf_counter()
+            agent.perceive(observations)
+            if timed:
+                t1 = perf_counter()
+            agent.update_belief(observations, shop_names)
+            agent.log_belief(day)
+            if timed:
+                t2 = perf_counter()
+            action = agent.decide(action_index)
+            if timed:
+                t3 = perf_counter()
+                profiler.record("observe", t1 - t0, agent_class)
+                profiler.record("belief_update", t2 - t1, agent_class)
+                profiler.record("decide", t3 - t2, agent_class)
+
+            deciders.append(agent)
+            decisions.append(action)
+
+        if timed:
+            t_resolve = perf_counter()
+        served = env.resolve_purchases(decisions, deciders).tolist()
+        if timed:
+            profiler.record("resolve", perf_counter() - t_resolve)
+
+        for agent, action, is_served in zip(deciders, decisions, served):
+            if timed:
+                t3 = perf_counter()
+            result = env.apply_agent_action(agent, action, is_served)
+            if timed:
+                profiler.record("act", perf_counter() - t3, agent.__class__.__name__)
+
+            if codes_match:
+                recorder.record_code(episode, day, agent.name, action, result, agent.beliefs)
+            elif recorder is not None:
+                recorder.record(episode, day, agent.name, action_index.names[action], result, agent.beliefs)
+            else:
+                day_actions.append({
+                    "episode": episode,
+                    "day": day,
+                    "agent_name": agent.name,
+                    "agent_type": agent.__class__.__name__,
+                    "action": action_index.names[action],
+                    "result": RESULT_LABELS[result]
+                })
+
+            if env.is_agent_alive(agent):
+                alive_agents.append(agent)
+
+        agents[:] = alive_agents
+
+        events = env.events_today
+        yield {
+            "kind": "day",
+            "episode": episode,
+            "day": day,
+            "acted": acted,
+            "actions": day_actions,
+            "events": events,
+            "survivors": len(agents),
+        }
+
+        if not agents:
+            break
+
+
+def stream_training(food_shops, actions, agents, num_episodes, num_days_per_episode,
+                    first_episode=0, recorder=None, streams=None, noise="independent",
+                    shop_capacity=1, queueing="order", timeline=None, profiler=None):
+    """Lazily run a multi-episode training session.
+
+    Yields the day records of iter_days followed, at the end of every episode,
+    by a kind="episode" record holding the survivors' results, the number of
+    surviving agents and the episode's world events. Pass num_episodes=None to
+    keep training indefinitely; nothing is accumulated between records, so
+    memory stays constant however long the run is.
+
+    Follows the loop of the POMDP training dashboard: a fresh EnvironmentManager
+    per episode, beliefs reset every 5th episode, epsilon increased each episode
+    and agents that collapse are dropped for the rest of the run. `agents` is
+    updated in place. With a utils.rng.RandomStreams, episode e's world draws
+    from streams.world(e). `noise` selects the observation noise model;
+    `shop_capacity` and `queueing` are passed to EnvironmentManager, and
+    `profiler` to iter_days.
+    """
+    if num_episodes is None:
+        episodes = itertools.count(first_episode)
+    else:
+        episodes = range(first_episode, first_episode + num_episodes)
+
+    for episode in episodes:
+        rng = streams.world(episode) if streams is not None else None
+        env = EnvironmentManager(food_shops, actions, rng=rng, shop_capacity=shop_capacity, queueing=queueing)
+
+        reset_belief = (episode % 5 == 0)
+        for agent in agents:
+            agent.reset(reset_belief=reset_belief)
+            agent.epsilon = min(agent.epsilon + 0.05, 0.6)
+
+        yield from iter_days(env, agents, episode, num_days_per_episode, recorder=recorder, noise=noise,
+                             timeline=timeline, profiler=profiler)
+
+        results = []
+        for agent in agents:
+            results.append({
+                "episode": episode,
+                "agent_name": agent.name,
+                "agent_type": agent.__class__.__name__,
+                "energy": agent.true_state["energy"],
+                "money": agent.true_state["money"],
+                "score": agent.true_state["energy"] + agent.true_state["money"]
+            })
+
+        yield {
+            "kind": "episode",
+            "episode": episode,
+            "results": results,
+            "surviving_agents": len(agents),
+            "world_events": env.world_events,
+        }
@@ -0,0 +1,158 @@
+# sweep.py
+"""Parameter sweeps over world and team settings.
+
+A design is a list of points, each a {parameter: value} dict. Parameters
+are "<Shop>.<field>" (e.g. "CheapShop.cost", "PremiumShop.success_rate")
+or "team.<role>" (e.g. "team.greedy"). Designs come from grid(),
+random_design() or latin_hypercube(); run_sweep() runs every point with
+replicas across a process pool and returns one row of survival / score
+metrics per point:
+
+    points = latin_hypercube({"CheapShop.cost": (4, 12), "team.greedy": (0, 4)}, 20, seed=1)
+    rows = run_sweep(points, food_shops, actions, team, 10, 30, num_replicas=4, cache_dir="data/sweeps")
+
+With `cache_dir`, each point's row is stored under its configuration hash
+(see simulation.cache) and points already on disk are not re-run.
+"""
+
+import copy
+import itertools
+
+import numpy as np
+
+from simulation.cache import ResultCache, config_key
+from simulation.runner import map_tasks, task_seed
+from simulation.training import TEAM_ROLES, run_training
+
+
+def grid(space):
+    """Full factorial design over {parameter: [values]}."""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def _draw(spec, u):
+    """Map uniforms u in [0, 1) onto a parameter spec.
+
+    (low, high) tuples are ranges, integer when both bounds are ints
+    (inclusive); lists are categorical choices.
+    """
+    if isinstance(spec, list):
+        return [spec[i] for i in (u * len(spec)).astype(int)]
+    low, high = spec
+    if isinstance(low, int) and isinstance(high, int):
+        return (low + (u * (high - low + 1)).astype(int)).tolist()
+    return (low + u * (high - low)).tolist()
+
+
+def random_design(space, n, seed=0):
+    """n independent uniform draws over {parameter: (low, high) or [choices]}."""
+    rng = np.random.default_rng(seed)
+    columns = {name: _draw(spec, rng.random(n)) for name, spec in space.items()}
+    return [{name: columns[name][i] for name in space} for i in range(n)]
+
+
+def latin_hypercube(space, n, seed=0):
+    """n-point Latin hypercube over {parameter: (low, high) or [choices]}.
+
+    Every parameter's range is cut into n equal strata and each stratum is
+    used exactly once, so n points cover each axis evenly.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in space.items():
+        u = (rng.permutation(n) + rng.random(n)) / n
+        columns[name] = _draw(spec, u)
+    return [{name: columns[name][i] for name in space} for i in range(n)]
+
+
+def apply_point(food_shops, team, point):
+    """Return (food_shops, team) copies with the point's parameters applied."""
+    food_shops = copy.deepcopy(food_shops)
+    team = dict(team)
+    for name, value in point.items():
+        target, _, field = name.partition(".")
+        if target == "team" and field in TEAM_ROLES:
+            team[field] = int(value)
+        elif target in food_shops and field in food_shops[target]:
+            food_shops[target][field] = value
+        else:
+            raise KeyError(f"Unknown sweep parameter {name!r} (expected '<Shop>.<field>' or 'team.<role>')")
+    return food_shops, team
+
+
+def replica_metrics(output, team_size):
+    """Survival / score metrics of one run_training output."""
+    survivors = [row["surviving_agents"] for row in output["survival_stats"]]
+    scores = [row["score"] for row in output["all_results"]]
+    lifetimes = list(output["agent_lifetimes"].values())
+    return {
+        "final_survivors": survivors[-1] if survivors else 0,
+        "survival_rate": survivors[-1] / team_size if survivors and team_size else 0.0,
+        "mean_survivors": float(np.mean(survivors)) if survivors else 0.0,
+        "mean_score": float(np.mean(scores)) if scores else 0.0,
+        "mean_lifetime": float(np.mean(lifetimes)) if lifetimes else 0.0,
+    }
+
+
+def _run_point_task(task):
+    """Worker entry point: one replica of one point, reduced to its metrics."""
+    index, seed, kwargs = task
+    output = run_training(seed=seed, **kwargs)
+    return index, replica_metrics(output, sum(kwargs["team"].values()))
+
+
+def _summarize(point_index, point, per_replica):
+    row = {"point": point_index, **point, "replicas": len(per_replica)}
+    for metric in per_replica[0]:
+        values = np.array([m[metric] for m in per_replica], dtype=np.float64)
+        row[f"{metric}_mean"] = float(values.mean())
+        row[f"{metric}_std"] = float(values.std())
+    return row
+
+
+def run_sweep(points, food_shops, actions, team, num_episodes, num_days_per_episode,
+              num_replicas=3, seed=0, workers=None, chunksize=None, cache_dir=None):
+    """Run every point of a design and return one metrics row per point.
+
+    Each point runs num_replicas training sessions; replica r is seeded from
+    (seed, r) for every point (common random numbers), so differences between
+    points are not drowned in seed noise. All (point, replica) tasks share one
+    process pool. Rows hold the point's parameters plus the mean and std over
+    replicas of final_survivors, survival_rate, mean_survivors, mean_score and
+    mean_lifetime; pd.DataFrame(rows) gives the consolidated table.
+    """
+    cache = ResultCache(max_entries=len(points) or 1, disk_dir=cache_dir) if cache_dir else None
+
+    rows = [None] * len(points)
+    keys = []
+    tasks = []
+    for i, point in enumerate(points):
+        point_shops, point_team = apply_point(food_shops, team, point)
+        key = config_key({
+            "food_shops": point_shops, "actions": actions, "team": point_team,
+            "num_episodes": num_episodes, "num_days_per_episode": num_days_per_episode,
+            "num_replicas": num_replicas, "seed": seed,
+        })
+        keys.append(key)
+        if cache is not None and key in cache:
+            rows[i] = {**cache.get(key), "point": i}
+            continue
+        kwargs = {
+            "food_shops": point_shops,
+            "actions": actions,
+            "team": point_team,
+            "num_episodes": num_episodes,
+            "num_days_per_episode": num_days_per_episode,
+        }
+        tasks.extend(((i, r), task_seed(seed, r), kwargs) for r in range(num_replicas))
+
+    per_point = {}
+    for (i, _), metrics in map_tasks(_run_point_task, tasks, workers, chunksize):
+        per_point.setdefault(i, []).append(metrics)
+
+    for i, per_replica in per_point.items():
+        rows[i] = _summarize(i, points[i], per_replica)
+        if cache is not None:
+            cache.put(keys[i], rows[i])
+    return rows
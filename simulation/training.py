@@ -0,0 +1,148 @@
+import random
+
+from agents.agent_variants import GreedyAgent, ExplorerAgent, CautiousAgent, CheapOnlyAgent
+from agents.compact import CompactGreedyAgent, CompactExplorerAgent, CompactCautiousAgent, CompactCheapOnlyAgent
+from simulation.cache import config_key
+from simulation.checkpoint import save_checkpoint, load_checkpoint, resume_episode
+from simulation.stream import stream_training
+from utils.rng import RandomStreams
+
+# Team keys -> (agent class, name prefix), in the order the dashboard builds them
+TEAM_ROLES = {
+    "explorer": (ExplorerAgent, "Explorer"),
+    "greedy": (GreedyAgent, "Greedy"),
+    "cautious": (CautiousAgent, "Cautious"),
+    "cheaponly": (CheapOnlyAgent, "CheapOnly"),
+}
+
+# Slotted equivalents used with compact=True (see agents.compact)
+COMPACT_CLASSES = {
+    "explorer": CompactExplorerAgent,
+    "greedy": CompactGreedyAgent,
+    "cautious": CompactCautiousAgent,
+    "cheaponly": CompactCheapOnlyAgent,
+}
+
+
+def build_team(team, streams=None, compact=False, agent_options=None):
+    """Create agents from a {"explorer": n, "greedy": n, ...} team description.
+
+    With a utils.rng.RandomStreams, agent i draws from its own stream
+    streams.agent(i); otherwise agents share the global `random` module.
+    compact=True builds the slotted agents.compact classes instead.
+    `agent_options` are extra constructor keywords for every agent, e.g.
+    {"memory_limit": None, "belief_keep_every": 5, "belief_after": 30}.
+    """
+    agent_options = agent_options or {}
+    agents = []
+    agent_counter = 1
+    for role, (agent_cls, prefix) in TEAM_ROLES.items():
+        for _ in range(team.get(role, 0)):
+            rng = streams.agent(agent_counter - 1) if streams is not None else None
+            cls = COMPACT_CLASSES[role] if compact else agent_cls
+            agents.append(cls(f"{prefix}{agent_counter}", rng=rng, **agent_options))
+            agent_counter += 1
+    return agents
+
+
+def run_training(food_shops, actions, team, num_episodes, num_days_per_episode,
+                 seed=None, first_episode=0, recorder=None, compact=False, timeline=None,
+                 checkpoint=None, checkpoint_every=1, agent_options=None):
+    """Run one multi-episode training session and return its records.
+
+    Collects the records of stream_training into the lists used by the
+    runners and dashboards. If a TrajectoryRecorder is given, actions (with the
+    post-action beliefs) are appended to it instead of being collected as dicts
+    in "agent_actions". A utils.timeline.WorldTimeline collects the daily
+    shop prices and events. `agent_options` go to build_team.
+
+    With a seed, every agent and every episode's world draw from their own
+    utils.rng streams, so the run is bit-reproducible in any process.
+
+    With a `checkpoint` path, the training state (surviving agents with their
+    beliefs, epsilon, state and RNG streams, the records collected so far, the
+    recorder / timeline and, for unseeded runs, the `random` module state) is
+    pickled there atomically every `checkpoint_every` episodes. A run started
+    with an existing checkpoint resumes after its last saved episode and
+    continues exactly as the uninterrupted run would.
+    """
+    streams = RandomStreams(seed) if seed is not None else None
+    fingerprint = config_key({"food_shops": food_shops, "actions": actions, "team": team,
+                              "days": num_days_per_episode, "seed": seed, "first_episode": first_episode,
+                              "compact": compact, **({"agent_options": agent_options} if agent_options else {})})
+
+    agents = build_team(team, streams, compact=compact, agent_options=agent_options)
+    all_results = []
+    agent_actions = []
+    world_events = []
+    survival_stats = []
+    agent_lifetimes = {agent.name: 0 for agent in agents}
+    next_episode = first_episode
+
+    state = load_checkpoint(checkpoint) if checkpoint is not None else None
+    if state is not None:
+        if state["fingerprint"] != fingerprint:
+            raise ValueError(f"Checkpoint {checkpoint} was written by a run with a different configuration")
+        agents = state["agents"]
+        all_results = state["all_results"]
+        agent_actions = state["agent_actions"]
+        world_events = state["world_events"]
+        survival_stats = state["survival_stats"]
+        agent_lifetimes = state["agent_lifetimes"]
+        next_episode = resume_episode(state, first_episode, num_episodes, checkpoint)
+        if state["random_state"] is not None:
+            random.setstate(state["random_state"])
+        _restore(recorder, state["recorder"])
+        _restore(timeline, state["timeline"])
+
+    remaining = first_episode + num_episodes - next_episode
+    for record in stream_training(food_shops, actions, agents, remaining, num_days_per_episode,
+                                  first_episode=next_episode, recorder=recorder, streams=streams,
+                                  timeline=timeline):
+        if record["kind"] == "day":
+            for name in record["acted"]:
+                agent_lifetimes[name] += 1
+            agent_actions.extend(record["actions"])
+            continue
+
+        episode = record["episode"]
+        for entry in record["world_events"]:
+            for event in entry["events"]:
+                world_events.append({"episode": episode, "day": entry["day"], "event": event})
+        survival_stats.append({
+            "episode": episode,
+            "surviving_agents": record["surviving_agents"]
+        })
+        all_results.extend(record["results"])
+
+        next_episode = episode + 1
+        if checkpoint is not None and ((next_episode - first_episode) % checkpoint_every == 0
+                                       or next_episode == first_episode + num_episodes):
+            save_checkpoint(checkpoint, {
+                "fingerprint": fingerprint,
+                "next_episode": next_episode,
+                "agents": agents,
+                "all_results": all_results,
+                "agent_actions": agent_actions,
+                "world_events": world_events,
+                "survival_stats": survival_stats,
+                "agent_lifetimes": agent_lifetimes,
+                # Unseeded runs draw from the global random module
+                "random_state": random.getstate() if streams is None else None,
+                "recorder": recorder,
+                "timeline": timeline,
+            })
+
+    return {
+        "all_results": all_results,
+        "agent_actions": agent_actions,
+        "world_events": world_events,
+        "survival_stats": survival_stats,
+        "agent_lifetimes": agent_lifetimes,
+    }
+
+
+def _restore(target, saved):
+    """Copy a checkpointed recorder / timeline into the caller's object."""
+    if target is not None and saved is not None:
+        target.__dict__.update(saved.__dict__)
@@ -0,0 +1,58 @@
+# tests/test_actions.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent_pomdp import AgentPOMDP
+from agents.agent_variants import CautiousAgent, CheapOnlyAgent
+from environment.actions import ActionIndex, ACTION_MOVE, ACTION_REST, split_action
+from environment.world_pomdp import EnvironmentManager
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestActionIndex(unittest.TestCase):
+    def test_codes_round_trip(self):
+        index = ActionIndex(["CheapShop", "PremiumShop"])
+        self.assertEqual(len(index), 4)
+        self.assertEqual([index.encode("move"), index.encode("rest")], [ACTION_MOVE, ACTION_REST])
+        for name in ["move", "rest", "buy_food_CheapShop", "buy_food_PremiumShop"]:
+            self.assertEqual(index.decode(index.encode(name)), name)
+        self.assertEqual(index.buy("PremiumShop"), index.buy(1))
+        self.assertEqual(index.shop_of[index.buy("PremiumShop")], 1)
+        self.assertEqual(index.shop_of[ACTION_REST], -1)
+        self.assertEqual(index.encode(ACTION_MOVE), ACTION_MOVE)
+
+    def test_split_action(self):
+        self.assertEqual(split_action("buy_food_CheapShop"), ("buy", "CheapShop"))
+        self.assertEqual(split_action("rest"), ("rest", None))
+
+    def test_decide_matches_think(self):
+        index = ActionIndex(food_shops)
+        for cls in (CautiousAgent, CheapOnlyAgent):
+            agent = cls("A")
+            self.assertEqual(index.decode(agent.decide(index)), agent.think())
+
+        class RestingAgent(AgentPOMDP):
+            def think(self):
+                return "rest"
+        self.assertEqual(RestingAgent("R").decide(index), ACTION_REST)
+
+    def test_apply_code_and_name_agree(self):
+        env = EnvironmentManager(food_shops, actions)
+        a, b = AgentPOMDP("A"), AgentPOMDP("B")
+        self.assertEqual(env.apply_agent_action(a, ACTION_REST), env.apply_agent_action(b, "rest"))
+        self.assertEqual(a.true_state, b.true_state)
+        env.apply_agent_action(a, env.action_index.buy("CheapShop"))
+        self.assertEqual(env.shop_taken_today, {"CheapShop": "A"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,11 @@
 
 import unittest
 from agents.agent import Agent
+from agents.agent_pomdp import AgentPOMDP
+from agents.agent_variants import GreedyAgent
+from agents.belief_history import BeliefHistory
+from agents.compact import CompactGreedyAgent
+from simulation.training import build_team
 import sys
 import os
 
@@ -18,5 +23,36 @@ class TestAgent(unittest.TestCase):
         self.assertIn("CheapShop", agent.q_values)
         self.assertIn("PremiumShop", agent.q_values)
 
+class TestBeliefHistory(unittest.TestCase):
+    def test_log_belief_rebuilds_snapshot(self):
+        agent = AgentPOMDP(name="TestAgent")
+        agent.log_belief(0)
+        agent.beliefs["CheapShop"]["trust"] = 0.25
+        agent.log_belief(1)
+        self.assertEqual(list(agent.memory), [])
+        self.assertEqual(agent.belief_history.snapshot(1)["CheapShop"]["trust"], 0.25)
+        self.assertNotEqual(agent.belief_history.snapshot(0)["CheapShop"]["trust"], 0.25)
+
+    def test_downsampled_retention(self):
+        history = BeliefHistory(["CheapShop"], capacity=2, keep_every=3, after=2)
+        for day in range(10):
+            history.append(day, {"CheapShop": {"expected_cost": day, "trust": 0.5}})
+        days, costs, _ = history.as_arrays()
+        self.assertEqual(days.tolist(), [0, 1, 2, 5, 8])
+        self.assertEqual(history.snapshot(7)["CheapShop"]["expected_cost"], 5.0)
+
+    def test_snapshot_is_exact_and_retention_reachable(self):
+        for cls in (GreedyAgent, CompactGreedyAgent):
+            agent = cls("G", belief_keep_every=2, belief_after=1)
+            agent.beliefs["CheapShop"]["trust"] = 0.7
+            for day in range(5):
+                agent.log_belief(day)
+            self.assertEqual(agent.belief_history.as_arrays()[0].tolist(), [0, 1, 3])
+            self.assertEqual(agent.belief_history.snapshot(4), {s: dict(b) for s, b in agent.beliefs.items()})
+
+        team = build_team({"greedy": 1}, agent_options={"belief_keep_every": 3, "belief_after": 0})
+        self.assertEqual(team[0].belief_history.keep_every, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_background.py
+
+import unittest
+import sys
+import os
+import itertools
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.background import BackgroundWorker, TrainingWorker
+from simulation.checkpoint import load_checkpoint
+from simulation.training import build_team
+from utils.rng import RandomStreams
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestBackgroundWorker(unittest.TestCase):
+    def test_training_worker_publishes_episodes(self):
+        worker = TrainingWorker(food_shops, actions, build_team({"greedy": 2}), 3, 4)
+        worker.start()
+        worker.join(timeout=10)
+        updates = worker.drain()
+        self.assertEqual([u["kind"] for u in updates], ["episode"] * 3 + ["done"])
+        self.assertIn("Greedy1", updates[0]["agent_lifetimes"])
+        self.assertEqual(worker.status, "done")
+
+    def test_checkpointed_worker_resumes(self):
+        def run(num_episodes, agents=None, **kwargs):
+            if agents is None:
+                agents = build_team({"greedy": 2, "cautious": 2}, RandomStreams(3))
+            worker = TrainingWorker(food_shops, actions, agents, num_episodes, 6, streams=RandomStreams(3),
+                                    **kwargs)
+            worker.start()
+            worker.join(timeout=10)
+            return [u for u in worker.drain() if u["kind"] == "episode"]
+
+        uninterrupted = run(5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run.ckpt")
+            run(2, checkpoint=path, fingerprint="key")
+            state = load_checkpoint(path)
+            self.assertEqual((state["fingerprint"], state["next_episode"]), ("key", 2))
+            resumed = run(3, agents=state["agents"], first_episode=2, checkpoint=path,
+                          agent_lifetimes=state["agent_lifetimes"], episodes=state["episodes"])
+            self.assertEqual(len(load_checkpoint(path)["episodes"]), 5)
+        self.assertEqual([u["results"] for u in state["episodes"] + resumed],
+                         [u["results"] for u in uninterrupted])
+        self.assertEqual(resumed[-1]["agent_lifetimes"], uninterrupted[-1]["agent_lifetimes"])
+
+    def test_cancel_stops_unbounded_stream(self):
+        gate = threading.Event()
+
+        def endless():
+            for i in itertools.count():
+                gate.wait()
+                yield {"kind": "tick", "i": i}
+
+        worker = BackgroundWorker(endless)
+        worker.start()
+        worker.cancel()
+        gate.set()
+        worker.join(timeout=10)
+        self.assertEqual(worker.status, "cancelled")
+        self.assertEqual(worker.drain()[-1], {"kind": "cancelled"})
+
+    def test_terminal_record_queued_before_status_changes(self):
+        worker = BackgroundWorker(lambda: iter([{"kind": "tick"}]))
+        status_at_put = []
+        put = worker.updates.put
+        worker.updates.put = lambda item: (status_at_put.append(worker.status), put(item))
+        worker.start()
+        worker.join(timeout=10)
+        # Whoever sees finished=True can still drain the "done" record
+        self.assertEqual(status_at_put, ["running", "running"])
+        self.assertEqual(worker.drain()[-1], {"kind": "done"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+# tests/test_benchmarks.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_simulation import run_suite, compare
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_suite_reports_throughput(self):
+        results = run_suite(["think", "population"], [5], [2, 3], [2], repeat=1)
+        self.assertEqual(len(results), 4)
+        for r in results:
+            self.assertEqual(r["agent_steps"], 10)
+            self.assertGreater(r["steps_per_sec"], 0)
+
+    def test_compare_flags_slowdowns(self):
+        results = [{"key": "k", "steps_per_sec": 50.0, "peak_mb": 1.0}]
+        self.assertEqual(compare(results, {"k": {"steps_per_sec": 55.0, "peak_mb": 1.0}}), [])
+        self.assertEqual(len(compare(results, {"k": {"steps_per_sec": 100.0, "peak_mb": 1.0}})), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
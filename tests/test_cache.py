@@ -0,0 +1,40 @@
+# tests/test_cache.py
+
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.cache import ResultCache, config_key
+
+
+class TestResultCache(unittest.TestCase):
+    def test_key_ignores_dict_order(self):
+        a = {"world": {"CheapShop": {"cost": 8}}, "seed": 1, "team": {"greedy": 2}}
+        b = {"team": {"greedy": 2}, "seed": 1, "world": {"CheapShop": {"cost": 8}}}
+        self.assertEqual(config_key(a), config_key(b))
+        self.assertNotEqual(config_key(a), config_key(dict(a, seed=2)))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_disk_tier_survives_eviction_and_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(max_entries=1, disk_dir=tmp)
+            cache.put("a", {"score": [1, 2]})
+            cache.put("b", {"score": [3]})
+            self.assertEqual(cache.get("a"), {"score": [1, 2]})
+            self.assertEqual(ResultCache(disk_dir=tmp).get("b"), {"score": [3]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_checkpoint.py
+
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.checkpoint import save_checkpoint, load_checkpoint
+from simulation.training import run_training
+from utils.timeline import WorldTimeline
+from utils.trajectory import TrajectoryRecorder
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+team = {"explorer": 1, "greedy": 2, "cautious": 1, "cheaponly": 1}
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resume_matches_uninterrupted_run(self):
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                full = run_training(food_shops, actions, team, 6, 5, seed=3, compact=compact)
+                # "Crash" after 3 episodes, then resume in a fresh call
+                run_training(food_shops, actions, team, 3, 5, seed=3, compact=compact, checkpoint=self.path)
+                self.assertEqual(load_checkpoint(self.path)["next_episode"], 3)
+                resumed = run_training(food_shops, actions, team, 6, 5, seed=3, compact=compact,
+                                       checkpoint=self.path)
+                self.assertEqual(resumed, full)
+
+    def test_resume_unseeded_restores_random_state(self):
+        random.seed(11)
+        full = run_training(food_shops, actions, team, 4, 5)
+        random.seed(11)
+        run_training(food_shops, actions, team, 2, 5, checkpoint=self.path)
+        random.random()  # unrelated draws between crash and resume
+        resumed = run_training(food_shops, actions, team, 4, 5, checkpoint=self.path)
+        self.assertEqual(resumed, full)
+
+    def test_resume_restores_recorder_and_timeline(self):
+        shops = list(food_shops)
+        full_rec, full_tl = TrajectoryRecorder(shops), WorldTimeline(shops, 5)
+        run_training(food_shops, actions, team, 4, 5, seed=5, recorder=full_rec, timeline=full_tl)
+
+        run_training(food_shops, actions, team, 2, 5, seed=5, recorder=TrajectoryRecorder(shops),
+                     timeline=WorldTimeline(shops, 5), checkpoint=self.path)
+        rec, tl = TrajectoryRecorder(shops), WorldTimeline(shops, 5)
+        run_training(food_shops, actions, team, 4, 5, seed=5, recorder=rec, timeline=tl, checkpoint=self.path)
+        self.assertTrue(full_rec.to_frame().equals(rec.to_frame()))
+        self.assertTrue((full_tl.flags == tl.flags).all())
+
+    def test_checkpoint_every(self):
+        run_training(food_shops, actions, team, 5, 3, seed=1, checkpoint=self.path, checkpoint_every=2)
+        # Saved after episodes 2 and 4, and always after the last one
+        self.assertEqual(load_checkpoint(self.path)["next_episode"], 5)
+
+    def test_config_mismatch_rejected(self):
+        run_training(food_shops, actions, team, 1, 3, seed=1, checkpoint=self.path)
+        with self.assertRaises(ValueError):
+            run_training(food_shops, actions, team, 2, 3, seed=2, checkpoint=self.path)
+
+    def test_checkpoint_past_run_rejected(self):
+        run_training(food_shops, actions, team, 4, 3, seed=1, checkpoint=self.path)
+        with self.assertRaises(ValueError):
+            run_training(food_shops, actions, team, 2, 3, seed=1, checkpoint=self.path)
+        # Resuming a finished run of the same length is a no-op
+        self.assertEqual(len(run_training(food_shops, actions, team, 4, 3, seed=1,
+                                          checkpoint=self.path)["survival_stats"]), 4)
+
+    def test_failed_write_keeps_previous_checkpoint(self):
+        save_checkpoint(self.path, {"value": 1})
+        with self.assertRaises(Exception):
+            save_checkpoint(self.path, {"value": lambda: None})  # not picklable
+        self.assertEqual(load_checkpoint(self.path)["value"], 1)
+        self.assertEqual(os.listdir(self.tmp.name), ["run.ckpt"])
+        self.assertIsNone(load_checkpoint(os.path.join(self.tmp.name, "missing.ckpt")))
+
+
+if __name__ == '__main__':
+    unittest.main()
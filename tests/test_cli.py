@@ -0,0 +1,56 @@
+# tests/test_cli.py
+
+import unittest
+import sys
+import os
+import io
+import json
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.cli import main, parse_team, build_parser, resolve_config
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestCLI(unittest.TestCase):
+    def test_parse_team(self):
+        self.assertEqual(parse_team("greedy=3, Cautious=2"), {"greedy": 3, "cautious": 2})
+
+    def test_flags_override_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.yaml")
+            with open(path, "w") as f:
+                f.write("episodes: 7\ndays: 4\nseed: 2\nteam:\n  greedy: 1\n")
+            config = resolve_config(build_parser().parse_args(["--config", path, "--days", "9"]))
+        self.assertEqual((config["episodes"], config["days"], config["seed"]), (7, 9, 2))
+        self.assertEqual(config["team"], {"greedy": 1})
+
+    def test_missing_explicit_config(self):
+        with self.assertRaises(FileNotFoundError):
+            resolve_config(build_parser().parse_args(["--config", "does-not-exist.yaml"]))
+
+    def test_run_writes_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_path = os.path.join(tmp, "run.json")
+            with redirect_stdout(io.StringIO()):
+                output = main(["--episodes", "2", "--days", "3", "--seed", "1", "--team", "greedy=2",
+                               "--output", out_path, "--quiet"])
+            with open(out_path) as f:
+                self.assertEqual(json.load(f)["all_results"], output["all_results"])
+
+    def test_headless_run_skips_heavy_imports(self):
+        code = ("import sys, io, contextlib\n"
+                "from simulation.cli import main\n"
+                "with contextlib.redirect_stdout(io.StringIO()):\n"
+                "    main(['--episodes', '1', '--days', '2', '--seed', '0'])\n"
+                "print([m for m in ('pandas', 'matplotlib', 'plotly', 'pyarrow') if m in sys.modules])\n")
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
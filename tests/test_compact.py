@@ -0,0 +1,96 @@
+# tests/test_compact.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import tracemalloc
+
+from agents.agent import Agent
+from agents.agent_variants import GreedyAgent, CautiousAgent
+from agents.compact import CompactAgent, CompactGreedyAgent, CompactCautiousAgent
+from environment.population import Population, POLICY_CAUTIOUS
+from environment.world_pomdp import EnvironmentManager
+from simulation.training import build_team, run_training
+from utils.rng import RandomStreams
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+def strip_type(rows):
+    return [{k: v for k, v in row.items() if k != "agent_type"} for row in rows]
+
+
+class TestCompactAgents(unittest.TestCase):
+    def test_views_read_and_write_flat_state(self):
+        agent = CompactGreedyAgent("A")
+        agent.true_state["energy"] -= 20
+        agent.beliefs["PremiumShop"]["trust"] = 0.5
+        self.assertEqual(agent.energy, 100)
+        self.assertEqual(agent.trust[1], 0.5)
+        self.assertEqual(list(agent.beliefs), ["CheapShop", "PremiumShop"])
+        self.assertEqual(dict(agent.true_state), {"energy": 100, "money": 100})
+        with self.assertRaises(KeyError):
+            agent.true_state["mood"]
+        with self.assertRaises(AttributeError):
+            agent.extra = 1
+
+        basic = CompactAgent("B")
+        basic.q_values["CheapShop"] += 5
+        self.assertEqual(basic.q, [10, 10])
+        self.assertEqual(basic.state["energy"], Agent("B").state["energy"])
+
+    def test_seeded_run_matches_dict_agents(self):
+        team = {"explorer": 2, "greedy": 2, "cautious": 1, "cheaponly": 1}
+        plain = run_training(food_shops, actions, team, 6, 10, seed=5)
+        compact = run_training(food_shops, actions, team, 6, 10, seed=5, compact=True)
+        self.assertEqual(strip_type(plain["agent_actions"]), strip_type(compact["agent_actions"]))
+        self.assertEqual(strip_type(plain["all_results"]), strip_type(compact["all_results"]))
+
+    def test_environment_and_population_accept_compact_agents(self):
+        agents = build_team({"cautious": 2}, RandomStreams(0), compact=True)
+        env = EnvironmentManager(food_shops, actions)
+        env.apply_agent_action(agents[0], env.action_index.buy("CheapShop"))
+        self.assertLessEqual(agents[0].trust[0], 1.0)
+        pop = Population.from_agents(agents)
+        self.assertEqual(pop.policy.tolist(), [POLICY_CAUTIOUS] * 2)
+        self.assertEqual(pop.energy[0], agents[0].energy)
+
+    def test_policies_shared_with_dict_agents(self):
+        # Actions run the same code; only storage and the belief reads in choose_shop differ
+        self.assertIs(CompactGreedyAgent.act, GreedyAgent.act)
+        self.assertIs(CompactCautiousAgent.decide, CautiousAgent.decide)
+        self.assertIs(CompactAgent.think, Agent.think)
+
+        env = EnvironmentManager(food_shops, actions)
+        agent = CompactGreedyAgent("G", rng=random.Random(0))
+        agent.trust[0] = 0.98
+        env.apply_agent_action(agent, env.action_index.buy("CheapShop"))
+        self.assertLessEqual(agent.trust[0], 1.0)
+        self.assertEqual(env.is_agent_alive(agent), agent.energy > 0 and agent.money > 0)
+
+        # Trust starts within [0, 1], so apply_outcome only clips the shop it changes
+        for seed in range(50):
+            for cls in (GreedyAgent, CompactGreedyAgent):
+                trust = [b["trust"] for b in cls("T", rng=random.Random(seed)).beliefs.values()]
+                self.assertTrue(all(0.0 <= t <= 1.0 for t in trust))
+
+    def test_smaller_than_dict_agents(self):
+        def per_agent(cls):
+            tracemalloc.start()
+            agents = [cls(f"A{i}") for i in range(500)]
+            size, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return size / len(agents)
+        self.assertLess(per_agent(CompactGreedyAgent), per_agent(GreedyAgent) / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
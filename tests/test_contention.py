@@ -0,0 +1,97 @@
+# tests/test_contention.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.agent_pomdp import AgentPOMDP
+from environment.actions import RESULT_FAIL, RESULT_SUCCESS
+from environment.contention import resolve_contention
+from environment.world_pomdp import EnvironmentManager
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestResolveContention(unittest.TestCase):
+    def test_order_serves_first_comers(self):
+        served = resolve_contention([0, 1, 0, 0, 1], [2, 1])
+        self.assertEqual(served.tolist(), [True, True, True, False, False])
+
+    def test_priority_serves_highest_first(self):
+        served = resolve_contention([0, 0, 0], [1, 0], "priority", priority=[1, 5, 5])
+        self.assertEqual(served.tolist(), [False, True, False])
+
+    def test_random_respects_capacity(self):
+        rng = np.random.default_rng(0)
+        served = resolve_contention([0] * 10 + [1] * 3, [4, 5], "random", rng=rng)
+        self.assertEqual(served[:10].sum(), 4)
+        self.assertTrue(served[10:].all())
+
+    def test_groups_have_separate_queues(self):
+        served = resolve_contention([0, 0, 0, 0], [[1, 1], [2, 1]], groups=[0, 0, 1, 1])
+        self.assertEqual(served.tolist(), [True, False, True, True])
+
+    def test_unknown_queueing(self):
+        with self.assertRaises(ValueError):
+            resolve_contention([0], [1], "lottery")
+
+
+class TestEnvironmentCapacity(unittest.TestCase):
+    def test_resolve_then_apply(self):
+        env = EnvironmentManager(food_shops, actions, shop_capacity={"CheapShop": 2}, queueing="priority")
+        agents = [AgentPOMDP(f"A{i}") for i in range(3)]
+        for i, agent in enumerate(agents):
+            agent.true_state["energy"] = 50 + 10 * i
+
+        requests = ["buy_food_CheapShop"] * 3 + ["rest"]
+        served = env.resolve_purchases(requests, agents + [agents[0]])
+        # The two hungriest agents get the two places; rest is never "served"
+        self.assertEqual(served.tolist(), [True, True, False, False])
+
+        energy_before = agents[2].true_state["energy"]
+        for agent, is_served in zip(agents, served.tolist()):
+            env.apply_agent_action(agent, "buy_food_CheapShop", is_served)
+        self.assertEqual(env.shop_load_today["CheapShop"], 2)
+        self.assertEqual(env.shop_taken_today["CheapShop"], "A0")
+        self.assertEqual(agents[2].true_state["energy"], energy_before - 12)
+        self.assertEqual(env.remaining_capacity().tolist(), [0, 1])
+
+    def test_served_mask_ignores_names(self):
+        shops = {name: dict(info, success_rate=1.0) for name, info in food_shops.items()}
+        env = EnvironmentManager(shops, actions, shop_capacity=1)
+        twins = [AgentPOMDP("Twin"), AgentPOMDP("Twin")]
+        buy = env.action_index.buy("CheapShop")
+        served = env.resolve_purchases([buy, buy], twins)
+        self.assertEqual(served.tolist(), [True, False])
+
+        before = [agent.true_state["energy"] for agent in twins]
+        results = [env.apply_agent_action(agent, buy, is_served) for agent, is_served in zip(twins, served.tolist())]
+        self.assertEqual(results, [RESULT_SUCCESS, RESULT_FAIL])
+        self.assertEqual(twins[0].true_state["energy"], before[0] - 2 + 25)
+        self.assertEqual(twins[1].true_state["energy"], before[1] - 12)
+
+    def test_apply_without_resolve_uses_capacity(self):
+        env = EnvironmentManager(food_shops, actions, shop_capacity=1)
+        a, b = AgentPOMDP("A"), AgentPOMDP("B")
+        env.apply_agent_action(a, "buy_food_PremiumShop")
+        energy_before = b.true_state["energy"]
+        self.assertEqual(env.apply_agent_action(b, "buy_food_PremiumShop"), RESULT_FAIL)
+        self.assertEqual(list(b.memory), [("buy_food_PremiumShop", "fail")])
+        self.assertEqual(b.true_state["energy"], energy_before - 12)
+
+    def test_nothing_to_resolve(self):
+        env = EnvironmentManager(food_shops, actions)
+        self.assertEqual(env.resolve_purchases([]).tolist(), [])
+        self.assertEqual(env.resolve_purchases(["move", "rest"]).tolist(), [False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# tests/test_event_response.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent_variants import GreedyAgent, CheapOnlyAgent
+from simulation.stream import stream_training
+from utils.event_response import EventResponseAggregator
+from utils.rng import RandomStreams
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestEventResponseAggregator(unittest.TestCase):
+    def test_counts_next_day_choices(self):
+        agg = EventResponseAggregator()
+        agg.add_action(0, 2, "buy_food_CheapShop")
+        agg.add_action(0, 2, "buy_food_CheapShop")
+        agg.add_action(0, 2, "rest")
+        agg.add_action(1, 2, "buy_food_PremiumShop")
+        agg.add_events(0, [{"day": 2, "events": ["CheapShop Closed"]}, {"day": 4, "events": ["x"]}])
+        (day, events, counts), (_, _, later) = agg.responses(0)
+        self.assertEqual((day, events), (2, ["CheapShop Closed"]))
+        self.assertEqual(counts, {"CheapShop": 2, "rest": 1})
+        self.assertEqual(later, {})
+        self.assertEqual(agg.responses(1), [])
+
+    def test_matches_filtering_the_history(self):
+        agents = [GreedyAgent(f"G{i}") for i in range(3)] + [CheapOnlyAgent("C")]
+        agg = EventResponseAggregator()
+        history = []
+        for record in stream_training(food_shops, actions, agents, 3, 15, streams=RandomStreams(4)):
+            if record["kind"] == "day":
+                agg.add_day(record)
+                history.extend(record["actions"])
+                continue
+            episode = record["episode"]
+            agg.add_events(episode, record["world_events"])
+            for day, _, counts in agg.responses(episode):
+                expected = {}
+                for row in history:
+                    if row["episode"] == episode and row["day"] == day:
+                        shop = row["action"].split("_")[-1]
+                        expected[shop] = expected.get(shop, 0) + 1
+                self.assertEqual(dict(counts), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
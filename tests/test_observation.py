@@ -0,0 +1,52 @@
+# tests/test_observation.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.agent_pomdp import AgentPOMDP
+from environment.observation import observation_noise
+from environment.world_pomdp import EnvironmentManager
+from utils.rng import RandomStreams
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestObservationMatrix(unittest.TestCase):
+    def test_matrix_shape_and_range(self):
+        env = EnvironmentManager(food_shops, actions, rng=RandomStreams(0).world(0))
+        obs = env.generate_observation_matrix(500)
+        self.assertEqual(obs.shape, (500, 2))
+        self.assertEqual(obs[:, 0].min(), 5)
+        self.assertEqual(obs[:, 1].max(), 18)
+
+    def test_noise_models(self):
+        rng = np.random.default_rng(0)
+        shared = observation_noise(rng, 4, 3, "shared")
+        self.assertTrue((shared == shared[0]).all())
+        groups = np.array([0, 0, 1, 1])
+        grouped = observation_noise(rng, 4, 3, "shared", groups=groups)
+        self.assertTrue((grouped[0] == grouped[1]).all() and (grouped[2] == grouped[3]).all())
+        correlated = observation_noise(rng, 1000, 2, "correlated", correlation=0.9)
+        self.assertTrue(np.abs(correlated).max() <= 3)
+        with self.assertRaises(ValueError):
+            observation_noise(rng, 1, 1, "bogus")
+
+    def test_update_belief_from_row(self):
+        agent = AgentPOMDP("A")
+        before = agent.beliefs["PremiumShop"]["expected_cost"]
+        agent.update_belief(np.array([10, 20]), ["CheapShop", "PremiumShop"])
+        self.assertAlmostEqual(agent.beliefs["PremiumShop"]["expected_cost"], 0.8 * before + 4.0)
+        self.assertIsInstance(agent.beliefs["PremiumShop"]["expected_cost"], float)
+
+
+if __name__ == '__main__':
+    unittest.main()
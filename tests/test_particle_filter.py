@@ -0,0 +1,68 @@
+# tests/test_particle_filter.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.particle_filter import ParticleBeliefs
+from environment.population import Population
+from environment.world_pomdp import EnvironmentManager
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestParticleBeliefs(unittest.TestCase):
+    def test_posteriors_track_the_truth(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        beliefs = ParticleBeliefs(np.full((n, 2), [10.0, 20.0]), np.full((n, 2), 0.8), n_particles=128,
+                                  cost_drift=0.3, success_drift=0.01, rng=rng)
+        idx = np.arange(n)
+        for _ in range(30):
+            beliefs.predict(idx)
+            beliefs.observe_costs(idx, np.array([6.0, 25.0]) + rng.integers(-3, 4, (n, 2)))
+            shop = rng.integers(0, 2, n)
+            beliefs.observe_outcomes(idx, shop, rng.random(n) < np.where(shop == 0, 0.3, 0.95))
+
+        cost = beliefs.expected_cost().mean(axis=0)
+        success = beliefs.success_rate().mean(axis=0)
+        self.assertTrue(np.allclose(cost, [6.0, 25.0], atol=1.0), cost)
+        self.assertLess(success[0], 0.5)
+        self.assertGreater(success[1], 0.8)
+        self.assertTrue(np.allclose(beliefs.weights.sum(axis=-1), 1.0))
+        self.assertGreater(beliefs.effective_sample_size().min(), 1.0)
+
+    def test_only_selected_rows_change(self):
+        beliefs = ParticleBeliefs(np.full((3, 2), 10.0), np.full((3, 2), 0.5), n_particles=16,
+                                  rng=np.random.default_rng(1))
+        before = beliefs.weights.copy(), beliefs.cost.copy()
+        beliefs.observe_outcomes(np.array([1]), np.array([0]), np.array([True]))
+        self.assertTrue(np.array_equal(beliefs.weights[[0, 2]], before[0][[0, 2]]))
+        self.assertTrue(np.array_equal(beliefs.weights[1, 1], before[0][1, 1]))
+        self.assertTrue(np.array_equal(beliefs.cost[[0, 2]], before[1][[0, 2]]))
+
+
+class TestPopulationParticleBackend(unittest.TestCase):
+    def test_step_with_particle_filter(self):
+        pop = Population.spawn(1000, list(food_shops), rng=np.random.default_rng(3))
+        pop.use_particle_filter(n_particles=32)
+        env = EnvironmentManager(food_shops, actions, shop_capacity=100)
+        for _ in range(5):
+            env.reset_day()
+            idx, choice, results = pop.step(env)
+        self.assertEqual(pop.particles.cost.shape, (1000, 2, 32))
+        self.assertTrue(np.all((pop.trust >= 0) & (pop.trust <= 1)))
+        self.assertTrue(np.allclose(pop.expected_cost[idx], pop.particles.expected_cost(idx)))
+        self.assertTrue(np.allclose(pop.trust[idx], pop.particles.success_rate(idx)))
+
+
+if __name__ == '__main__':
+    unittest.main()
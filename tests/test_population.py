@@ -0,0 +1,157 @@
+# tests/test_population.py
+
+import unittest
+import sys
+import os
+import copy
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.agent_variants import GreedyAgent, CautiousAgent, CheapOnlyAgent
+from environment.world_pomdp import EnvironmentManager
+from environment.batched import BatchedEnvironment
+from environment.population import Population, POLICY_CAUTIOUS, POLICY_CHEAP_ONLY, RESULT_FAIL
+from simulation.stream import iter_days
+from simulation.training import build_team
+from utils.rng import RandomStreams
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 1.0},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 1.0}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestPopulation(unittest.TestCase):
+    def test_from_agents_round_trip(self):
+        agents = [GreedyAgent("A"), CautiousAgent("B"), CheapOnlyAgent("C")]
+        pop = Population.from_agents(agents)
+        self.assertEqual(pop.policy.tolist(), [0, POLICY_CAUTIOUS, POLICY_CHEAP_ONLY])
+        pop.energy[:] = 7
+        pop.trust[:, 0] = 0.5
+        pop.write_back(agents)
+        self.assertEqual(agents[1].true_state["energy"], 7)
+        self.assertEqual(agents[2].beliefs["CheapShop"]["trust"], 0.5)
+
+    def test_update_belief_moving_average(self):
+        pop = Population.spawn(3, ["CheapShop", "PremiumShop"], rng=np.random.default_rng(0))
+        before = pop.expected_cost.copy()
+        mask = np.array([True, False, True])
+        observed = np.full((2, 2), 10.0)
+        pop.update_belief(observed, mask)
+        np.testing.assert_allclose(pop.expected_cost[mask], 0.8 * before[mask] + 2.0)
+        np.testing.assert_allclose(pop.expected_cost[1], before[1])
+
+    def test_only_first_buyer_served(self):
+        env = EnvironmentManager(food_shops, actions)
+        pop = Population.spawn(4, ["CheapShop", "PremiumShop"], policy=POLICY_CHEAP_ONLY,
+                               rng=np.random.default_rng(1))
+        mask = pop.alive()
+        results = pop.act(env, pop.think(mask), mask)
+        self.assertEqual(env.shop_taken_today, {"CheapShop": "Agent1"})
+        self.assertEqual(results[1:].tolist(), [RESULT_FAIL] * 3)
+        self.assertEqual(pop.energy.tolist(), [120 - 2 + 25, 108, 108, 108])
+        self.assertEqual(pop.money.tolist(), [92, 100, 100, 100])
+
+    def test_dead_agents_do_not_act(self):
+        env = EnvironmentManager(food_shops, actions)
+        pop = Population.spawn(3, ["CheapShop", "PremiumShop"], rng=np.random.default_rng(2))
+        pop.energy[0] = 0
+        idx, _, _ = pop.step(env)
+        self.assertEqual(idx.tolist(), [1, 2])
+        self.assertEqual(pop.days_alive.tolist(), [0, 1, 1])
+
+
+
+class RecordingEnvironment(EnvironmentManager):
+    """Keeps a copy of every day's shops so another run can replay the same world."""
+    def reset_day(self):
+        super().reset_day()
+        self.history.append(copy.deepcopy(self.food_shops))
+
+
+class ReplayEnvironment(EnvironmentManager):
+    """Serves the days recorded by a RecordingEnvironment instead of drawing new ones."""
+    def reset_day(self):
+        self.shop_taken_today = {}
+        self.shop_load_today = {}
+        self.day += 1
+        self.food_shops = self.history[self.day - 1]
+
+
+class TestPopulationMatchesAgents(unittest.TestCase):
+    def run_both(self, seed, team, num_days, shop_capacity):
+        """(object stats, population stats) from identical agents in the same daily worlds.
+
+        Stats are survival rate, mean energy, mean money and the CheapShop
+        share of buy decisions.
+        """
+        shops = {"CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+                 "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}}
+        agents = build_team(team, RandomStreams(seed))
+        everyone = list(agents)
+        pop = Population.from_agents(agents, rng=np.random.default_rng(seed))
+
+        env = RecordingEnvironment(shops, actions, rng=random.Random(seed), shop_capacity=shop_capacity)
+        env.history = []
+        buys = np.zeros(2)
+        for record in iter_days(env, agents, 0, num_days):
+            for action in record["actions"]:
+                buys[int(action["action"] != "buy_food_CheapShop")] += 1
+        objects = [np.mean([a.is_alive() for a in everyone]),
+                   np.mean([a.true_state["energy"] for a in everyone]),
+                   np.mean([a.true_state["money"] for a in everyone]),
+                   buys[0] / buys.sum()]
+
+        replay = ReplayEnvironment(shops, actions, shop_capacity=shop_capacity)
+        replay.history = env.history
+        buys = np.zeros(2)
+        for _ in env.history:
+            replay.reset_day()
+            _, choice, _ = pop.step(replay)
+            buys += np.bincount(choice, minlength=2)
+        vectorized = [pop.alive().mean(), pop.energy.mean(), pop.money.mean(), buys[0] / buys.sum()]
+        return objects, vectorized
+
+    def test_monte_carlo_statistics_match(self):
+        team = {"explorer": 50, "greedy": 150, "cautious": 50, "cheaponly": 50}
+        runs = [self.run_both(seed, team, num_days=20, shop_capacity=60) for seed in range(4)]
+        objects = np.mean([r[0] for r in runs], axis=0)
+        vectorized = np.mean([r[1] for r in runs], axis=0)
+
+        survival, energy, money, cheap_share = objects
+        self.assertGreater(survival, 0.05)  # both collapse and survival are exercised
+        self.assertLess(survival, 0.95)
+        self.assertAlmostEqual(vectorized[0], survival, delta=0.03)
+        self.assertAlmostEqual(vectorized[1], energy, delta=0.08 * energy)
+        self.assertAlmostEqual(vectorized[2], money, delta=0.08 * money)
+        self.assertAlmostEqual(vectorized[3], cheap_share, delta=0.03)
+
+
+class TestBatchedEnvironment(unittest.TestCase):
+    def test_contention_is_per_world(self):
+        env = BatchedEnvironment(food_shops, actions, num_worlds=3, rng=np.random.default_rng(0))
+        pop = Population.spawn(2, env.shop_names, policy=POLICY_CHEAP_ONLY,
+                               rng=np.random.default_rng(0)).replicate(3)
+        self.assertEqual(pop.world.tolist(), [0, 0, 1, 1, 2, 2])
+        mask = pop.alive()
+        pop.act(env, pop.think(mask), mask)
+        self.assertEqual(env.load[:, 0].tolist(), [1, 1, 1])
+        self.assertEqual(pop.money.tolist(), [92, 100] * 3)
+
+    def test_reset_day_events_per_world(self):
+        env = BatchedEnvironment(food_shops, actions, num_worlds=200, rng=np.random.default_rng(3))
+        for _ in range(5):
+            env.reset_day()
+            self.assertTrue((env.cost >= 1).all())
+            closed = env.success_rate[:, 0] == 0.0
+            self.assertEqual(closed.tolist(), env.closed_today.tolist())
+        self.assertTrue(0 < sum(len(ev) for ev in env.world_events) < 1000)
+        self.assertEqual(env.day, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# tests/test_profiling.py
+
+import unittest
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.stream import stream_training
+from simulation.training import run_training, build_team
+from utils.profiling import PhaseProfiler, profiler, PHASES
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestPhaseProfiler(unittest.TestCase):
+    def test_disabled_phase_records_nothing(self):
+        prof = PhaseProfiler()
+        with prof.phase("analysis"):
+            pass
+        self.assertEqual(prof.summary(), [])
+
+    def test_day_loop_phases_per_agent_class(self):
+        profiler.reset()
+        profiler.enable()
+        try:
+            out = run_training(food_shops, actions, {"greedy": 2, "cautious": 1}, 2, 3, seed=0)
+        finally:
+            profiler.disable()
+        rows = profiler.summary()
+        profiler.reset()
+        self.assertEqual({r["phase"] for r in rows}, set(PHASES))
+        steps = sum(out["agent_lifetimes"].values())
+        self.assertEqual(sum(r["count"] for r in rows if r["phase"] == "act"), steps)
+        self.assertEqual(sum(r["count"] for r in rows if r["phase"] == "observe"), steps)
+        # One matrix draw per simulated day, not attributed to an agent class
+        draws = [r for r in rows if r["phase"] == "observe_draw"]
+        self.assertEqual([r["agent_class"] for r in draws], [None])
+        self.assertLessEqual(draws[0]["count"], 2 * 3)
+        greedy = [r for r in rows if r["agent_class"] == "GreedyAgent"][0]
+        self.assertLessEqual(greedy["p50_us"], greedy["p99_us"])
+        self.assertEqual(len(json.loads(PhaseProfiler().dump())["phases"]), 0)
+
+    def test_per_run_profiler(self):
+        profiler.reset()
+        run_profiler = PhaseProfiler(enabled=True)
+        for _ in stream_training(food_shops, actions, build_team({"greedy": 2}), 1, 3, profiler=run_profiler):
+            pass
+        self.assertEqual({r["phase"] for r in run_profiler.summary()}, set(PHASES))
+        self.assertEqual(profiler.summary(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
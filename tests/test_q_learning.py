@@ -0,0 +1,105 @@
+# tests/test_q_learning.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.agent import Agent
+from agents.compact import CompactAgent
+from environment.actions import ACTION_MOVE, ACTION_REST, RESULT_SUCCESS, RESULT_FAIL
+from environment.q_learning import QLearningPopulation
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 1.0},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 1.0}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestQLearningPopulation(unittest.TestCase):
+    def test_batched_update(self):
+        pop = QLearningPopulation.spawn(3, list(food_shops), epsilon=0.0, alpha=0.5, gamma=0.9,
+                                        rng=np.random.default_rng(0))
+        buy_cheap = pop.index.buy("CheapShop")
+        pop.q[:, :, :, buy_cheap] = 1.0  # every agent prefers CheapShop
+        e, m = pop.states(np.arange(3))
+
+        idx, codes, results = pop.step(food_shops, actions)
+        self.assertEqual(codes.tolist(), [buy_cheap] * 3)
+        # One place at CheapShop: the first agent is served, the others are turned away
+        self.assertEqual(results.tolist(), [RESULT_SUCCESS, RESULT_FAIL, RESULT_FAIL])
+        self.assertEqual(pop.energy.tolist(), [70, 35, 35])
+        self.assertEqual(pop.money.tolist(), [92, 100, 100])
+
+        e2, m2 = pop.states(np.arange(3))
+        # reward = change in energy + money: +20 energy - 8 money for the served agent
+        self.assertAlmostEqual(pop.q[0, e[0], m[0], buy_cheap], 1.0 + 0.5 * (12 + 0.9 * 1.0 - 1.0))
+        self.assertAlmostEqual(pop.q[1, e[1], m[1], buy_cheap], 1.0 + 0.5 * (-15 + 0.9 * 1.0 - 1.0))
+        self.assertEqual(pop.q[0, e[0], m[0], ACTION_MOVE], 0.0)
+
+    def test_collapse_is_terminal(self):
+        pop = QLearningPopulation.spawn(1, list(food_shops), energy=10, epsilon=0.0, alpha=1.0,
+                                        rng=np.random.default_rng(0))
+        pop.q[:, :, :, ACTION_MOVE] = 5.0
+        pop.step(food_shops, actions)
+        self.assertFalse(pop.alive()[0])
+        self.assertEqual(pop.q[0, 0, -1, ACTION_MOVE], -20 - 100.0)
+        idx, _, _ = pop.step(food_shops, actions)
+        self.assertEqual(len(idx), 0)
+
+    def test_unaffordable_buys_are_never_chosen(self):
+        pop = QLearningPopulation.spawn(50, list(food_shops), money=10, epsilon=1.0,
+                                        rng=np.random.default_rng(1))
+        _, codes, _ = pop.step(food_shops, actions)
+        self.assertNotIn(pop.index.buy("PremiumShop"), codes.tolist())
+
+    def test_learns_to_avoid_moving(self):
+        shops = {"CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7}}
+        pop = QLearningPopulation.spawn(200, list(shops), epsilon=0.2, rng=np.random.default_rng(2))
+        for _ in range(40):
+            pop.energy[:] = 50
+            pop.money[:] = 100
+            for _ in range(10):
+                pop.step(shops, actions, shop_capacity=200)
+        policy = pop.greedy_policy()[:, 2, 4]  # 40-60 energy, plenty of money
+        self.assertFalse(np.any(policy == ACTION_MOVE))
+        q = pop.q[:, 2, 4].mean(axis=0)
+        self.assertLess(q[ACTION_MOVE], min(q[ACTION_REST], q[pop.index.buy("CheapShop")]))
+
+    def test_from_agents(self):
+        agents = [Agent("A"), Agent("B", energy=20)]
+        pop = QLearningPopulation.from_agents(agents, ["CheapShop", "PremiumShop"])
+        pop.money[1] = 40
+        pop.write_back(agents)
+        self.assertEqual(agents[1].state, {"energy": 20, "money": 40})
+        self.assertEqual(pop.q.shape, (2, 6, 5, 4))
+
+    def test_write_back_policy(self):
+        agents = [Agent("A", epsilon=0.3), CompactAgent("B")]
+        pop = QLearningPopulation.from_agents(agents, list(food_shops), rng=np.random.default_rng(0))
+        pop.q[:, :, :, ACTION_REST] = 1.0
+        pop.epsilon[:] = 0.0
+        pop.write_back(agents)
+        self.assertEqual(agents[0].epsilon, 0.0)
+        for agent in agents:
+            self.assertEqual(agent.q_policy.table.shape, (6, 5, 4))
+            self.assertEqual(agent.think(food_shops), "rest")
+
+        # The learned tables come back when training continues
+        pop.q[:] = 0.0
+        again = QLearningPopulation.from_agents(agents, list(food_shops))
+        self.assertTrue(np.all(again.q[:, :, :, ACTION_REST] == 1.0))
+
+    def test_train_resets_each_episode(self):
+        pop = QLearningPopulation.spawn(20, list(food_shops), energy=0, rng=np.random.default_rng(3))
+        self.assertFalse(np.any(pop.alive()))
+        pop.train(food_shops, actions, num_episodes=3, num_days=1, energy=50, money=100)
+        self.assertTrue(np.any(pop.q != 0.0))  # collapsed agents were restarted and learned
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/test_replay.py
+
+import unittest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from agents.agent import Agent
+from agents.agent_variants import GreedyAgent
+from agents.compact import CompactGreedyAgent
+from agents.replay import ReplayBuffer, MEMORY_LIMIT
+from environment.world_pomdp import EnvironmentManager
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 1.0},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 1.0}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class OtherAgent(Agent):
+    pass
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def tearDown(self):
+        ReplayBuffer.clear_shared()
+
+    def test_ring_overwrites_oldest(self):
+        buffer = ReplayBuffer(4, state_dim=1, rng=np.random.default_rng(0))
+        for i in range(6):
+            buffer.add([i], i % 3, float(i), [i + 1], False)
+        self.assertEqual(len(buffer), 4)
+        self.assertEqual(buffer.position, 2)
+        self.assertEqual(sorted(buffer.reward.tolist()), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(buffer.state.nbytes, 4 * 4)  # preallocated, never grows
+
+    def test_add_batch_wraps(self):
+        buffer = ReplayBuffer(5, state_dim=1)
+        buffer.add_batch(np.arange(7)[:, None], np.zeros(7), np.arange(7), np.arange(7)[:, None], np.zeros(7, bool))
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(sorted(buffer.reward.tolist()), [2.0, 3.0, 4.0, 5.0, 6.0])
+        buffer.add_batch([[10], [11]], [1, 1], [10, 11], [[10], [11]], [True, True])
+        self.assertEqual(sorted(buffer.reward.tolist()), [4.0, 5.0, 6.0, 10.0, 11.0])
+
+    def test_uniform_sample(self):
+        buffer = ReplayBuffer(100, rng=np.random.default_rng(1))
+        with self.assertRaises(ValueError):
+            buffer.sample(4)
+        for i in range(10):
+            buffer.add([i, i], 0, i, [i, i], False)
+        batch = buffer.sample(32)
+        self.assertEqual(batch["state"].shape, (32, 2))
+        self.assertTrue(np.all(batch["reward"] < 10))  # only filled rows are drawn
+
+    def test_prioritized_sample(self):
+        buffer = ReplayBuffer(10, state_dim=1, alpha=1.0, rng=np.random.default_rng(2))
+        for i in range(10):
+            buffer.add([i], 0, i, [i], False)
+        buffer.update_priorities(np.arange(10), np.r_[np.zeros(9), 100.0])
+        batch = buffer.sample(200, prioritized=True)
+        self.assertGreater(np.mean(batch["indices"] == 9), 0.95)
+        self.assertAlmostEqual(float(batch["weights"].max()), 1.0)
+        # Rare rows get the larger importance weight
+        rare = batch["indices"] != 9
+        if rare.any():
+            self.assertTrue(np.all(batch["weights"][rare] >= batch["weights"][~rare].max()))
+
+    def test_agents_share_buffer_per_class(self):
+        a, b = Agent("A1", rng=random.Random(0)), Agent("A2", rng=random.Random(1))
+        g = OtherAgent("O1", rng=random.Random(2))
+        self.assertIs(a.use_replay(), b.use_replay())
+        self.assertIsNot(g.use_replay(), a.replay)
+
+        a.act("buy_food_CheapShop", {}, food_shops, actions)
+        b.act("rest", {}, food_shops, actions)
+        self.assertEqual(len(a.replay), 2)
+        self.assertEqual(a.replay.state[0].tolist(), [50, 100])
+        self.assertEqual(a.replay.next_state[0].tolist(), [70, 92])
+        self.assertEqual(a.replay.action[:2].tolist(), [2, 1])
+        self.assertEqual(a.replay.reward[:2].tolist(), [12, 5])
+        self.assertEqual(len(g.replay), 0)
+
+    def test_pomdp_agents_record_through_environment(self):
+        env = EnvironmentManager(food_shops, actions, rng=random.Random(0))
+        for cls in (GreedyAgent, CompactGreedyAgent):
+            agent = cls("G", rng=random.Random(1))
+            buffer = agent.use_replay(ReplayBuffer(8))
+            env.apply_agent_action(agent, env.action_index.buy("CheapShop"))
+            agent.act("rest", {}, food_shops, actions)
+            self.assertEqual(len(buffer), 2)
+            self.assertEqual(buffer.state[0].tolist(), [120, 100])
+            self.assertEqual(buffer.next_state[0].tolist(), [143, 92])
+            self.assertEqual(buffer.action[:2].tolist(), [2, 1])
+            self.assertEqual(buffer.reward[:2].tolist(), [15, 7])
+            env.shop_taken_today = {}
+            env.shop_load_today = {}
+
+    def test_memory_is_bounded(self):
+        agent = Agent("A", energy=10 ** 6, rng=random.Random(0))
+        for _ in range(MEMORY_LIMIT + 5):
+            agent.act("move", {}, food_shops, actions)
+        agent.act("rest", {}, food_shops, actions)
+        self.assertEqual(len(agent.memory), MEMORY_LIMIT)
+        self.assertEqual(agent.memory[-1], ("rest", "rest"))
+
+        # memory_limit=None keeps the full history, also through the variant constructors
+        for agent in (GreedyAgent("G", memory_limit=None), CompactGreedyAgent("C", memory_limit=None)):
+            for _ in range(MEMORY_LIMIT + 5):
+                agent.act("rest", {}, food_shops, actions)
+            self.assertEqual(len(agent.memory), MEMORY_LIMIT + 5)
+            agent.reset()
+            self.assertIsNone(agent.memory.maxlen)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+# tests/test_run_store.py
+
+import unittest
+import sys
+import os
+import tempfile
+import importlib.util
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent_variants import GreedyAgent
+from simulation.training import run_training
+from utils.run_store import RunStore
+from utils.trajectory import TrajectoryRecorder
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+class TestRunStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = RunStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parquet_round_trip_with_filter(self):
+        out = run_training(food_shops, actions, {"greedy": 2, "cautious": 1}, 3, 4, seed=3)
+        run_id = self.store.create_run(metadata={"seed": 3})
+        self.store.save_training(run_id, out)
+        self.assertEqual(self.store.list_runs(), [run_id])
+        self.assertIn("actions", self.store.tables(run_id))
+        df = self.store.read_frame(run_id, "actions", filters=[("episode", "=", 1)])
+        expected = [a for a in out["agent_actions"] if a["episode"] == 1]
+        self.assertEqual(len(df), len(expected))
+        self.assertEqual(self.store.metadata(run_id), {"seed": 3})
+
+    def test_arrow_recorder_and_beliefs(self):
+        rec = TrajectoryRecorder(["CheapShop", "PremiumShop"])
+        run_training(food_shops, actions, {"greedy": 2}, 2, 3, seed=1, recorder=rec)
+        run_id = self.store.create_run("r1")
+        self.store.write(run_id, "actions", rec, format="arrow")
+        table = self.store.read(run_id, "actions", columns=["day", "agent_name"])
+        self.assertEqual(table.num_rows, len(rec))
+
+        agent = GreedyAgent("Greedy1")
+        for day in range(3):
+            agent.log_belief(day)
+        self.store.save_beliefs(run_id, [agent], episode=0)
+        beliefs = self.store.read_frame(run_id, "beliefs")
+        self.assertEqual(beliefs["day"].tolist(), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+# tests/test_runner.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.runner import run_replicas, run_episodes
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+team = {"explorer": 1, "greedy": 2, "cautious": 1, "cheaponly": 1}
+
+
+class TestRunner(unittest.TestCase):
+    def test_replicas_independent_of_worker_count(self):
+        serial = run_replicas(food_shops, actions, team, 3, 5, num_replicas=4, seed=7, workers=1)
+        pooled = run_replicas(food_shops, actions, team, 3, 5, num_replicas=4, seed=7, workers=2, chunksize=2)
+        self.assertEqual(serial, pooled)
+        self.assertEqual([r["replica"] for r in serial["survival_stats"]], [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3])
+
+    def test_episodes_merged_in_order(self):
+        out = run_episodes(food_shops, actions, team, 4, 3, seed=1, workers=1)
+        episodes = [r["episode"] for r in out["agent_actions"]]
+        self.assertEqual(episodes, sorted(episodes))
+        self.assertEqual([r["episode"] for r in out["survival_stats"]], [0, 1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
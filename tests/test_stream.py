@@ -0,0 +1,42 @@
+# tests/test_stream.py
+
+import unittest
+import sys
+import os
+import itertools
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation.stream import stream_training
+from simulation.training import build_team
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestStream(unittest.TestCase):
+    def test_unbounded_stream_is_lazy(self):
+        agents = build_team({"greedy": 2, "cheaponly": 1})
+        stream = stream_training(food_shops, actions, agents, None, 3)
+        records = list(itertools.islice(stream, 20))
+        self.assertEqual(len(records), 20)
+        kinds = [r["kind"] for r in records]
+        self.assertIn("episode", kinds)
+        self.assertEqual(records[0]["episode"], 0)
+
+    def test_episode_record_follows_days(self):
+        agents = build_team({"greedy": 3})
+        records = list(stream_training(food_shops, actions, agents, 2, 4))
+        episode_ends = [r for r in records if r["kind"] == "episode"]
+        self.assertEqual([r["episode"] for r in episode_ends], [0, 1])
+        self.assertEqual(episode_ends[-1]["surviving_agents"], len(agents))
+        for r in records:
+            if r["kind"] == "day":
+                self.assertEqual(len(r["actions"]), len(r["acted"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_sweep.py
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from simulation import sweep
+from simulation.sweep import grid, random_design, latin_hypercube, apply_point, run_sweep
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+team = {"greedy": 2, "cautious": 1}
+
+
+class TestDesigns(unittest.TestCase):
+    def test_grid(self):
+        points = grid({"CheapShop.cost": [4, 8], "team.greedy": [1, 2, 3]})
+        self.assertEqual(len(points), 6)
+        self.assertEqual(points[1], {"CheapShop.cost": 4, "team.greedy": 2})
+
+    def test_latin_hypercube_covers_every_stratum(self):
+        points = latin_hypercube({"PremiumShop.success_rate": (0.0, 1.0), "team.greedy": (0, 4)}, 5, seed=3)
+        rates = sorted(p["PremiumShop.success_rate"] for p in points)
+        self.assertEqual([int(r * 5) for r in rates], [0, 1, 2, 3, 4])
+        self.assertEqual(sorted(p["team.greedy"] for p in points), [0, 1, 2, 3, 4])
+
+    def test_random_design_is_seeded(self):
+        space = {"CheapShop.cost": (4, 12), "CheapShop.energy_gain": [20, 30]}
+        self.assertEqual(random_design(space, 4, seed=1), random_design(space, 4, seed=1))
+
+    def test_apply_point(self):
+        shops, new_team = apply_point(food_shops, team, {"CheapShop.cost": 3, "team.explorer": 2})
+        self.assertEqual(shops["CheapShop"]["cost"], 3)
+        self.assertEqual(food_shops["CheapShop"]["cost"], 8)
+        self.assertEqual(new_team, {"greedy": 2, "cautious": 1, "explorer": 2})
+        with self.assertRaises(KeyError):
+            apply_point(food_shops, team, {"MegaShop.cost": 1})
+
+
+class TestRunSweep(unittest.TestCase):
+    def test_rows_and_disk_skip(self):
+        points = grid({"CheapShop.success_rate": [0.2, 0.9]})
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = run_sweep(points, food_shops, actions, team, 3, 10, num_replicas=2, workers=1, cache_dir=tmp)
+            self.assertEqual([r["point"] for r in rows], [0, 1])
+            self.assertEqual(rows[0]["replicas"], 2)
+            self.assertIn("survival_rate_mean", rows[0])
+            self.assertLessEqual(rows[0]["mean_lifetime_mean"], rows[1]["mean_lifetime_mean"])
+
+            with mock.patch.object(sweep, "map_tasks", return_value=[]) as execute:
+                again = run_sweep(points[::-1], food_shops, actions, team, 3, 10,
+                                  num_replicas=2, workers=1, cache_dir=tmp)
+            self.assertEqual(execute.call_args[0][1], [])
+            self.assertEqual(again[0]["survival_rate_mean"], rows[1]["survival_rate_mean"])
+            self.assertEqual(again[0]["point"], 0)
+
+    def test_workers_match_serial(self):
+        points = grid({"team.greedy": [1, 2]})
+        serial = run_sweep(points, food_shops, actions, team, 2, 5, num_replicas=2, workers=1)
+        pooled = run_sweep(points, food_shops, actions, team, 2, 5, num_replicas=2, workers=2)
+        self.assertEqual(serial, pooled)
+
+
+if __name__ == '__main__':
+    unittest.main()
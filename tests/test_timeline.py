@@ -0,0 +1,79 @@
+# tests/test_timeline.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from simulation.training import run_training
+from utils.timeline import WorldTimeline, EVENT_CLOSED
+from utils.trajectory import TrajectoryRecorder
+
+food_shops = {
+    "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+    "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+}
+actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+
+
+class TestWorldTimeline(unittest.TestCase):
+    def setUp(self):
+        self.timeline = WorldTimeline(list(food_shops), num_days=2)  # grows to fit
+        self.recorder = TrajectoryRecorder(list(food_shops))
+        self.output = run_training(food_shops, actions, {"greedy": 3, "cheaponly": 1}, 4, 20, seed=7,
+                                   recorder=self.recorder, timeline=self.timeline)
+
+    def test_events_match_world_events(self):
+        self.assertEqual(self.timeline.num_episodes, 4)
+        self.assertEqual(self.timeline.num_days, 20)
+        for event in self.output["world_events"]:
+            # world events use the environment's 1-based day
+            state = self.timeline.at(event["episode"], event["day"] - 1)
+            self.assertIn(event["event"], state["events"])
+        episodes, days = self.timeline.event_days(EVENT_CLOSED)
+        closed = [(e["episode"], e["day"] - 1) for e in self.output["world_events"] if e["event"] == "CheapShop Closed"]
+        self.assertEqual(sorted(zip(episodes.tolist(), days.tolist())), sorted(closed))
+        for e, d in closed:
+            self.assertEqual(self.timeline.at(e, d)["CheapShop"]["success_rate"], 0.0)
+
+    def test_range_and_join(self):
+        cost, success, flags = self.timeline.range(1, 3, 8)
+        self.assertEqual(cost.shape, (5, 2))
+        self.assertEqual(flags.shape, (5,))
+
+        joined = self.timeline.join_actions(self.recorder)
+        cols = self.recorder.arrays()
+        i = len(self.recorder) // 2
+        shop = self.recorder.action_labels[cols["action"][i]].split("_")[-1]
+        expected = self.timeline.at(int(cols["episode"][i]), int(cols["day"][i]))[shop]["cost"]
+        self.assertEqual(joined["cost_faced"][i], expected)
+        self.assertEqual(len(joined["cost_faced"]), len(self.recorder))
+        self.assertFalse(np.isnan(joined["cost_faced"]).any())
+
+    def test_prices_exact_and_growth_amortized(self):
+        class Env:
+            food_shops = {"CheapShop": {"cost": 7, "success_rate": 0.7},
+                          "PremiumShop": {"cost": 13, "success_rate": 0.9}}
+            events_today = []
+
+        timeline = WorldTimeline(list(food_shops), num_days=1)
+        reallocations = 0
+        for day in range(1000):
+            cost = timeline.cost
+            timeline.record(0, day, Env)
+            reallocations += timeline.cost is not cost
+        self.assertLessEqual(reallocations, 10)  # doubling, not one copy per day
+        self.assertEqual(timeline.num_days, 1000)
+        self.assertEqual(timeline.range(0)[0].shape, (1000, 2))
+        self.assertEqual(timeline.at(0, 999)["CheapShop"], {"cost": 7, "success_rate": 0.7})
+
+    def test_missing_day(self):
+        with self.assertRaises(KeyError):
+            WorldTimeline(list(food_shops), num_days=5).at(0, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# tests/test_trace.py
+
+import unittest
+import sys
+import os
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agents.agent_variants import GreedyAgent
+from utils.trace import Tracer, tracer, RingBufferSink, FileSink, NullSink, DEBUG, INFO
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_by_default_and_with_null_sink(self):
+        t = Tracer()
+        self.assertFalse(t.enabled)
+        t.add_sink(NullSink())
+        self.assertFalse(t.debug or t.info)
+
+    def test_level_filtering(self):
+        t = Tracer(level=INFO)
+        ring = t.add_sink(RingBufferSink(capacity=2))
+        self.assertTrue(t.info)
+        self.assertFalse(t.debug)
+        t.emit(DEBUG, "ignored")
+        for i in range(3):
+            t.emit(INFO, "tick", i=i)
+        self.assertEqual([e["i"] for e in ring.events], [1, 2])
+
+    def test_file_sink_writes_json_lines(self):
+        stream = io.StringIO()
+        t = Tracer(level=DEBUG)
+        t.add_sink(FileSink(stream))
+        t.emit(DEBUG, "explore", agent="A1", shop="CheapShop")
+        self.assertIn('"event": "explore"', stream.getvalue())
+
+    def test_agent_decisions_are_traced(self):
+        ring = tracer.add_sink(RingBufferSink())
+        tracer.set_level(DEBUG)
+        try:
+            GreedyAgent("Greedy1").think()
+        finally:
+            tracer.remove_sink(ring)
+            tracer.set_level(INFO)
+        self.assertEqual(ring.events[0]["agent"], "Greedy1")
+        self.assertIn(ring.events[0]["event"], ("explore", "exploit"))
+
+
+if __name__ == '__main__':
+    unittest.main()
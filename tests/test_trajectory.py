@@ -0,0 +1,62 @@
+# tests/test_trajectory.py
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from environment.actions import ACTION_BUY, RESULT_FAIL
+from simulation.training import run_training
+from utils.trajectory import TrajectoryRecorder
+
+shops = ["CheapShop", "PremiumShop"]
+
+
+class TestTrajectoryRecorder(unittest.TestCase):
+    def test_grows_geometrically_and_interns(self):
+        rec = TrajectoryRecorder(shops, capacity=2)
+        beliefs = {s: {"expected_cost": 10.0, "trust": 0.5} for s in shops}
+        for day in range(5):
+            rec.record(0, day, f"Agent{day % 2}", "buy_food_CheapShop", "success", beliefs)
+        self.assertEqual(len(rec), 5)
+        self.assertGreaterEqual(rec.capacity, 5)
+        cols = rec.arrays()
+        self.assertEqual(cols["agent_id"].tolist(), [0, 1, 0, 1, 0])
+        # The action table starts with the ActionIndex codes (move, rest, one buy per shop)
+        self.assertEqual(cols["action"].tolist(), [2] * 5)
+        self.assertEqual(rec.action_labels[:4], ["move", "rest", "buy_food_CheapShop", "buy_food_PremiumShop"])
+        self.assertEqual(rec.agent_names, ["Agent0", "Agent1"])
+
+    def test_record_code_matches_record(self):
+        a, b = TrajectoryRecorder(shops), TrajectoryRecorder(shops)
+        a.record(0, 1, "Agent1", "buy_food_PremiumShop", "fail")
+        b.record_code(0, 1, "Agent1", ACTION_BUY + 1, RESULT_FAIL)
+        self.assertTrue(a.to_frame().equals(b.to_frame()))
+
+    def test_extend_and_frame_share_buffers(self):
+        rec = TrajectoryRecorder(shops)
+        rec.extend(1, 2, np.arange(3), np.array([0, 1, 1]), np.array([1, 0, 0]),
+                   expected_cost=np.ones((3, 2)), trust=np.full((3, 2), 0.5))
+        cols = rec.arrays()
+        self.assertTrue(np.shares_memory(cols["day"], rec._columns["day"]))
+        df = rec.to_frame(decode=False)
+        self.assertEqual(df["trust_PremiumShop"].tolist(), [0.5] * 3)
+
+    def test_training_records_into_recorder(self):
+        rec = TrajectoryRecorder(shops)
+        food_shops = {
+            "CheapShop": {"cost": 8, "energy_gain": 25, "success_rate": 0.7},
+            "PremiumShop": {"cost": 15, "energy_gain": 40, "success_rate": 0.9}
+        }
+        actions = {"move": {"energy_cost": 15}, "rest": {"energy_gain": 10}}
+        out = run_training(food_shops, actions, {"greedy": 3}, 2, 4, seed=0, recorder=rec)
+        self.assertEqual(out["agent_actions"], [])
+        self.assertEqual(len(rec), sum(out["agent_lifetimes"].values()))
+        self.assertEqual(set(rec.to_frame()["result_label"]) - {"success", "fail"}, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+# event_response.py
+"""Incremental event-response analysis.
+
+Counts agents' choices per (episode, day) as day records stream in, so the
+"what did agents do after event X" question is one dict lookup per event
+instead of a DataFrame filter over the whole action history.
+
+World events carry the environment's 1-based day while action records use
+the 0-based loop day, so the actions keyed by an event's day are the ones
+taken on the day after the event.
+"""
+
+from collections import Counter
+
+from environment.actions import split_action
+
+
+class EventResponseAggregator:
+    def __init__(self):
+        self.choices = {}  # (episode, day) -> Counter of chosen shop (or "move" / "rest")
+        self.events = {}   # episode -> [(event day, event labels)]
+
+    def add_action(self, episode, day, action):
+        kind, shop = split_action(action)
+        key = (episode, day)
+        counts = self.choices.get(key)
+        if counts is None:
+            counts = self.choices[key] = Counter()
+        counts[shop or kind] += 1
+
+    def add_day(self, record):
+        """Ingest a kind="day" record from simulation.stream."""
+        for row in record["actions"]:
+            self.add_action(row["episode"], row["day"], row["action"])
+
+    def add_events(self, episode, world_events):
+        """Ingest an episode's world events (EnvironmentManager.world_events)."""
+        self.events.setdefault(episode, []).extend((entry["day"], entry["events"]) for entry in world_events)
+
+    def choices_on(self, episode, day):
+        return self.choices.get((episode, day), Counter())
+
+    def responses(self, episode):
+        """[(event_day, events, choice counts on the following day)] for one episode."""
+        return [(day, events, self.choices_on(episode, day)) for day, events in self.events.get(episode, [])]
@@ -1,9 +1,10 @@
 # plots.py
 
-import matplotlib.pyplot as plt
 import os
 
 def plot_energy(energies, agent_names, save_path="data/energy_plot.png"):
+    import matplotlib.pyplot as plt  # Imported on use so headless runs don't pay for it
+
     for agent, energy_list in zip(agent_names, energies):
         plt.plot(energy_list, label=agent)
     
@@ -0,0 +1,96 @@
+# profiling.py
+"""Opt-in per-phase timing for the simulation loop.
+
+The day loop checks `profiler.enabled` once per day and only then takes
+timestamps, so a disabled profiler costs one attribute lookup per day.
+
+    from utils.profiling import profiler
+    profiler.enable()
+    ...run a simulation...
+    print(profiler.summary_table())
+    profiler.dump("data/profile.json")
+"""
+
+import json
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+# Phases recorded by simulation.stream.iter_days: the day's observation matrix
+# draw, then per agent class perceive(), update_belief(), decide(), the bulk
+# purchase resolution and apply_agent_action()
+PHASES = ("observe_draw", "observe", "belief_update", "decide", "resolve", "act")
+
+
+class PhaseProfiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._samples = defaultdict(lambda: array("d"))
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self._samples.clear()
+
+    def record(self, phase, seconds, agent_class=None):
+        self._samples[(phase, agent_class)].append(seconds)
+
+    @contextmanager
+    def phase(self, name, agent_class=None):
+        """Time a coarse block (e.g. pandas analysis); a no-op when disabled."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, agent_class)
+
+    def summary(self):
+        """One row per (phase, agent class): count, total and percentile timings."""
+        rows = []
+        for (phase, agent_class), samples in sorted(self._samples.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            values = np.frombuffer(samples, dtype=np.float64)
+            p50, p90, p99 = np.percentile(values, [50, 90, 99]) * 1e6
+            rows.append({
+                "phase": phase,
+                "agent_class": agent_class,
+                "count": len(values),
+                "total_s": float(values.sum()),
+                "mean_us": float(values.mean() * 1e6),
+                "p50_us": float(p50),
+                "p90_us": float(p90),
+                "p99_us": float(p99),
+            })
+        return rows
+
+    def summary_table(self):
+        """summary() as a pandas DataFrame, sorted by total time."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.summary())
+        if not df.empty:
+            df = df.sort_values("total_s", ascending=False).reset_index(drop=True)
+        return df
+
+    def dump(self, path=None):
+        """Return the summary as a JSON string, also writing it to `path` if given."""
+        payload = json.dumps({"phases": self.summary()}, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(payload)
+        return payload
+
+
+# Process-wide profiler used by the simulation loop (off by default). Runs on
+# other threads (e.g. simulation.background workers) should get their own
+# PhaseProfiler instead of toggling this one.
+profiler = PhaseProfiler()
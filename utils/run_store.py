@@ -0,0 +1,171 @@
+# run_store.py
+"""Persisted run store backed by Parquet / Arrow IPC files.
+
+Layout::
+
+    <root>/<run_id>/metadata.json
+    <root>/<run_id>/<table>/episode=<n>/part-<k>.parquet   (format="parquet")
+    <root>/<run_id>/<table>/part-<k>.arrow                  (format="arrow")
+
+Tables are free-form; the simulation writes "actions", "world_events",
+"beliefs" and "scores". Reads are memory-mapped, and Arrow IPC files are read
+zero-copy, so large histories can be queried without loading them into RAM.
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:
+        raise ImportError("RunStore needs pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def to_table(data):
+    """Convert records into a pyarrow Table.
+
+    Accepts a pyarrow Table, a pandas DataFrame, a dict of columns, a list of
+    record dicts or a TrajectoryRecorder (ids stay dictionary-encoded).
+    """
+    pa = _pyarrow()
+    if isinstance(data, pa.Table):
+        return data
+    if hasattr(data, "agent_names") and hasattr(data, "arrays"):
+        columns = data.arrays()
+        table = pa.table(columns)
+        agents = pa.DictionaryArray.from_arrays(columns["agent_id"], data.agent_names)
+        actions = pa.DictionaryArray.from_arrays(columns["action"], data.action_labels)
+        return table.append_column("agent_name", agents).append_column("action_label", actions)
+    if hasattr(data, "to_dict") and hasattr(data, "columns"):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    if isinstance(data, dict):
+        return pa.table(data)
+    return pa.Table.from_pylist(list(data))
+
+
+class RunStore:
+    def __init__(self, root="data/runs"):
+        self.root = root
+
+    def run_path(self, run_id, table=None):
+        path = os.path.join(self.root, run_id)
+        return os.path.join(path, table) if table else path
+
+    def create_run(self, run_id=None, metadata=None):
+        """Create a run directory and return its id."""
+        if run_id is None:
+            run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        os.makedirs(self.run_path(run_id), exist_ok=True)
+        with open(os.path.join(self.run_path(run_id), "metadata.json"), "w") as f:
+            json.dump(metadata or {}, f, indent=2, default=str)
+        return run_id
+
+    def list_runs(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def metadata(self, run_id):
+        with open(os.path.join(self.run_path(run_id), "metadata.json")) as f:
+            return json.load(f)
+
+    def tables(self, run_id):
+        path = self.run_path(run_id)
+        return sorted(d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)))
+
+    def write(self, run_id, table, data, format="parquet", partition_by="episode"):
+        """Append records to `table` of a run.
+
+        Parquet output is hive-partitioned on `partition_by` when that column
+        is present; Arrow output is one IPC file per call.
+        """
+        pa = _pyarrow()
+        arrow_table = to_table(data)
+        path = self.run_path(run_id, table)
+        os.makedirs(path, exist_ok=True)
+        part = uuid.uuid4().hex[:12]
+
+        if format == "arrow":
+            tmp_path = os.path.join(path, f".part-{part}.arrow.tmp")
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                    writer.write_table(arrow_table)
+            os.replace(tmp_path, os.path.join(path, f"part-{part}.arrow"))
+        elif format == "parquet":
+            partition_cols = [partition_by] if partition_by in arrow_table.column_names else None
+            pa.parquet.write_to_dataset(
+                arrow_table, path,
+                partition_cols=partition_cols,
+                basename_template=f"part-{part}-{{i}}.parquet",
+            )
+        else:
+            raise ValueError(f"Unknown format: {format}")
+
+    def save_training(self, run_id, output, recorder=None, format="parquet"):
+        """Write the records returned by run_training / run_replicas."""
+        if recorder is not None and len(recorder):
+            self.write(run_id, "actions", recorder, format=format)
+        elif output.get("agent_actions"):
+            self.write(run_id, "actions", output["agent_actions"], format=format)
+        if output.get("world_events"):
+            self.write(run_id, "world_events", output["world_events"], format=format)
+        if output.get("all_results"):
+            self.write(run_id, "scores", output["all_results"], format=format)
+        if output.get("survival_stats"):
+            self.write(run_id, "survival", output["survival_stats"], format=format)
+
+    def save_beliefs(self, run_id, agents, episode, format="parquet"):
+        """Write every agent's BeliefHistory for one episode to the "beliefs" table."""
+        columns = {"episode": [], "agent_name": [], "day": []}
+        for agent in agents:
+            days, cost, trust = agent.belief_history.as_arrays()
+            columns["episode"].append(np.full(len(days), episode, dtype=np.int32))
+            columns["agent_name"].append(np.full(len(days), agent.name, dtype=object))
+            columns["day"].append(days)
+            for j, shop in enumerate(agent.belief_history.shop_names):
+                columns.setdefault(f"expected_cost_{shop}", []).append(cost[:, j])
+                columns.setdefault(f"trust_{shop}", []).append(trust[:, j])
+        if not columns["day"]:
+            return
+        self.write(run_id, "beliefs", {k: np.concatenate(v) for k, v in columns.items()}, format=format)
+
+    def read(self, run_id, table, columns=None, filters=None):
+        """Read a table as a pyarrow Table using memory-mapped I/O.
+
+        `filters` follows pyarrow.parquet's DNF syntax, e.g.
+        [("episode", "=", 3)]; for Arrow IPC tables it is applied after the
+        zero-copy read.
+        """
+        pa = _pyarrow()
+        path = self.run_path(run_id, table)
+        arrow_files = sorted(f for f in os.listdir(path) if f.endswith(".arrow"))
+        if not arrow_files:
+            return pa.parquet.read_table(path, columns=columns, filters=filters, memory_map=True)
+
+        import pyarrow.compute as pc
+
+        pieces = []
+        for name in arrow_files:
+            source = pa.memory_map(os.path.join(path, name), "r")
+            pieces.append(pa.ipc.open_file(source).read_all())
+        result = pa.concat_tables(pieces, promote_options="default")
+        for column, op, value in filters or []:
+            ops = {"=": pc.equal, "==": pc.equal, "!=": pc.not_equal, "<": pc.less,
+                   "<=": pc.less_equal, ">": pc.greater, ">=": pc.greater_equal}
+            result = result.filter(ops[op](result[column], value))
+        if columns is not None:
+            result = result.select(columns)
+        return result
+
+    def read_frame(self, run_id, table, columns=None, filters=None):
+        """Same as read() but returns a pandas DataFrame."""
+        return self.read(run_id, table, columns=columns, filters=filters).to_pandas()
@@ -0,0 +1,127 @@
+# timeline.py
+"""Day-indexed world timeline.
+
+Keeps the shop cost and success rate agents faced, and the day's world
+event flags, in (episode, day, shop) arrays. A day is an O(1) lookup, an
+episode range is a slice, and joining action rows to the prices they were
+taken at is a fancy-index gather instead of a DataFrame filter loop.
+
+Days use the 0-based loop day of the action records (simulation.stream),
+i.e. the state right after that day's EnvironmentManager.reset_day.
+"""
+
+import numpy as np
+
+from environment.actions import split_action
+
+# Event flag bits
+EVENT_CLOSED = 1       # CheapShop closed
+EVENT_DISCOUNTED = 2   # PremiumShop discounted
+EVENT_FLAGS = {"CheapShop Closed": EVENT_CLOSED, "PremiumShop Discounted": EVENT_DISCOUNTED}
+EVENT_LABELS = {flag: label for label, flag in EVENT_FLAGS.items()}
+
+
+class WorldTimeline:
+    def __init__(self, shop_names, num_days, num_episodes=1, first_episode=0):
+        self.shop_names = list(shop_names)
+        self.first_episode = first_episode
+        shape = (num_episodes, num_days)
+        # float64, so at() returns exactly the prices the simulation used
+        self.cost = np.full(shape + (len(self.shop_names),), np.nan)
+        self.success_rate = np.full(shape + (len(self.shop_names),), np.nan)
+        self.flags = np.zeros(shape, dtype=np.uint8)
+        self.recorded = np.zeros(shape, dtype=bool)
+        self._size = shape  # (episodes, days) in use; the arrays may be larger
+
+    @property
+    def num_episodes(self):
+        return self._size[0]
+
+    @property
+    def num_days(self):
+        return self._size[1]
+
+    def _reserve(self, e, day):
+        """Grow the arrays so that row e, column day exists, doubling each axis that overflows."""
+        self._size = (max(self._size[0], e + 1), max(self._size[1], day + 1))
+        episodes, days = self.flags.shape
+        if e < episodes and day < days:
+            return
+        new_shape = (max(episodes, e + 1, 2 * episodes if e >= episodes else 0),
+                     max(days, day + 1, 2 * days if day >= days else 0))
+
+        def grow(array, fill):
+            grown = np.full(new_shape + array.shape[2:], fill, dtype=array.dtype)
+            grown[:episodes, :days] = array
+            return grown
+
+        self.cost = grow(self.cost, np.nan)
+        self.success_rate = grow(self.success_rate, np.nan)
+        self.flags = grow(self.flags, 0)
+        self.recorded = grow(self.recorded, False)
+
+    def _row(self, episode):
+        e = episode - self.first_episode
+        if e < 0:
+            raise IndexError(f"Episode {episode} is before first_episode={self.first_episode}")
+        return e
+
+    def record(self, episode, day, env):
+        """Store env's current shop state and today's events (call after reset_day)."""
+        e = self._row(episode)
+        self._reserve(e, day)
+        shops = env.food_shops
+        self.cost[e, day] = [shops[s]["cost"] for s in self.shop_names]
+        self.success_rate[e, day] = [shops[s]["success_rate"] for s in self.shop_names]
+        flags = 0
+        for label in env.events_today:
+            flags |= EVENT_FLAGS.get(label, 0)
+        self.flags[e, day] = flags
+        self.recorded[e, day] = True
+
+    def at(self, episode, day):
+        """The world on one day: {shop: {"cost", "success_rate"}, "events": [...]}."""
+        e = self._row(episode)
+        if e >= self.num_episodes or day >= self.num_days or not self.recorded[e, day]:
+            raise KeyError(f"No timeline entry for episode {episode}, day {day}")
+        state = {
+            shop: {"cost": float(self.cost[e, day, j]), "success_rate": float(self.success_rate[e, day, j])}
+            for j, shop in enumerate(self.shop_names)
+        }
+        state["events"] = [label for flag, label in EVENT_LABELS.items() if self.flags[e, day] & flag]
+        return state
+
+    def range(self, episode, start=0, stop=None):
+        """(cost, success_rate, flags) views for days [start, stop) of an episode."""
+        e = self._row(episode)
+        days = slice(start, self.num_days if stop is None else stop)
+        return self.cost[e, days], self.success_rate[e, days], self.flags[e, days]
+
+    def event_days(self, flag):
+        """(episodes, days) arrays of every recorded day with `flag` set."""
+        e, day = np.nonzero((self.flags & flag) != 0)
+        return e + self.first_episode, day
+
+    def lookup(self, episodes, days, shop_ids):
+        """Gather (cost, success_rate, flags) for aligned arrays of episodes, days and shop ids.
+
+        Rows with a negative shop id (non-buy actions) get NaN prices.
+        """
+        e = np.asarray(episodes) - self.first_episode
+        days = np.asarray(days)
+        shop_ids = np.asarray(shop_ids)
+        valid = shop_ids >= 0
+        j = np.where(valid, shop_ids, 0)
+        cost = np.where(valid, self.cost[e, days, j], np.nan)
+        success_rate = np.where(valid, self.success_rate[e, days, j], np.nan)
+        return cost, success_rate, self.flags[e, days]
+
+    def join_actions(self, recorder):
+        """Prices faced by every row of a TrajectoryRecorder, as arrays aligned with its rows."""
+        cols = recorder.arrays()
+        # Shop id per interned action label (-1 for move / rest)
+        shop_ids = {s: j for j, s in enumerate(self.shop_names)}
+        label_shop = np.array([shop_ids.get(split_action(label)[1], -1) for label in recorder.action_labels] or [-1],
+                              dtype=np.int64)
+        cost, success_rate, flags = self.lookup(cols["episode"], cols["day"], label_shop[cols["action"]])
+        return {"cost_faced": cost, "success_rate_faced": success_rate, "event_flags": flags}
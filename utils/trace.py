@@ -0,0 +1,118 @@
+# trace.py
+"""Structured trace/event bus for the simulation hot paths.
+
+Agents and the environment guard every event with a precomputed flag::
+
+    if tracer.debug:
+        tracer.emit(DEBUG, "explore", agent=self.name, shop=shop_choice)
+
+so when no sink is attached the cost is a single attribute lookup.
+"""
+
+import json
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+
+
+class NullSink:
+    """Discards every event."""
+
+    def write(self, event):
+        pass
+
+    def close(self):
+        pass
+
+
+class RingBufferSink:
+    """Keeps the last `capacity` events in memory."""
+
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+
+    def write(self, event):
+        self.events.append(event)
+
+    def clear(self):
+        self.events.clear()
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Writes one JSON object per event to a path or an open text stream."""
+
+    def __init__(self, target):
+        if hasattr(target, "write"):
+            self.stream = target
+            self._owns_stream = False
+        else:
+            self.stream = open(target, "a")
+            self._owns_stream = True
+
+    def write(self, event):
+        self.stream.write(json.dumps(event, default=str) + "\n")
+
+    def close(self):
+        if self._owns_stream:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class Tracer:
+    """Dispatches events at or above `level` to the attached sinks.
+
+    `enabled`, `debug`, `info` and `warning` are plain booleans recomputed
+    whenever sinks or the level change, so checking them is free.
+    """
+
+    def __init__(self, level=INFO):
+        self.level = level
+        self.sinks = []
+        self._refresh()
+
+    def _refresh(self):
+        active = [sink for sink in self.sinks if not isinstance(sink, NullSink)]
+        self.enabled = bool(active)
+        self.debug = self.enabled and self.level <= DEBUG
+        self.info = self.enabled and self.level <= INFO
+        self.warning = self.enabled and self.level <= WARNING
+
+    def set_level(self, level):
+        self.level = level
+        self._refresh()
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        self._refresh()
+        return sink
+
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+        sink.close()
+        self._refresh()
+
+    def clear(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+        self._refresh()
+
+    def emit(self, level, event, **fields):
+        if not self.enabled or level < self.level:
+            return
+        record = {"level": LEVEL_NAMES.get(level, level), "event": event}
+        record.update(fields)
+        for sink in self.sinks:
+            sink.write(record)
+
+
+# Process-wide tracer used by agents and environments (off by default)
+tracer = Tracer()
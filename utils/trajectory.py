@@ -0,0 +1,144 @@
+# trajectory.py
+"""Columnar trajectory recorder.
+
+Appends (episode, day, agent, action, result, beliefs) rows into preallocated
+typed NumPy columns that grow geometrically, instead of building one dict per
+agent-day. Agent names and action strings are interned to integer codes; the
+action table starts with ActionIndex(shop_names), so the day loop's action
+and result codes are stored as they are (record_code).
+"""
+
+import numpy as np
+
+from environment.actions import ActionIndex, RESULT_CODES, RESULT_LABELS
+
+
+class TrajectoryRecorder:
+    def __init__(self, shop_names, capacity=1024, growth=2.0):
+        self.shop_names = list(shop_names)
+        self.growth = growth
+        self.size = 0
+
+        self.dtypes = {
+            "episode": np.int32,
+            "day": np.int32,
+            "agent_id": np.int32,
+            "action": np.int16,
+            "result": np.int8,
+        }
+        for shop in self.shop_names:
+            self.dtypes[f"expected_cost_{shop}"] = np.float32
+            self.dtypes[f"trust_{shop}"] = np.float32
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.dtypes.items()}
+
+        # Interning tables: code -> label and label -> code
+        self.agent_names = []
+        self._agent_ids = {}
+        self.action_labels = list(ActionIndex(self.shop_names).names)
+        self._action_codes = {label: code for code, label in enumerate(self.action_labels)}
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def capacity(self):
+        return len(self._columns["episode"])
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, int(self.capacity * self.growth) + 1)
+        for name, column in self._columns.items():
+            grown = np.zeros(new_capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self._columns[name] = grown
+
+    def agent_id(self, name):
+        """Intern an agent name, returning its integer id."""
+        code = self._agent_ids.get(name)
+        if code is None:
+            code = self._agent_ids[name] = len(self.agent_names)
+            self.agent_names.append(name)
+        return code
+
+    def action_code(self, action):
+        """Intern an action string such as "buy_food_CheapShop"."""
+        code = self._action_codes.get(action)
+        if code is None:
+            code = self._action_codes[action] = len(self.action_labels)
+            self.action_labels.append(action)
+        return code
+
+    def record(self, episode, day, agent, action, result, beliefs=None):
+        """Append one row. `agent`, `action` and `result` may be labels or codes."""
+        self._reserve(1)
+        i = self.size
+        cols = self._columns
+        cols["episode"][i] = episode
+        cols["day"][i] = day
+        cols["agent_id"][i] = self.agent_id(agent) if isinstance(agent, str) else agent
+        cols["action"][i] = self.action_code(action) if isinstance(action, str) else action
+        cols["result"][i] = RESULT_CODES[result] if isinstance(result, str) else result
+        if beliefs is not None:
+            for shop in self.shop_names:
+                cols[f"expected_cost_{shop}"][i] = beliefs[shop]["expected_cost"]
+                cols[f"trust_{shop}"][i] = beliefs[shop]["trust"]
+        self.size += 1
+
+    def record_code(self, episode, day, agent, action, result, beliefs=None):
+        """Append one row from codes: an ActionIndex(shop_names) action code and a result code."""
+        self._reserve(1)
+        i = self.size
+        cols = self._columns
+        cols["episode"][i] = episode
+        cols["day"][i] = day
+        cols["agent_id"][i] = self.agent_id(agent) if isinstance(agent, str) else agent
+        cols["action"][i] = action
+        cols["result"][i] = result
+        if beliefs is not None:
+            for shop in self.shop_names:
+                cols[f"expected_cost_{shop}"][i] = beliefs[shop]["expected_cost"]
+                cols[f"trust_{shop}"][i] = beliefs[shop]["trust"]
+        self.size += 1
+
+    def extend(self, episode, day, agent_ids, actions, results, expected_cost=None, trust=None):
+        """Append a batch of rows, e.g. straight from Population.step.
+
+        expected_cost and trust are (n, n_shops) arrays in shop_names order.
+        """
+        n = len(agent_ids)
+        self._reserve(n)
+        s = slice(self.size, self.size + n)
+        cols = self._columns
+        cols["episode"][s] = episode
+        cols["day"][s] = day
+        cols["agent_id"][s] = agent_ids
+        cols["action"][s] = actions
+        cols["result"][s] = results
+        for j, shop in enumerate(self.shop_names):
+            if expected_cost is not None:
+                cols[f"expected_cost_{shop}"][s] = expected_cost[:, j]
+            if trust is not None:
+                cols[f"trust_{shop}"][s] = trust[:, j]
+        self.size += n
+
+    def arrays(self):
+        """Return {column: array} views of the recorded rows (no copy)."""
+        return {name: column[:self.size] for name, column in self._columns.items()}
+
+    def to_frame(self, decode=True):
+        """Return the rows as a DataFrame built on the column buffers.
+
+        With decode=True the id/code columns are exposed as categoricals over
+        the interning tables, which reuse the integer codes instead of
+        materialising strings.
+        """
+        import pandas as pd
+
+        data = self.arrays()
+        if decode:
+            data["agent_name"] = pd.Categorical.from_codes(data["agent_id"], self.agent_names)
+            data["action_label"] = pd.Categorical.from_codes(data["action"], self.action_labels)
+            data["result_label"] = pd.Categorical.from_codes(data["result"], list(RESULT_LABELS))
+        return pd.DataFrame(data, copy=False)
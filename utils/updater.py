@@ -1,9 +1,9 @@
 # utils/updater.py
 import random
 
-def update_shop_prices(food_shops, price_variation=2):
+def update_shop_prices(food_shops, price_variation=2, rng=random):
     """Randomly adjust shop prices slightly each day."""
     for shop_name, shop_info in food_shops.items():
-        change = random.randint(-price_variation, price_variation)
+        change = rng.randint(-price_variation, price_variation)
         new_cost = max(1, shop_info["cost"] + change)
         shop_info["cost"] = new_cost
\ No newline at end of file